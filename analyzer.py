@@ -1,7 +1,10 @@
+from export_jobs import export_runner
 from exporter import DataExporter
 from fetcher import Fetcher
 from processor import DataProcessor
+from sketches import GigSketch
 import streamlit as st
+import config
 
 class Analyzer:
 
@@ -24,37 +27,48 @@ class Analyzer:
 
             # fetch gigs data
             progress_bar.progress(20)
-            gigs_data = fetcher.fetch_mock_data(keywords)
+            if config.SKETCH_MODE:
+                # Top gigs as usual, plus a bounded summary of every match
+                sketch = GigSketch()
+                gigs_data = fetcher.fetch_streaming(keywords, sketch=sketch)
+            else:
+                sketch = None
+                gigs_data = fetcher.fetch_mock_data(keywords)
             st.session_state.gigs_data = gigs_data
             status_text.text("Processing data...")
 
             # process data to dataframes
             progress_bar.progress(40)
-            processor = DataProcessor(gigs_data)
+            processor = sketch if sketch is not None else DataProcessor(gigs_data)
             st.session_state.processor = processor
             status_text.text("Creating visualizations...")
 
             progress_bar.progress(60)
             status_text.text("Exporting data...")
             
-            # export data
+            # export data in the background; the Downloads tab polls the jobs
             progress_bar.progress(80)
-            exporter = DataExporter(processor)
-            export_files = []
+            export_jobs = []
 
-            # handle export options
-            if options['export_excel']:
-                excel_file = exporter.export_to_excel()
-                export_files.append(excel_file)
+            # handle export options; reports need the gig rows a sketch does not keep
+            if sketch is None:
+                exporter = DataExporter(processor, options)
+                try:
+                    if options['export_excel']:
+                        export_jobs.append(export_runner.submit('Excel report', lambda: [exporter.export_to_excel()],
+                                                                exporter.run))
 
-            if options['export_txt']:
-                txt_files = exporter.export_text_reports()
-                export_files.extend(txt_files)
+                    if options['export_txt']:
+                        export_jobs.append(export_runner.submit('Text reports', exporter.export_text_reports,
+                                                                exporter.run))
+                finally:
+                    # Queued jobs hold their own references to the run directory
+                    exporter.run.release()
             status_text.text("Analysis complete!")
     
             progress_bar.progress(100)        
             st.session_state.analysis_complete = True
-            st.session_state.export_files = export_files
+            st.session_state.export_jobs = export_jobs
             
             progress_bar.empty()
             status_text.empty()
@@ -0,0 +1,100 @@
+"""Throughput of the parsers.py backends over a corpus of saved gig pages.
+
+    python -m benchmarks.parsers --corpus saved_pages/ --output parsers.json
+
+Without --corpus, fixture pages are rendered from synthetic gigs and saved
+to a temporary directory first. Every backend must produce the same gigs.
+"""
+import argparse
+import glob
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Dict, Any
+
+from benchmarks.synthetic import generate_gigs, render_gig_page
+from parsers import PARSERS, parse_gig_page
+
+
+def save_fixture_corpus(directory: str, count: int) -> List[str]:
+    paths = []
+    for i, gig in enumerate(generate_gigs(count, seed=1)):
+        path = os.path.join(directory, f'gig_{i:05d}.html')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(render_gig_page(gig))
+        paths.append(path)
+    return paths
+
+
+def load_corpus(paths: List[str]) -> List[str]:
+    pages = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            pages.append(file.read())
+    return pages
+
+
+def bench_backend(backend: str, pages: List[str], workers: int) -> Dict[str, Any]:
+    parse = partial(parse_gig_page, backend=backend)
+    start = time.perf_counter()
+    if workers:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            gigs = list(executor.map(parse, pages, chunksize=16))
+    else:
+        gigs = [parse(page) for page in pages]
+    seconds = time.perf_counter() - start
+    return {
+        'backend': backend,
+        'workers': workers,
+        'pages': len(pages),
+        'megabytes': sum(map(len, pages)) / 2 ** 20,
+        'seconds': seconds,
+        'pages_per_second': len(pages) / seconds,
+        'gigs': gigs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', help="Directory of saved gig detail pages (*.html)")
+    parser.add_argument('--pages', type=int, default=200, help="Fixture pages to render without --corpus")
+    parser.add_argument('--backends', nargs='+', default=list(PARSERS))
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 2, 4],
+                        help="Process pool sizes; 0 parses inline")
+    parser.add_argument('--output', default='benchmark_parsers.json')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        paths = sorted(glob.glob(os.path.join(args.corpus, '*.html'))) if args.corpus \
+            else save_fixture_corpus(workdir, args.pages)
+        pages = load_corpus(paths)
+
+    results, reference = [], None
+    for backend in args.backends:
+        for workers in args.workers:
+            result = bench_backend(backend, pages, workers)
+            gigs = result.pop('gigs')
+            if reference is None:
+                reference = gigs
+            elif gigs != reference:
+                print(f"WARNING: {backend} output differs from {args.backends[0]}")
+            results.append(result)
+            print(f"{backend:<14} workers={workers:<3} {result['pages_per_second']:>9.1f} pages/s "
+                  f"({result['seconds']:.2f}s for {result['pages']} pages, {result['megabytes']:.1f} MiB)")
+
+    baseline = next(row for row in results if row['backend'] == 'beautifulsoup' and not row['workers']) \
+        if any(row['backend'] == 'beautifulsoup' and not row['workers'] for row in results) else None
+    if baseline:
+        for row in results:
+            row['speedup_vs_beautifulsoup'] = row['pages_per_second'] / baseline['pages_per_second']
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump({'results': results}, file, indent=2)
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Size of the AI prompt's dataset section against gig count, with and without compaction.
+
+    python -m benchmarks.prompts --sizes 10 100 1000 10000 100000 --budget 6000
+
+Token counts come from prompt_compaction.estimate_tokens, so no tokenizer
+or model is needed.
+"""
+import argparse
+import json
+import time
+
+from benchmarks.synthetic import generate_gigs
+from processor import DataProcessor
+from prompt_compaction import compact_processor, estimate_tokens, format_gigs
+import config
+
+
+def bench_size(size: int, budget: int) -> dict:
+    processor = DataProcessor(generate_gigs(size, seed=1))
+    full = format_gigs(processor.get_dataframe()[['title', 'description', 'tags']].to_dict(orient='records'))
+
+    start = time.perf_counter()
+    compacted = compact_processor(processor, budget)
+    seconds = time.perf_counter() - start
+    return {
+        'gigs': size,
+        'budget': budget,
+        'full_tokens': estimate_tokens(full),
+        'compacted_tokens': estimate_tokens(compacted),
+        'gigs_listed': compacted.count('Title: '),
+        'compaction_seconds': seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument('--budget', type=int, default=config.LLM_PROMPT_TOKEN_BUDGET)
+    parser.add_argument('--output', default='benchmark_prompts.json')
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        result = bench_size(size, args.budget)
+        results.append(result)
+        print(f"{size:>9} gigs  full {result['full_tokens']:>11,} tokens  "
+              f"compacted {result['compacted_tokens']:>7,} tokens ({result['gigs_listed']} gigs listed, "
+              f"{result['compaction_seconds']:.3f}s)")
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump({'results': results}, file, indent=2)
+    print(f"\nWrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""Stage-by-stage timing and peak memory for fetch, process, visualize and export.
+
+Run from the repository root, e.g.::
+
+    python -m benchmarks.run --sizes 1000 100000 --output bench.json
+    python -m benchmarks.run --sizes 1000 --baseline bench.json
+
+Peak memory is traced with tracemalloc, which slows Python-heavy stages;
+pass --no-memory for wall-clock numbers only.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Tuple
+
+import config
+from benchmarks.synthetic import generate_gigs, write_gigs
+from columnar_store import read_table, write_table
+from dataset_cache import dataset_cache
+from exporter import DataExporter
+from fetcher import Fetcher
+from processor import DataProcessor
+from visualizer import Visualizer
+
+KEYWORDS = ['web design', 'logo design', 'digital marketing']
+PROCESSOR_QUERIES = [
+    'get_summary_statistics', 'get_price_statistics', 'get_order_statistics',
+    'get_keyword_frequency', 'get_top_keywords', 'get_unique_tags',
+    'get_keyword_correlations', 'get_success_metrics',
+]
+CHARTS = [
+    'create_top_keywords_chart', 'create_keyword_distribution_pie', 'create_keyword_correlation_chart',
+    'create_price_distribution_chart', 'create_price_vs_orders_scatter',
+]
+
+
+def measure(function: Callable[[], Any], trace_memory: bool) -> Tuple[Any, Dict[str, float]]:
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, {'seconds': seconds, 'peak_bytes': peak}
+
+
+def stages(gigs: List[Dict[str, Any]], dataset_path: str,
+           parquet_path: str) -> List[Tuple[str, Callable[[Dict], Any]]]:
+    """Ordered (name, stage) pairs; each stage reads and extends a shared context."""
+    fetcher = Fetcher(dataset_path)
+    plan = [
+        ('fetch.load_index', lambda ctx: fetcher.get_index()),
+        ('fetch.search', lambda ctx: fetcher.fetch_mock_data(KEYWORDS)),
+        ('fetch.streaming', lambda ctx: fetcher.fetch_streaming(KEYWORDS)),
+        ('fetch.parquet_search', lambda ctx: Fetcher(parquet_path).fetch_mock_data(KEYWORDS)),
+        ('process.build_arrow', lambda ctx: DataProcessor(read_table(parquet_path))),
+        ('process.build', lambda ctx: ctx.setdefault('processor', DataProcessor(gigs))),
+    ]
+    plan += [
+        (f'process.{name}', lambda ctx, name=name: getattr(ctx['processor'], name)())
+        for name in PROCESSOR_QUERIES
+    ]
+    plan.append(('visualize.init', lambda ctx: ctx.setdefault('visualizer', Visualizer(ctx['processor']))))
+    plan += [
+        (f'visualize.{name}', lambda ctx, name=name: getattr(ctx['visualizer'], name)())
+        for name in CHARTS
+    ]
+    plan += [
+        ('export.init', lambda ctx: ctx.setdefault('exporter', DataExporter(ctx['processor']))),
+        ('export.excel', lambda ctx: ctx['exporter'].export_to_excel()),
+        ('export.text', lambda ctx: ctx['exporter'].export_text_reports()),
+    ]
+    return plan
+
+
+def run(sizes: List[int], vocabulary_size: int, zipf_exponent: float, only: List[str],
+        trace_memory: bool) -> List[Dict[str, Any]]:
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        # DataExporter prunes and reuses runs in OUTPUT_DIR, so never point it at the real one
+        config.OUTPUT_DIR = os.path.join(workdir, 'output')
+        os.makedirs(config.OUTPUT_DIR)
+
+        for size in sizes:
+            gigs = generate_gigs(size, vocabulary_size=vocabulary_size, zipf_exponent=zipf_exponent)
+            dataset_path = os.path.join(workdir, f'gigs_{size}.json')
+            write_gigs(gigs, dataset_path)
+            parquet_path = os.path.join(workdir, f'gigs_{size}.parquet')
+            write_table(gigs, parquet_path)
+            dataset_cache.invalidate()
+
+            context = {}
+            for name, stage in stages(gigs, dataset_path, parquet_path):
+                if only and not any(name.startswith(prefix) for prefix in only):
+                    continue
+                _, metrics = measure(lambda: stage(context), trace_memory)
+                results.append({'size': size, 'stage': name, **metrics})
+                print(f"{size:>9,} {name:<45} {metrics['seconds']:>9.3f}s"
+                      + (f" {metrics['peak_bytes'] / 2 ** 20:>9.1f} MiB" if trace_memory else ''))
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str):
+    with open(baseline_path, 'r', encoding='utf-8') as file:
+        baseline = {(row['size'], row['stage']): row for row in json.load(file)['results']}
+
+    print(f"\nRatio against {baseline_path} (current / baseline):")
+    for row in results:
+        before = baseline.get((row['size'], row['stage']))
+        if before and before['seconds']:
+            print(f"{row['size']:>9,} {row['stage']:<45} x{row['seconds'] / before['seconds']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--vocabulary-size', type=int, default=5000)
+    parser.add_argument('--zipf', type=float, default=1.1, help="Tag popularity skew exponent")
+    parser.add_argument('--only', nargs='*', default=[], help="Stage name prefixes to run, e.g. fetch process.build")
+    parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc peak memory tracking")
+    parser.add_argument('--output', default=f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    parser.add_argument('--baseline', help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.vocabulary_size, args.zipf, args.only, not args.no_memory)
+    report = {
+        'revision': git_revision(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'parameters': {
+            'sizes': args.sizes,
+            'vocabulary_size': args.vocabulary_size,
+            'zipf_exponent': args.zipf,
+            'trace_memory': not args.no_memory,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import json
+from typing import List, Dict, Any
+import numpy as np
+
+WORDS = [
+    'logo', 'design', 'website', 'seo', 'content', 'writing', 'video', 'animation',
+    'marketing', 'social', 'media', 'branding', 'wordpress', 'shopify', 'app', 'mobile',
+    'data', 'python', 'illustration', 'voice', 'translation', 'editing', 'blog', 'ads',
+]
+TITLE_PREFIXES = ['Professional', 'Custom', 'Modern', 'Expert', 'Creative', 'Affordable']
+
+
+def generate_gigs(count: int, vocabulary_size: int = 5000, zipf_exponent: float = 1.1,
+                  tags_per_gig: int = 5, seed: int = 0) -> List[Dict[str, Any]]:
+    """Gigs in the sample-gigs-data.json schema with Zipf-distributed tags.
+
+    Tag ``i`` is drawn with probability proportional to 1 / (i + 1) ** zipf_exponent,
+    so a higher exponent concentrates usage on fewer keywords.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([
+        f"{WORDS[i % len(WORDS)]}-{WORDS[(i // len(WORDS)) % len(WORDS)]}-{i}" for i in range(vocabulary_size)
+    ], dtype=object)
+    weights = 1.0 / np.arange(1, vocabulary_size + 1) ** zipf_exponent
+    weights /= weights.sum()
+
+    tag_counts = rng.integers(max(tags_per_gig - 2, 1), tags_per_gig + 3, size=count)
+    tag_codes = rng.choice(vocabulary_size, size=int(tag_counts.sum()), p=weights)
+    title_words = rng.integers(0, len(WORDS), size=(count, 3))
+    prefixes = rng.integers(0, len(TITLE_PREFIXES), size=count)
+    orders = np.minimum(rng.zipf(1.7, size=count), 20000)
+    prices = np.clip(np.round(rng.lognormal(3.5, 0.8, size=count)), 5, 2000).astype(int)
+
+    gigs = []
+    offsets = np.concatenate([[0], np.cumsum(tag_counts)])
+    for i in range(count):
+        words = [WORDS[w] for w in title_words[i]]
+        gigs.append({
+            'title': f"{TITLE_PREFIXES[prefixes[i]]} {words[0].title()} {words[1].title()} - {words[2].title()}",
+            'description': f"I will deliver {words[0]} {words[1]} and {words[2]} services tailored to your brand.",
+            'tags': vocabulary[tag_codes[offsets[i]:offsets[i + 1]]].tolist(),
+            'completed_orders': int(orders[i]),
+            'price': int(prices[i]),
+        })
+    return gigs
+
+
+def write_gigs(gigs: List[Dict[str, Any]], path: str):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(gigs, file)
+
+
+def render_gig_page(gig: Dict[str, Any], filler_blocks: int = 200) -> str:
+    """A gig detail page with the markup the scraper reads, padded with unrelated
+    nodes so its size and depth resemble a real saved page."""
+    blocks = [
+        f'<div class="row-{i}"><section><ul><li><a href="/related/{i}">Related service {i}</a></li>'
+        f'<li><span class="meta">{i * 7} reviews</span></li></ul>'
+        f'<p>{" ".join(WORDS[(i + j) % len(WORDS)] for j in range(12))}</p></section></div>'
+        for i in range(filler_blocks)
+    ]
+    nav, filler = ''.join(blocks[:filler_blocks // 4]), ''.join(blocks)
+    tags = ''.join(f'<li><a href="/tags/{tag}">{tag}</a></li>' for tag in gig['tags'])
+    return (
+        '<!DOCTYPE html><html><head><title>Gig</title>'
+        '<script>window.__STATE__ = {"user": null, "flags": [1, 2, 3]};</script></head><body>'
+        f'<header><nav>{nav}</nav></header>'
+        f'<main><div class="gig-overview"><h1>{gig["title"]}</h1>'
+        f'<span class="rating-count-number">{gig["completed_orders"]:,}</span></div>'
+        f'<aside><span class="price">US${gig["price"]}</span></aside>'
+        f'<div class="description-content"><p>{gig["description"]}</p></div>'
+        f'<div class="gig-tags-container"><ul>{tags}</ul></div>'
+        f'{filler}</main></body></html>'
+    )
+
+
+def render_search_page(paths: List[str], titles: List[str]) -> str:
+    cards = ''.join(
+        f'<div class="gig-wrapper"><a href="{path}?context=search"><div><p role="heading">{title}</p></div></a></div>'
+        for path, title in zip(paths, titles)
+    )
+    return f'<!DOCTYPE html><html><body><div class="results">{cards}</div></body></html>'
@@ -0,0 +1,184 @@
+"""Parquet / Arrow IPC gig datasets.
+
+    python -m columnar_store sample-gigs-data.json gigs.parquet
+
+Gigs are stored one row each with ``tags`` as a list<string> column. Arrow
+IPC files (``.arrow``/``.feather``) are memory-mapped, so reading them
+copies nothing; Parquet is decoded column by column. Keyword and tag
+filters and column projection run inside the Arrow scan, and ranking is
+vectorized, so no per-gig Python dicts are built for the rows skipped.
+"""
+import argparse
+import re
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from search_index import FIELDS
+import config
+
+PARQUET_MAGIC = b'PAR1'
+ARROW_MAGIC = b'ARROW1'
+WRITE_BATCH_SIZE = 65536
+
+
+def columnar_format(path: str) -> Optional[str]:
+    """'parquet', 'arrow' or None, judged by the file's magic bytes."""
+    with open(path, 'rb') as file:
+        magic = file.read(6)
+    if magic.startswith(PARQUET_MAGIC):
+        return 'parquet'
+    if magic.startswith(ARROW_MAGIC):
+        return 'arrow'
+    return None
+
+
+GIG_SCHEMA = pa.schema([
+    ('title', pa.string()),
+    ('description', pa.string()),
+    ('tags', pa.list_(pa.string())),
+    ('completed_orders', pa.int64()),
+    # Scraped prices can be fractional
+    ('price', pa.float64()),
+])
+
+
+def _schema(batch: List[Dict[str, Any]]) -> pa.Schema:
+    """GIG_SCHEMA for the gig fields, inferred types for any extra ones (e.g. 'url')."""
+    inferred = pa.Table.from_pylist(batch).schema if batch else GIG_SCHEMA
+    return pa.schema([
+        GIG_SCHEMA.field(field.name) if field.name in GIG_SCHEMA.names else field for field in inferred
+    ])
+
+
+def write_table(gigs: Iterable[Dict[str, Any]], path: str, batch_size: int = WRITE_BATCH_SIZE) -> int:
+    """Write gigs to Parquet, or Arrow IPC for .arrow/.feather paths, batch by batch."""
+    gigs = iter(gigs)
+    batch = list(islice(gigs, batch_size))
+    schema = _schema(batch)
+    writer = ipc.new_file(path, schema) if path.endswith(('.arrow', '.feather')) else pq.ParquetWriter(path, schema)
+    count = 0
+    with writer:
+        while batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+            batch = list(islice(gigs, batch_size))
+    return count
+
+
+def _field_texts(source) -> List[Any]:
+    """Lowercased title, description and space-joined tags, as in SearchIndex."""
+    return [
+        pc.utf8_lower(source('title')),
+        pc.utf8_lower(source('description')),
+        pc.utf8_lower(pc.binary_join(source('tags'), ' ')),
+    ]
+
+
+def keyword_filter(keywords: List[str]) -> ds.Expression:
+    """Rows whose title, description or tags contain any keyword, like ``Fetcher.match_score``."""
+    combined = pc.binary_join_element_wise(*_field_texts(ds.field), ' ')
+    expression = None
+    for keyword in keywords:
+        match = pc.match_substring(combined, keyword.lower())
+        expression = match if expression is None else expression | match
+    return expression
+
+
+def tag_filter(tags: List[str]) -> ds.Expression:
+    """Rows carrying at least one of ``tags`` exactly."""
+    # Anchor on the separators so a tag never matches inside a longer one
+    joined = pc.binary_join(ds.field('tags'), '\x1f')
+    pattern = '|'.join(re.escape(tag) for tag in tags)
+    return pc.match_substring_regex(joined, f'(^|\x1f)({pattern})(\x1f|$)')
+
+
+def read_table(path: str, columns: Optional[List[str]] = None, keywords: Optional[List[str]] = None,
+               tags: Optional[List[str]] = None) -> pa.Table:
+    """Load a columnar dataset, filtering and projecting inside the scan."""
+    if not keywords and not tags:
+        if columnar_format(path) == 'arrow':
+            table = ipc.open_file(pa.memory_map(path, 'r')).read_all()
+            return table.select(columns) if columns else table
+        return pq.read_table(path, columns=columns, memory_map=True)
+
+    expression = None
+    for condition in (keyword_filter(keywords) if keywords else None, tag_filter(tags) if tags else None):
+        if condition is not None:
+            expression = condition if expression is None else expression & condition
+    return _dataset(path).to_table(columns=columns, filter=expression)
+
+
+def _dataset(path: str) -> ds.Dataset:
+    return ds.dataset(path, format='ipc' if columnar_format(path) == 'arrow' else 'parquet')
+
+
+def iter_table_gigs(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield gigs as dicts, one record batch in memory at a time."""
+    if columnar_format(path) == 'arrow':
+        reader = ipc.open_file(pa.memory_map(path, 'r'))
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    else:
+        batches = pq.ParquetFile(path, memory_map=True).iter_batches()
+    for batch in batches:
+        yield from batch.to_pylist()
+
+
+def search_table(table: pa.Table, keywords: List[str], limit: int = config.NUMBER_OF_GIGS,
+                 field_weights: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """Rank rows exactly like ``SearchIndex.search`` and return the top gigs as dicts."""
+    weights = field_weights or config.SEARCH_FIELD_WEIGHTS
+    weights = [weights.get(field, 1.0) for field in FIELDS]
+    texts = _field_texts(lambda name: table[name])
+    combined = pc.binary_join_element_wise(*texts, ' ')
+
+    scores = np.zeros(len(table))
+    for keyword in keywords:
+        keyword = keyword.lower()
+        best = np.zeros(len(table))
+        for text, weight in zip(texts, weights):
+            matched = pc.match_substring(text, keyword).to_numpy(zero_copy_only=False)
+            best = np.where(matched, np.maximum(best, weight), best)
+        spans = pc.match_substring(combined, keyword).to_numpy(zero_copy_only=False) & (best == 0)
+        scores += np.where(spans, min(weights), best)
+
+    # Stable, so ties and unmatched gigs keep dataset order
+    top = np.argsort(-scores, kind='stable')[:limit]
+    return table.take(top).to_pylist()
+
+
+def search_dataset(path: str, keywords: List[str], limit: int = config.NUMBER_OF_GIGS,
+                   field_weights: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """``search_table`` over a dataset file without loading the rows no keyword matches.
+
+    Only matching rows are scanned into memory and ranked; if fewer than
+    ``limit`` match, the first unmatched rows in dataset order fill the
+    result, as they do in ``search_table``.
+    """
+    dataset = _dataset(path)
+    if not keywords:
+        return dataset.head(limit).to_pylist()
+
+    expression = keyword_filter(keywords)
+    gigs = search_table(dataset.to_table(filter=expression), keywords, limit, field_weights)
+    if len(gigs) < limit:
+        gigs += dataset.head(limit - len(gigs), filter=~expression).to_pylist()
+    return gigs
+
+
+def main():
+    from ingest import iter_gigs
+
+    parser = argparse.ArgumentParser(description="Convert a gig dataset to Parquet or Arrow IPC")
+    parser.add_argument('source', help="JSON array or NDJSON gig dataset (optionally gzip/zstd)")
+    parser.add_argument('target', help="Output path; .arrow/.feather writes Arrow IPC, anything else Parquet")
+    args = parser.parse_args()
+    print(f"Wrote {write_table(iter_gigs(args.source), args.target)} gigs to {args.target}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,117 @@
 NUMBER_OF_GIGS = 10
+DATASET_PATH = "sample-gigs-data.json"
+# Read the dataset gig by gig instead of loading it whole (JSON arrays,
+# NDJSON/JSONL, optionally gzip or zstd compressed)
+STREAMING_INGESTION = False
+# Summarize every gig matching the keywords in a sketches.GigSketch while it
+# streams by (any format iter_gigs reads). The UI then shows approximate
+# statistics and keyword charts over all matches instead of the top gigs;
+# charts that need the gig rows, AI recommendations and exports are off.
+SKETCH_MODE = False
+# Memory cap for parsed datasets and search indexes shared across sessions
+DATASET_CACHE_MAX_BYTES = 2 * 1024 ** 3
+# Memory cap for serialized Plotly figures reused across reruns and sessions
+FIGURE_CACHE_MAX_BYTES = 256 * 1024 ** 2
+
+# Bounded-memory summaries (sketches.GigSketch) for streamed or sharded data
+SKETCH_KLL_K = 200
+SKETCH_CM_EPSILON = 0.001
+SKETCH_CM_DELTA = 0.01
+SKETCH_TOP_KEYWORDS_CAPACITY = 1000
+SKETCH_BATCH_SIZE = 10000
+
+# Worker processes for parallel.analyze_sharded
+ANALYSIS_WORKERS = 4
+# Gig entries the search index keeps across memoized keyword expansions
+SEARCH_EXPANSION_CACHE_MAX_ENTRIES = 1_000_000
+SEARCH_FIELD_WEIGHTS = {
+    'title': 1.0,
+    'description': 1.0,
+    'tags': 1.0,
+}
 CHART_COLORS = [
     '#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7',
     '#DDA0DD', '#98D8C8', '#F7DC6F', '#BB8FCE', '#85C1E9'
 ]
+# Price charts: "raw" ships every gig to the browser, "aggregated" bins on
+# the server, "auto" aggregates from CHART_AGGREGATE_MIN_POINTS gigs
+CHART_RENDER_MODES = ("auto", "raw", "aggregated")
+CHART_AGGREGATE_MIN_POINTS = 20000
+PRICE_HISTOGRAM_BINS = 20
+# Density grid and the stratified sample of hoverable gigs drawn over it
+SCATTER_DENSITY_BINS = 80
+SCATTER_SAMPLE_POINTS = 2000
+# Price/orders trend: "ols" (the least-squares line the chart has always
+# drawn), "log" (least squares on log1p values) or "theil_sen" (median
+# pairwise slope over TREND_SAMPLE_SIZE sampled gigs, robust to outliers)
+TREND_METHODS = ("ols", "log", "theil_sen")
+TREND_METHOD = "ols"
+TREND_SAMPLE_SIZE = 1000
+TREND_LINE_POINTS = 50
+
+# Gig scraper (scraper.AsyncGigScraper)
+SCRAPER_BASE_URL = "https://www.fiverr.com"
+SCRAPER_CONCURRENCY_PER_HOST = 8
+SCRAPER_REQUESTS_PER_SECOND = 4.0
+SCRAPER_MAX_RETRIES = 3
+SCRAPER_BACKOFF_SECONDS = 1.0
+SCRAPER_MAX_PAGES = 5
+SCRAPER_TIMEOUT_SECONDS = 30.0
+# HTML backend from parsers.py: "lxml", "selectolax" or "beautifulsoup"
+SCRAPER_PARSER = "selectolax"
+# Processes that parse pages off the event loop; 0 parses inline
+SCRAPER_PARSE_WORKERS = 2
+# On-disk page cache for scraper runs (scrape_cache.ScrapeCache)
+SCRAPE_CACHE_DIR = ".scrape_cache"
+SCRAPE_CACHE_TTL_SECONDS = 12 * 3600
+SCRAPE_CACHE_MAX_BYTES = 1024 ** 3
+# Append-only crawl output (crawl_store.CrawlStore), flushed every N gigs
+CRAWL_STORE_DIR = "crawls"
+CRAWL_CHECKPOINT_EVERY = 25
 
 OUTPUT_DIR = "output"
+# Run directories under OUTPUT_DIR (output_runs.py): the janitor removes runs
+# unused for OUTPUT_MAX_AGE_SECONDS, then the oldest beyond OUTPUT_MAX_BYTES
+OUTPUT_MAX_BYTES = 2 * 1024 ** 3
+OUTPUT_MAX_AGE_SECONDS = 7 * 24 * 3600
+OUTPUT_CLEANUP_INTERVAL_SECONDS = 300
+OUTPUT_MANIFEST_RUNS = 50
+# Exports with at least this many gigs use the write-only Excel writer
+EXCEL_STREAMING_MIN_ROWS = 50000
+EXPORT_CHUNK_ROWS = 10000
+EXPORT_TOP_CORRELATIONS = 1000
+# Background export threads (export_jobs.ExportRunner) and UI poll interval
+EXPORT_WORKERS = 2
+EXPORT_POLL_SECONDS = 1.0
+# AI recommendations (intelligence.Intelligence): "gemini", or "fake" for an
+# offline stand-in model that needs no API key
+LLM_PROVIDER = "gemini"
+LLM_MODEL = "gemini-2.0-flash"
+# Estimated tokens for the gig dataset section of the prompt; larger gig
+# sets are summarized by prompt_compaction.compact_gigs
+LLM_PROMPT_TOKEN_BUDGET = 6000
+LLM_PROMPT_TOP_KEYWORDS = 30
+LLM_PROMPT_TOP_PAIRS = 20
+# Most-ordered gigs considered as examples, and how strongly MMR favours
+# tag diversity over order count (0 to 1)
+LLM_PROMPT_CANDIDATES = 500
+LLM_PROMPT_MMR_DIVERSITY = 0.3
+LLM_PROMPT_DESCRIPTION_CHARS = 300
+# Map-reduce mode (Intelligence.start_generation) from this many gigs: chunk
+# summaries run concurrently, then one call writes the metadata
+LLM_MAP_REDUCE_MIN_GIGS = 2000
+# Average gigs per chunk; boundaries follow gig content, so an edit only
+# changes the summary of its own chunk
+LLM_MAP_CHUNK_GIGS = 50
+LLM_MAP_CONCURRENCY = 4
+LLM_MAP_TIMEOUT_SECONDS = 60.0
+# Share of summary calls that may fail or time out before the generation fails
+LLM_MAP_MAX_FAILED_FRACTION = 0.25
+# On-disk response cache (llm_cache.ResponseCache)
+LLM_CACHE_DIR = ".llm_cache"
+LLM_CACHE_TTL_SECONDS = 24 * 3600
+# Background generation threads and how often the UI shows streamed text
+LLM_WORKERS = 2
+LLM_POLL_SECONDS = 0.5
 VERSION = "1.0.0"
 
@@ -0,0 +1,100 @@
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterator, Optional, Set
+from ingest import iter_gigs
+import config
+
+
+class CrawlStore:
+    """Append-only JSONL store for one crawl, checkpointed so it can resume.
+
+    Gigs are appended as they arrive and the file is flushed to disk every
+    ``checkpoint_every`` gigs, together with a checkpoint recording how many
+    bytes of it are durable. Reopening an unfinished crawl truncates the
+    store back to the last checkpoint and rebuilds the set of gig URLs
+    already scraped, so the scraper can skip them. The store is plain
+    NDJSON, so ``Fetcher(store.path)`` reads it like any other dataset.
+    """
+
+    def __init__(self, path: str, checkpoint_every: int = config.CRAWL_CHECKPOINT_EVERY):
+        self.path = path
+        self.checkpoint_path = path + '.checkpoint.json'
+        self.checkpoint_every = checkpoint_every
+        self.done: Set[str] = set()
+        self.count = 0
+        self.resumed = 0
+        self._file = None
+        self._pending = 0
+
+    @classmethod
+    def for_keyword(cls, keyword: str, directory: str = config.CRAWL_STORE_DIR, **options) -> 'CrawlStore':
+        slug = re.sub(r'[^a-z0-9]+', '-', keyword.lower()).strip('-') or 'crawl'
+        os.makedirs(directory, exist_ok=True)
+        return cls(os.path.join(directory, f'{slug}.jsonl'), **options)
+
+    def _read_checkpoint(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def open(self, resume: bool = True) -> 'CrawlStore':
+        checkpoint = self._read_checkpoint() if resume else None
+        if checkpoint is not None and not checkpoint['complete'] and os.path.exists(self.path):
+            # Anything after the checkpoint may be a torn write; those gigs are scraped again
+            with open(self.path, 'r+b') as file:
+                file.truncate(checkpoint['bytes'])
+            for gig in iter_gigs(self.path):
+                self.done.add(gig.get('url'))
+                self.count += 1
+            self.resumed = self.count
+        else:
+            open(self.path, 'wb').close()
+            self._write_checkpoint(complete=False)
+
+        self._file = open(self.path, 'ab')
+        return self
+
+    def append(self, gig: Dict[str, Any]):
+        self._file.write(json.dumps(gig, ensure_ascii=False).encode('utf-8') + b'\n')
+        self.done.add(gig.get('url'))
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self, complete: bool = False):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._write_checkpoint(complete)
+        self._pending = 0
+
+    def _write_checkpoint(self, complete: bool):
+        temporary = self.checkpoint_path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({
+                'gigs': self.count,
+                'bytes': self._file.tell() if self._file else 0,
+                'complete': complete,
+                'updated_at': time.time(),
+            }, file)
+        os.replace(temporary, self.checkpoint_path)
+
+    def close(self, complete: bool = True):
+        if self._file is not None:
+            self.checkpoint(complete)
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'CrawlStore':
+        return self if self._file is not None else self.open()
+
+    def __exit__(self, exc_type, *exc_info):
+        # An interrupted crawl keeps its last checkpoint open for resuming
+        self.close(complete=exc_type is None)
+
+    def iter_gigs(self) -> Iterator[Dict[str, Any]]:
+        return iter_gigs(self.path)
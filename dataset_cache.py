@@ -0,0 +1,155 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Tuple
+from ingest import load_gigs
+from search_index import SearchIndex
+from sqlite_store import GigDatabase
+import config
+
+
+class _Entry:
+    def __init__(self, signature: Tuple[int, int], gigs: List[Dict[str, Any]]):
+        self.signature = signature
+        self.gigs = gigs
+        self.index = None
+        self.static_size = _estimate_gigs_size(gigs)
+
+    @property
+    def size(self) -> int:
+        # The expansion memo grows (up to its cap) as sessions search
+        if self.index is None:
+            return self.static_size
+        return self.static_size + self.index.expansion_entries * 100
+
+
+def _estimate_gigs_size(gigs: List[Dict[str, Any]]) -> int:
+    size = sys.getsizeof(gigs)
+    for gig in gigs:
+        size += sys.getsizeof(gig)
+        for value in gig.values():
+            size += sys.getsizeof(value)
+            if isinstance(value, list):
+                size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+def _estimate_index_size(index: SearchIndex) -> int:
+    # Posting entries dominate: a dict slot plus a small int mask each
+    postings = sum(len(posting) for posting in index.postings.values())
+    grams = sum(len(term_ids) for term_ids in index.grams.values())
+    return (sys.getsizeof(index.postings) + len(index.postings) * 250 + postings * 100
+            + len(index.grams) * 150 + grams * 8)
+
+
+class DatasetCache:
+    """Process-wide cache of parsed gig datasets and their search indexes.
+
+    Entries are keyed by path and invalidated when the file's mtime or size
+    changes. Once the estimated footprint exceeds ``max_bytes`` the least
+    recently used datasets are evicted. The module-level ``dataset_cache``
+    instance lives for the whole server process, so it is shared by every
+    Streamlit session and rerun.
+
+    SQLite stores are not loaded, only opened: ``get_database`` keeps one
+    ``GigDatabase`` per path (each thread still gets its own connection),
+    so the schema runs once per process rather than once per search.
+    """
+
+    def __init__(self, max_bytes: int = config.DATASET_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._databases: Dict[str, GigDatabase] = {}
+
+    def get_gigs(self, path: str) -> List[Dict[str, Any]]:
+        return self._get_entry(path).gigs
+
+    def get_index(self, path: str) -> SearchIndex:
+        entry = self._get_entry(path)
+        with self._load_lock(path):
+            if entry.index is None:
+                entry.index = SearchIndex(entry.gigs)
+                with self._lock:
+                    entry.static_size += _estimate_index_size(entry.index)
+        with self._lock:
+            # Re-check on every lookup: memos of indexes already handed out keep growing
+            self._evict()
+        return entry.index
+
+    def get_database(self, path: str) -> GigDatabase:
+        key = os.path.abspath(path)
+        with self._load_lock(key):
+            database = self._databases.get(key)
+            if database is None:
+                database = self._databases[key] = GigDatabase(key)
+        return database
+
+    def invalidate(self, path: str = None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._databases.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+                self._databases.pop(os.path.abspath(path), None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': sum(entry.size for entry in self._entries.values()),
+            }
+
+    def _load_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(os.path.abspath(key), threading.Lock())
+
+    def _get_entry(self, path: str) -> _Entry:
+        key = os.path.abspath(path)
+        stat = os.stat(key)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        # Parse outside the cache lock; the per-path lock stops concurrent
+        # sessions from loading the same file twice
+        with self._load_lock(key):
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.signature == signature:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                self.misses += 1
+
+            entry = _Entry(signature, load_gigs(key))
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                self._evict()
+        return entry
+
+    def _evict(self):
+        total = sum(entry.size for entry in self._entries.values())
+        # Never evict the most recently used entry, even if it alone is too big
+        while total > self.max_bytes and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            total -= entry.size
+            self.evictions += 1
+
+
+dataset_cache = DatasetCache()
@@ -0,0 +1,90 @@
+import itertools
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+from output_runs import RunDirectory
+import config
+
+
+class ExportJob:
+    """Handle for one export running in the background.
+
+    ``status`` is 'running', 'done', 'failed' or 'cancelled' (the job was
+    cancelled, e.g. by a shutdown, before it started).
+    """
+
+    def __init__(self, job_id: int, label: str, future: Future):
+        self.id = job_id
+        self.label = label
+        self.future = future
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        future.add_done_callback(self._finish)
+
+    def _finish(self, future: Future):
+        self.finished_at = time.time()
+        if not future.cancelled() and future.exception() is not None:
+            exception = future.exception()
+            print(f"Export '{self.label}' failed: "
+                  + ''.join(traceback.format_exception(type(exception), exception, exception.__traceback__)))
+
+    @property
+    def status(self) -> str:
+        if not self.future.done():
+            return 'running'
+        if self.future.cancelled():
+            return 'cancelled'
+        return 'failed' if self.future.exception() is not None else 'done'
+
+    @property
+    def files(self) -> List[str]:
+        """Paths written by the job; empty until it has finished successfully."""
+        return self.future.result() if self.status == 'done' else []
+
+    @property
+    def error(self) -> Optional[str]:
+        return str(self.future.exception()) if self.status == 'failed' else None
+
+    def wait(self, timeout: float = None) -> List[str]:
+        return self.future.result(timeout)
+
+
+class ExportRunner:
+    """Runs exports on a shared thread pool so the analysis never waits for them.
+
+    Exporters write to a temporary file and rename it into place, so a file
+    listed by a finished job is always complete. Job handles are owned by
+    the caller (the Streamlit session), not kept here.
+    """
+
+    def __init__(self, workers: int = config.EXPORT_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export')
+        self._ids = itertools.count(1)
+
+    def submit(self, label: str, function: Callable[[], List[str]], run: RunDirectory = None) -> ExportJob:
+        """Queue ``function``, which returns the paths it wrote, and return its handle.
+
+        ``run``, the directory the job writes to, is retained until the job
+        finishes so the janitor cannot remove it while the job waits in the queue.
+        """
+        if run is None:
+            return ExportJob(next(self._ids), label, self._executor.submit(function))
+
+        def export() -> List[str]:
+            try:
+                return function()
+            finally:
+                run.release()
+
+        run.retain()
+        future = self._executor.submit(export)
+        # A job cancelled before it started never reaches the finally above
+        future.add_done_callback(lambda done: done.cancelled() and run.release())
+        return ExportJob(next(self._ids), label, future)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+export_runner = ExportRunner()
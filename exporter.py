@@ -1,54 +1,152 @@
 import pandas as pd
-from typing import List, Dict, Any
+import numpy as np
+import uuid
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterable, Iterator, Tuple
 from datetime import datetime
+from openpyxl import Workbook
 from processor import DataProcessor
 import json
 import os
 import config
-import shutil
+from output_runs import RunDirectory, clean_output_dir, content_hash
+
+# Rows per worksheet, header included
+EXCEL_MAX_ROWS = 1048576
+
+Sheet = Tuple[str, List[str], Iterable[Iterable[Any]]]
+
+
+@contextmanager
+def _atomic_write(filepath: str) -> Iterator[str]:
+    """Yield a temporary path next to ``filepath`` and rename it into place on success."""
+    directory, name = os.path.split(filepath)
+    # Hidden, and keeping the extension that writers such as pandas check
+    temporary = os.path.join(directory, f".{uuid.uuid4().hex}.{name}")
+    try:
+        yield temporary
+        os.replace(temporary, filepath)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def _cell(value: Any) -> Any:
+    """Plain Python values for openpyxl; NaN becomes an empty cell."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
 
 
 class DataExporter:
-    def __init__(self, processor: DataProcessor):
+    """Writes reports into the run directory for this processor's gigs and options.
+
+    Analyses of identical gigs with identical options share one directory,
+    so a report that already exists there is returned instead of rebuilt.
+    """
+
+    def __init__(self, processor: DataProcessor, options: Dict[str, Any] = None):
         self.processor = processor
         self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
-        self._clear_output_dir()
         os.makedirs(config.OUTPUT_DIR, exist_ok=True)
+        report_options = {key: value for key, value in (options or {}).items() if not key.startswith('export_')}
+        self.run = RunDirectory(content_hash(processor.get_fingerprint(), report_options))
+        self.output_dir = self.run.path
+        clean_output_dir(keep=self.run.path)
     
-    def export_to_excel(self, filename: str = None) -> str:
-        if filename is None:
-            filename = f"gig_analysis_{self.timestamp}.xlsx"
-        
-        filepath = os.path.join(config.OUTPUT_DIR, filename)
+    def export_to_excel(self, filename: str = None, streaming: bool = None) -> str:
+        """Write the gig data and the report sheets the UI shows.
 
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+        ``streaming`` (by default: at least ``EXCEL_STREAMING_MIN_ROWS`` gigs)
+        writes through openpyxl's write-only mode in row chunks, so memory
+        stays flat in the row count; gig rows past Excel's sheet limit
+        continue on Gig_Data_2, Gig_Data_3 and so on.
+        """
+        with self.run.lock('excel'):
+            if filename is None:
+                existing = self.run.artifact('excel')
+                if existing:
+                    return existing[0]
+                filename = f"gig_analysis_{self.timestamp}.xlsx"
+            
+            filepath = os.path.join(self.output_dir, filename)
             df = self.processor.get_dataframe()
-            df.to_excel(writer, sheet_name='Gig_Data', index=False)
+            if streaming is None:
+                streaming = len(df) >= config.EXCEL_STREAMING_MIN_ROWS
+
+            with _atomic_write(filepath) as temporary:
+                if streaming:
+                    workbook = Workbook(write_only=True)
+                    self._write_sheet(workbook, 'Gig_Data', list(df.columns), self._iter_rows(df))
+                    for name, header, rows in self._report_sheets():
+                        self._write_sheet(workbook, name, header, rows)
+                    workbook.save(temporary)
+                else:
+                    with pd.ExcelWriter(temporary, engine='openpyxl') as writer:
+                        df.to_excel(writer, sheet_name='Gig_Data', index=False)
+                        for name, header, rows in self._report_sheets():
+                            pd.DataFrame(list(rows), columns=header).to_excel(writer, sheet_name=name, index=False)
+            self.run.record('excel', [filepath])
             
         return filepath
 
+    def _report_sheets(self) -> List[Sheet]:
+        summary = self.processor.get_summary_statistics()
+        price_stats = self.processor.get_price_statistics()
+        order_stats = self.processor.get_order_statistics()
+        return [
+            ('Summary', ['Metric', 'Value'],
+             [(key.replace('_', ' ').title(), _cell(value)) for key, value in summary.items()]),
+            ('Price_Statistics', ['Statistic', 'Value'],
+             [(key.title(), _cell(value)) for key, value in price_stats.items()]),
+            ('Order_Statistics', ['Statistic', 'Value'],
+             [(key.title(), _cell(value)) for key, value in order_stats.items()]),
+            ('Keyword_Frequency', ['Keyword', 'Frequency'],
+             self.processor.get_keyword_frequency().items()),
+            ('Keyword_Correlations', ['Keyword 1', 'Keyword 2', 'Co-occurrences'],
+             self.processor.get_keyword_correlations(top_k=config.EXPORT_TOP_CORRELATIONS)),
+        ]
+
+    @staticmethod
+    def _iter_rows(df: pd.DataFrame) -> Iterator[List[Any]]:
+        """DataFrame rows as lists of plain values, converted one chunk at a time."""
+        for start in range(0, len(df), config.EXPORT_CHUNK_ROWS):
+            chunk = df.iloc[start:start + config.EXPORT_CHUNK_ROWS].astype(object)
+            chunk = chunk.where(chunk.notna(), None)
+            yield from ([_cell(value) for value in row] for row in chunk.itertuples(index=False, name=None))
+
+    @staticmethod
+    def _write_sheet(workbook: Workbook, name: str, header: List[str], rows: Iterable[Iterable[Any]]):
+        sheet, part, written = None, 1, EXCEL_MAX_ROWS
+        for row in rows:
+            if written == EXCEL_MAX_ROWS:
+                sheet = workbook.create_sheet(name if part == 1 else f"{name}_{part}")
+                sheet.append(header)
+                part, written = part + 1, 1
+            sheet.append(list(row))
+            written += 1
+        if sheet is None:
+            workbook.create_sheet(name).append(header)
+
     def export_text_reports(self, filename: str = None) -> List[str]:
-        if filename is None:
-            filename = f"unique_tags_{self.timestamp}.txt"
-    
-        filepath = os.path.join(config.OUTPUT_DIR, filename)
+        with self.run.lock('text'):
+            if filename is None:
+                existing = self.run.artifact('text')
+                if existing:
+                    return existing
+                filename = f"unique_tags_{self.timestamp}.txt"
+        
+            filepath = os.path.join(self.output_dir, filename)
 
-        unique_tags = sorted(self.processor.get_unique_tags())
-        report = ",".join(unique_tags)
+            unique_tags = sorted(self.processor.get_unique_tags())
+            report = ",".join(unique_tags)
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(report)
+            with _atomic_write(filepath) as temporary:
+                with open(temporary, 'w', encoding='utf-8') as f:
+                    f.write(report)
+            self.run.record('text', [filepath])
 
         return [filepath]
-
-    def _clear_output_dir(self):
-        for filename in os.listdir(config.OUTPUT_DIR):
-            filepath = os.path.join(config.OUTPUT_DIR, filename)
-            try:
-                if os.path.isfile(filepath) or os.path.islink(filepath):
-                    os.unlink(filepath)
-                elif os.path.isdir(filepath):
-                    shutil.rmtree(filepath) 
-            except Exception as e:
-                print(f"Failed to delete {filepath}: {e}")
\ No newline at end of file
@@ -1,8 +1,18 @@
-import json
-from typing import List, Dict
+import heapq
+from typing import List, Dict, Optional
+import pyarrow as pa
+from columnar_store import columnar_format, read_table, search_dataset
+from dataset_cache import dataset_cache
+from sqlite_store import GigDatabase, is_sqlite
+from ingest import iter_gigs
+from search_index import SearchIndex, score_gig
+from sketches import GigSketch
 import config
 
 class Fetcher:
+    def __init__(self, dataset_path: str = config.DATASET_PATH):
+        self.dataset_path = dataset_path
+
     def match_score(self, gig: Dict, keywords: List[str]) -> int:
         text = (
             gig.get("title", "") + " " +
@@ -11,11 +21,60 @@ class Fetcher:
         ).lower()
         return sum(1 for kw in keywords if kw.lower() in text)
 
+    def get_index(self) -> SearchIndex:
+        # Parsed once per process and shared by every session
+        return dataset_cache.get_index(self.dataset_path)
+
+    def get_database(self) -> GigDatabase:
+        # Opened once per process and shared by every session
+        return dataset_cache.get_database(self.dataset_path)
+
     def fetch_mock_data(self, keywords: List[str]) -> List[Dict[str, any]]:
-        with open('sample-gigs-data.json', 'r', encoding='utf-8') as file:
-            gigs = json.load(file)
+        if is_sqlite(self.dataset_path):
+            # bm25-ranked FTS5 query; the store is never loaded as a whole
+            return self.get_database().search(keywords, config.NUMBER_OF_GIGS)
+        if columnar_format(self.dataset_path):
+            # Keyword filter pushed into the scan, ranked in Arrow; only the top gigs become dicts
+            return search_dataset(self.dataset_path, keywords, config.NUMBER_OF_GIGS)
+        if config.STREAMING_INGESTION:
+            return self.fetch_streaming(keywords)
+
+        # Rank through the inverted index, keeping only the top gigs
+        return self.get_index().search(keywords, config.NUMBER_OF_GIGS)
+
+    def fetch_streaming(self, keywords: List[str], path: Optional[str] = None,
+                        sketch: Optional[GigSketch] = None) -> List[Dict[str, any]]:
+        """Score gigs as they are read, holding only the top-N in memory.
+
+        With a ``sketch``, every gig matching at least one keyword is also
+        summarized into it, a batch at a time.
+        """
+        heap = []
+        matched = []
+        for position, gig in enumerate(iter_gigs(path or self.dataset_path)):
+            entry = (score_gig(gig, keywords), -position, gig)
+            if len(heap) < config.NUMBER_OF_GIGS:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+            if sketch is not None and entry[0]:
+                matched.append(gig)
+                if len(matched) >= config.SKETCH_BATCH_SIZE:
+                    sketch.update(matched)
+                    matched = []
+        if sketch is not None:
+            sketch.update(matched)
+
+        return [gig for _, _, gig in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
 
-        # Sort with keyword-aware score
-        sorted_gigs = sorted(gigs, key=lambda gig: self.match_score(gig, keywords), reverse=True)
+    def fetch_table(self, keywords: Optional[List[str]] = None, tags: Optional[List[str]] = None,
+                    columns: Optional[List[str]] = None) -> pa.Table:
+        """Matching gigs of a Parquet/Arrow dataset as a table for ``DataProcessor``.
 
-        return sorted_gigs[:config.NUMBER_OF_GIGS]
+        Keyword (substring, as in ``match_score``) and exact tag filters and
+        the column projection are applied while scanning the file.
+        """
+        if not columnar_format(self.dataset_path):
+            raise ValueError(f"{self.dataset_path} is not a Parquet or Arrow dataset")
+        return read_table(self.dataset_path, columns=columns, keywords=keywords, tags=tags)
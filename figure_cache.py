@@ -0,0 +1,102 @@
+import functools
+import inspect
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+import plotly.graph_objects as go
+import plotly.io as pio
+import config
+
+FigureKey = Tuple[str, str, str]
+
+
+class FigureCache:
+    """Process-wide cache of rendered Plotly figures.
+
+    Entries are keyed by the dataset fingerprint, the chart and its
+    parameters, so a rerun, tab switch or widget change that asks for a
+    chart it has already drawn skips both the processor queries and the
+    figure construction. Figures are held as their JSON serialization, which
+    is what Streamlit sends to the browser anyway, and its length is the
+    entry size; once the total exceeds ``max_bytes`` the least recently
+    used figures are evicted. Every call returns a fresh ``go.Figure``, so
+    callers may modify it freely.
+    """
+
+    def __init__(self, max_bytes: int = config.FIGURE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[FigureKey, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key: FigureKey, build: Callable[[], go.Figure]) -> go.Figure:
+        with self._lock:
+            serialized = self._entries.get(key)
+            if serialized is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if serialized is None:
+            serialized = build().to_json()
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = serialized
+                    self._bytes += len(serialized)
+                self._entries.move_to_end(key)
+                self._evict()
+        return pio.from_json(serialized, skip_invalid=True)
+
+    def invalidate(self, fingerprint: str = None):
+        """Drop every figure, or only those drawn from one dataset."""
+        with self._lock:
+            for key in [key for key in self._entries if fingerprint is None or key[0] == fingerprint]:
+                self._bytes -= len(self._entries.pop(key))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+    def _evict(self):
+        # Never evict the most recently used entry, even if it alone is too big
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, serialized = self._entries.popitem(last=False)
+            self._bytes -= len(serialized)
+            self.evictions += 1
+
+
+figure_cache = FigureCache()
+
+
+def cached_figure(method: Callable[..., go.Figure]) -> Callable[..., go.Figure]:
+    """Serve a ``Visualizer`` chart method from ``figure_cache``.
+
+    Arguments are bound with their defaults applied, so ``chart()`` and
+    ``chart(top_n=10)`` share an entry when 10 is the default. Processors
+    without a ``get_fingerprint`` (e.g. sketches) are drawn uncached.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs) -> go.Figure:
+        fingerprint = getattr(self.processor, 'get_fingerprint', None)
+        if fingerprint is None:
+            return method(self, *args, **kwargs)
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        parameters: Dict[str, Any] = dict(list(bound.arguments.items())[1:])
+        key = (fingerprint(), method.__qualname__, json.dumps(parameters, sort_keys=True, default=str))
+        return figure_cache.get_or_create(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
@@ -1,62 +1,47 @@
+import asyncio
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
-
-def scrape_gig_details(url, data):
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-    }
-    response = requests.get(f"https://www.fiverr.com{url}", headers=headers)
-
-    if response.ok:
-        soup = BeautifulSoup(response.text, 'html.parser')
-        gig_overview = soup.find('div', class_='gig-overview')
-        title = gig_overview.find("h1").string
-        number_of_order = soup.find('span', class_='rating-count-number').string
-        price = soup.find('span', class_='price').string.replace("US$", "")
-
-        tag_list = []
-        tags_container = soup.find("div", class_='gig-tags-container')
-        if tags_container:
-            tags = tags_container.find("ul").find_all("li")
-            for tag in tags:
-                tag_text = tag.find("a").text
-                tag_list.append(tag_text)
-
-        with open('keyword.txt', 'a') as file:
-            file.write(f"{','.join(tag_list)},")
-
-        data.append([title, number_of_order, price, ', '.join(tag_list)])
-
-        output = "{:<50} {:<10} {:<10} {}".format(title[:50], number_of_order[:10], price[:10], ', '.join(tag_list))
-        print(output)
-    else:
-        print("Failed to retrieve Details.")
-
-def scrape_fiverr_gigs(keyword):
-    url = f"https://www.fiverr.com/search/gigs?query={keyword}"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-    }
-    response = requests.get(url, headers=headers)
+from crawl_store import CrawlStore
+from scraper import AsyncGigScraper
+from scrape_cache import ScrapeCache
+
+async def scrape_fiverr_gigs(keyword, resume=True):
+    cache = ScrapeCache()
+    store = CrawlStore.for_keyword(keyword).open(resume)
+    if store.resumed:
+        print(f"Resuming crawl with {store.resumed} gigs already in {store.path}")
+
+    with store:
+        async with AsyncGigScraper(cache=cache) as scraper:
+            async for gig in scraper.scrape(keyword, skip=store.done):
+                store.append(gig)
+
+                output = "{:<50} {:<10} {:<10} {}".format(
+                    gig['title'][:50], str(gig['completed_orders'])[:10], str(gig['price'])[:10], ', '.join(gig['tags'])
+                )
+                print(output)
+
+    if not store.count:
+        print("Failed to retrieve List")
+
+    stats = cache.stats()
+    print(f"Cache: {stats['hits']} hits, {stats['revalidated']} revalidated, {stats['misses']} downloaded "
+          f"({stats['hit_rate']:.0%} hit rate), {stats['parsed_hits']} parses skipped, "
+          f"{stats['evictions']} evicted, {stats['bytes'] / 2 ** 20:.1f} MiB on disk")
 
+    # Exports are built from the store, so a resumed crawl writes every gig once
     data = []
-    if response.ok:
-        soup = BeautifulSoup(response.text, 'html.parser')
-        gigs = soup.find_all('div', class_='gig-wrapper')
-        
-        for gig in gigs:
-            title = gig.find('p', role='heading').string
-            url = title.parent.parent.get("href").split('?')[0]
-            scrape_gig_details(url, data)
-    else:
-        print("Failed to retrieve List")
-    
+    with open('keyword.txt', 'a') as file:
+        for gig in store.iter_gigs():
+            file.write(f"{','.join(gig['tags'])},")
+            data.append([gig['title'], gig['completed_orders'], gig['price'], ', '.join(gig['tags'])])
+
     # Create DataFrame
     df = pd.DataFrame(data, columns=['Title', 'Number of Orders', 'Price', 'Tags'])
-    
+
     # Export to Excel
     df.to_excel('gig_details.xlsx', index=False)
+    print(f"Saved {store.count} gigs to {store.path}")
 
-keyword = input("Enter keyword to search Fiverr gigs: ")
-scrape_fiverr_gigs(keyword)
\ No newline at end of file
+if __name__ == "__main__":
+    keyword = input("Enter keyword to search Fiverr gigs: ")
+    asyncio.run(scrape_fiverr_gigs(keyword))
@@ -0,0 +1,102 @@
+import gzip
+import io
+import json
+from typing import Iterator, List, Dict, Any, TextIO
+import zstandard
+from columnar_store import columnar_format, iter_table_gigs, read_table
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+CHUNK_SIZE = 1 << 16
+
+
+def open_dataset(path: str) -> TextIO:
+    """Open a gig dump as text, decompressing gzip/zstd inputs on the fly."""
+    with open(path, 'rb') as file:
+        magic = file.read(4)
+
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.open(path, 'rt', encoding='utf-8-sig')
+    if magic.startswith(ZSTD_MAGIC):
+        raw = open(path, 'rb')
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8-sig')
+    return open(path, 'r', encoding='utf-8-sig')
+
+
+def iter_gigs(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield gigs one by one from a JSON array, an NDJSON/JSONL file or a Parquet/Arrow store."""
+    if columnar_format(path):
+        yield from iter_table_gigs(path)
+        return
+
+    with open_dataset(path) as file:
+        head = file.read(CHUNK_SIZE)
+        stripped = head.lstrip()
+
+        if stripped.startswith('['):
+            yield from _iter_json_array(file, stripped[1:])
+        else:
+            yield from _iter_json_lines(file, head)
+
+
+def load_gigs(path: str) -> List[Dict[str, Any]]:
+    """Load a whole gig dump into memory, in any format ``iter_gigs`` reads."""
+    if columnar_format(path):
+        return read_table(path).to_pylist()
+
+    with open_dataset(path) as file:
+        text = file.read()
+
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _iter_json_lines(file: TextIO, head: str) -> Iterator[Dict[str, Any]]:
+    lines = (head + file.readline()).splitlines()
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+    for line in file:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_json_array(file: TextIO, buffer: str) -> Iterator[Dict[str, Any]]:
+    decoder = json.JSONDecoder()
+    pos = 0
+    eof = False
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+
+        if pos >= len(buffer) or not eof and len(buffer) - pos < CHUNK_SIZE:
+            # Keep at least one chunk ahead so a gig is never split mid-decode
+            buffer = buffer[pos:]
+            pos = 0
+            if not eof:
+                chunk = file.read(CHUNK_SIZE)
+                eof = not chunk
+                buffer += chunk
+                continue
+            if not buffer:
+                raise ValueError("Unterminated JSON array in gig dataset")
+
+        if buffer[pos] == ']':
+            return
+
+        try:
+            gig, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = file.read(CHUNK_SIZE)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+
+        yield gig
+        pos = end
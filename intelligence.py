@@ -1,37 +1,333 @@
+import asyncio
+import hashlib
 import os
-from langchain_google_genai import ChatGoogleGenerativeAI
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
-from typing import List, Dict, Any
-from decouple import config
-import streamlit as st
+from typing import List, Dict, Any, Iterator, Optional
+from llm_cache import ResponseCache
+from prompt_compaction import compact_gigs, estimate_tokens
+from processor import DataProcessor
+import config
+
+FAKE_RESPONSE = (
+    "Title: Professional Web Design and Logo Services\n"
+    "Description: Offline stand-in response from the fake model.\n"
+    "Keywords: web design, logo design, branding, seo, digital marketing"
+)
+
+
+def google_api_key() -> str:
+    """Read on first use, so importing this module or using the fake model needs no secrets."""
+    from decouple import config as env_config
+    import streamlit as st
+
+    try:
+        return st.secrets["GOOGLE_API_KEY"]
+    except (KeyError, FileNotFoundError):
+        return env_config('GOOGLE_API_KEY')
+
+
+def fake_model(responses: Optional[List[str]] = None, sleep: Optional[float] = None) -> FakeListChatModel:
+    """Offline chat model cycling through canned ``responses``; streams one character per chunk."""
+    return FakeListChatModel(responses=responses or [FAKE_RESPONSE], sleep=sleep)
+
+
+class GenerationJob:
+    """One response being streamed on a background thread.
+
+    ``text`` grows as chunks arrive, so a UI can poll it; ``status`` is
+    'running', 'done' or 'failed'. Map-reduce jobs count their summary
+    calls in ``summaries`` and the ones left out in ``failed_summaries``.
+    """
+
+    def __init__(self, key: str, text: str = '', done: bool = False):
+        self.key = key
+        self.text = text
+        self.error: Optional[str] = None
+        self.summaries = 0
+        self.failed_summaries = 0
+        self._done = threading.Event()
+        if done:
+            self._done.set()
+
+    @property
+    def status(self) -> str:
+        if not self._done.is_set():
+            return 'running'
+        return 'failed' if self.error is not None else 'done'
+
+    def run(self, chunks: Iterator[str]):
+        try:
+            for chunk in chunks:
+                self.text += chunk
+        except Exception as exception:
+            print("Error generating content: "
+                  + ''.join(traceback.format_exception(type(exception), exception, exception.__traceback__)))
+            self.error = str(exception)
+        finally:
+            self._done.set()
+
+    def wait(self, timeout: float = None) -> str:
+        self._done.wait(timeout)
+        return self.text
+
+
+def gig_records(gig_data) -> List[Dict[str, Any]]:
+    """Gig dicts from a processor, a DataFrame or a list; a processor's carry their ``gig_id``."""
+    if isinstance(gig_data, DataProcessor):
+        return gig_data.get_dataframe().rename_axis('gig_id').reset_index().to_dict(orient="records")
+    if hasattr(gig_data, "to_dict"):
+        gig_data = gig_data.to_dict(orient="records")
+    return gig_data
+
+
+def chunk_gigs(gigs: List[Dict[str, Any]], target: int = config.LLM_MAP_CHUNK_GIGS) -> List[List[Dict[str, Any]]]:
+    """Split gigs into chunks of about ``target`` with content-defined boundaries.
+
+    A chunk ends after a gig whose content hash is 0 modulo ``target``
+    (chunks stay between a quarter and twice ``target``). Inserting, editing
+    or removing a gig therefore moves at most the boundaries around it, and
+    every other chunk, and its cached summary, stays the same.
+    """
+    chunks, chunk = [], []
+    for gig in gigs:
+        chunk.append(gig)
+        digest = hashlib.sha1(f"{gig['title']}\x1f{gig['description']}\x1f{gig['tags']}".encode('utf-8')).digest()
+        boundary = int.from_bytes(digest[:8], 'big') % target == 0
+        if (boundary and len(chunk) >= max(target // 4, 1)) or len(chunk) >= 2 * target:
+            chunks.append(chunk)
+            chunk = []
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+_executor = ThreadPoolExecutor(max_workers=config.LLM_WORKERS, thread_name_prefix='llm')
+# Jobs still streaming, by cache key, so reruns and other sessions join them
+_running: Dict[str, GenerationJob] = {}
+_running_lock = threading.Lock()
 
-# GOOGLE_API_KEY = config('GOOGLE_API_KEY')
-GOOGLE_API_KEY = st.secrets["GOOGLE_API_KEY"]
 
 class Intelligence:
-    def __init__(self):
-        self.model = ChatGoogleGenerativeAI(model="gemini-2.0-flash", api_key=GOOGLE_API_KEY)
+    """SEO metadata from a chat model, cached on disk by prompt and model.
+
+    The model is created on first use: the provider comes from
+    ``config.LLM_PROVIDER`` unless one is passed in (any LangChain chat
+    model, e.g. ``fake_model()`` for offline runs).
+    """
+
+    def __init__(self, model=None, model_name: str = None, cache: ResponseCache = None,
+                 token_budget: int = config.LLM_PROMPT_TOKEN_BUDGET):
+        self._model = model
+        self.token_budget = token_budget
+        if model_name is None and model is not None:
+            model_name = getattr(model, 'model', None) or type(model).__name__
+        elif model_name is None:
+            model_name = 'fake' if config.LLM_PROVIDER == 'fake' else config.LLM_MODEL
+        self.model_name = model_name
+        self.cache = cache or ResponseCache()
+
+    @property
+    def model(self):
+        if self._model is None:
+            if config.LLM_PROVIDER == 'fake':
+                self._model = fake_model()
+            else:
+                # Imported here so the fake provider works without the Gemini client installed
+                from langchain_google_genai import ChatGoogleGenerativeAI
+                self._model = ChatGoogleGenerativeAI(model=config.LLM_MODEL, api_key=google_api_key())
+        return self._model
 
     def generate_optimized_metadata(self, gig_data: List[Dict[str, any]]) -> Dict[str, str]:
-        if hasattr(gig_data, "to_dict"):
-            gig_data = gig_data.to_dict(orient="records")
-        messages  = self._build_prompt(gig_data)
+        messages = self._build_prompt(gig_data)
+        key = self.cache.key(self.model_name, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
 
         try:
             response = self.model.invoke(messages)
-            return response.content if hasattr(response, "content") else str(response)
+            content = response.content if hasattr(response, "content") else str(response)
         except Exception as exception:
             print(f"Error generating content: {exception}")
             return "Error generating content"
+        self.cache.put(key, content, self.model_name)
+        return content
 
-    def _build_prompt(self, gigs: List[Dict[str, any]]) -> str:
-        example_input = "\n\n".join([
-            f"Title: {gig['title']}\n"
-            f"Description: {gig['description']}\n"
-            f"Tags: {gig['tags']}"
-            for gig in gigs
-        ])
+    def stream_optimized_metadata(self, gig_data: List[Dict[str, any]]) -> Iterator[str]:
+        """Yield the response as it is generated; a cached response comes as one chunk."""
+        messages = self._build_prompt(gig_data)
+        key = self.cache.key(self.model_name, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        yield from self._stream(key, messages)
+
+    def _stream(self, key: str, messages: list) -> Iterator[str]:
+        parts = []
+        for chunk in self.model.stream(messages):
+            content = chunk.content if hasattr(chunk, "content") else str(chunk)
+            parts.append(content)
+            yield content
+        # Only complete responses are cached
+        self.cache.put(key, ''.join(parts), self.model_name)
+
+    def start_generation(self, gig_data: List[Dict[str, any]], map_reduce: bool = None) -> GenerationJob:
+        """Generate in the background and return a job to poll.
+
+        A cached response returns an already finished job, and a request
+        identical to one still streaming joins that job instead of calling
+        the model again. ``map_reduce`` defaults to on from
+        ``LLM_MAP_REDUCE_MIN_GIGS`` gigs.
+        """
+        if map_reduce is None:
+            map_reduce = len(gig_data.get_dataframe() if isinstance(gig_data, DataProcessor) else gig_data) \
+                >= config.LLM_MAP_REDUCE_MIN_GIGS
+        if map_reduce:
+            chunk_messages = self._chunk_messages(gig_data)
+            key = self.cache.key(self.model_name, [message for messages in chunk_messages for message in messages])
+            chunks = partial(self._stream_map_reduce, chunk_messages)
+        else:
+            messages = self._build_prompt(gig_data)
+            key = self.cache.key(self.model_name, messages)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return GenerationJob(key, cached, done=True)
+            chunks = partial(self._stream, key, messages)
+
+        with _running_lock:
+            job = _running.get(key)
+            if job is not None:
+                return job
+            job = _running[key] = GenerationJob(key)
+
+        if map_reduce:
+            chunks = partial(chunks, job=job)
+
+        def run():
+            try:
+                job.run(chunks())
+            finally:
+                with _running_lock:
+                    _running.pop(key, None)
+
+        _executor.submit(run)
+        return job
+
+    def generate_map_reduce(self, gig_data: List[Dict[str, any]]) -> str:
+        """Metadata for gig sets too large for one prompt.
+
+        Chunks of gigs are summarized concurrently (map), summaries are
+        combined until they fit the token budget, and one final call
+        writes the title, description and keywords (reduce). Every call
+        is cached, so a rerun on a mostly unchanged dataset only
+        summarizes the chunks that changed.
+        """
+        return ''.join(self.stream_map_reduce(gig_data))
+
+    def stream_map_reduce(self, gig_data: List[Dict[str, any]]) -> Iterator[str]:
+        """``generate_map_reduce`` with the final call streamed."""
+        return self._stream_map_reduce(self._chunk_messages(gig_data))
+
+    def _chunk_messages(self, gig_data) -> List[list]:
+        gigs = gig_records(gig_data)
+        return [
+            self._summary_prompt(self._compact_chunk(gig_data, chunk), f"{len(chunk)} gigs")
+            for chunk in chunk_gigs(gigs)
+        ]
+
+    def _compact_chunk(self, gig_data, chunk: List[Dict[str, Any]]) -> str:
+        if isinstance(gig_data, DataProcessor):
+            # Summarized from the processor's own rows and tag codes
+            return compact_gigs(gig_data, self.token_budget, gig_ids=[gig['gig_id'] for gig in chunk])
+        return compact_gigs(chunk, self.token_budget)
+
+    def _stream_map_reduce(self, chunk_messages: List[list], job: GenerationJob = None) -> Iterator[str]:
+        if not chunk_messages:
+            return
+        summaries = asyncio.run(self._map(chunk_messages, job))
+        # Combine summaries until they fit one prompt
+        while len(summaries) > 1 and estimate_tokens("\n\n".join(summaries)) > self.token_budget:
+            groups, group = [], []
+            for summary in summaries:
+                if len(group) > 1 and estimate_tokens("\n\n".join(group + [summary])) > self.token_budget:
+                    groups.append(group)
+                    group = []
+                group.append(summary)
+            groups.append(group)
+            summaries = asyncio.run(self._map([
+                self._summary_prompt("\n\n".join(group), f"{len(group)} partial summaries") for group in groups
+            ], job))
+
+        messages = self._build_prompt(None, example_input="\n\n".join(
+            f"Summary {number}:\n{summary}" for number, summary in enumerate(summaries, start=1)
+        ))
+        key = self.cache.key(self.model_name, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        yield from self._stream(key, messages)
+
+    async def _map(self, prompts: List[list], job: GenerationJob = None) -> List[str]:
+        """Summaries of ``prompts`` in order, at most ``LLM_MAP_CONCURRENCY`` calls at a time.
+
+        Calls that fail or exceed ``LLM_MAP_TIMEOUT_SECONDS`` are left out
+        (and not cached) and counted on ``job``. If every call fails the
+        error is raised; if more than ``LLM_MAP_MAX_FAILED_FRACTION`` of
+        them do, a ``RuntimeError`` is.
+        """
+        semaphore = asyncio.Semaphore(config.LLM_MAP_CONCURRENCY)
+        results = await asyncio.gather(*(self._summarize(messages, semaphore) for messages in prompts),
+                                       return_exceptions=True)
+        summaries = [result for result in results if not isinstance(result, BaseException)]
+        failures = [result for result in results if isinstance(result, BaseException)]
+        if job is not None:
+            job.summaries += len(results)
+            job.failed_summaries += len(failures)
+        if failures:
+            print(f"{len(failures)} of {len(results)} summaries failed: {failures[0]!r}")
+            if not summaries:
+                raise failures[0]
+            if len(failures) > config.LLM_MAP_MAX_FAILED_FRACTION * len(results):
+                raise RuntimeError(f"{len(failures)} of {len(results)} summaries failed") from failures[0]
+        return summaries
+
+    async def _summarize(self, messages: list, semaphore: asyncio.Semaphore) -> str:
+        key = self.cache.key(self.model_name, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        async with semaphore:
+            response = await asyncio.wait_for(self.model.ainvoke(messages), config.LLM_MAP_TIMEOUT_SECONDS)
+        content = response.content if hasattr(response, "content") else str(response)
+        self.cache.put(key, content, self.model_name)
+        return content
+
+    def _summary_prompt(self, example_input: str, subject: str) -> list:
+        return [
+            SystemMessage(content=(
+                "You're an expert SEO content strategist summarizing part of a larger gig dataset. "
+                "Only respond with the summary. Do not include any explanation or intro text."
+            )),
+            HumanMessage(content=(
+                f"Summarize the following {subject} in at most 150 words: the services offered, "
+                "recurring keywords and tags, pricing and positioning signals, and the strongest selling points.\n\n"
+                "### Input:\n"
+                f"{example_input}"
+            )),
+        ]
+
+    def _build_prompt(self, gigs, example_input: str = None) -> str:
+        if example_input is None:
+            # Full listing while it fits the token budget, a summary of the gigs beyond it
+            example_input = compact_gigs(gigs, self.token_budget)
 
         chat_prompt_template = ChatPromptTemplate.from_messages([
             SystemMessage(content=(
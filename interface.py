@@ -4,8 +4,10 @@ from datetime import datetime
 import os
 from visualizer import Visualizer
 from intelligence import Intelligence
+from sketches import GigSketch
 import io
 import zipfile
+import config
 
 class Interface:
     def show_welcome_screen(self):
@@ -31,12 +33,17 @@ class Interface:
         processor = st.session_state.processor
         visualizer = Visualizer(processor)
         intelligence = Intelligence()
+        # Sketch mode: approximate summaries over every match, no gig rows
+        sketched = isinstance(processor, GigSketch)
+        gigs_summary = processor.get_summary_statistics()
+        if sketched:
+            st.caption("Approximate statistics over all matching gigs (sketch mode).")
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
             st.metric(
                 label="Total Gigs",
-                value=len(st.session_state.gigs_data),
+                value=gigs_summary['total_gigs'],
                 delta=None
             )
     
@@ -49,7 +56,6 @@ class Interface:
             )
     
         with col3:
-            gigs_summary = processor.get_summary_statistics()
             st.metric(
                 label="Total Tags",
                 value=f"{gigs_summary['total_tags']:,}",
@@ -57,10 +63,9 @@ class Interface:
             )
     
         with col4:
-            unique_tags = len(processor.get_unique_tags())
             st.metric(
                 label="Unique Tags",
-                value=unique_tags,
+                value=gigs_summary['unique_tags'],
                 delta=None
             )
 
@@ -71,20 +76,27 @@ class Interface:
         ])
 
         with tab1:
-            self._show_overview_tab(processor)
+            self._show_overview_tab(processor, sketched)
         with tab2:
-            self._show_keywords_tab(processor, visualizer)
+            self._show_keywords_tab(processor, visualizer, sketched)
         with tab3:
-            self._show_price_analysis(processor, visualizer)
+            if sketched:
+                st.info("Price charts need the individual gigs; see the Overview tab for price statistics.")
+            else:
+                self._show_price_analysis(processor, visualizer)
         with tab4:
-            self._show_ai_recommendation(processor, intelligence)
+            if sketched:
+                st.info("AI recommendations are not available in sketch mode.")
+            else:
+                self._show_ai_recommendation(processor, intelligence)
         with tab5:
             self._show_downloads_tab()
 
-    def _show_overview_tab(self, processor):
+    def _show_overview_tab(self, processor, sketched=False):
         st.subheader("Data Overview")
-        df = processor.get_dataframe()
-        st.dataframe(df.head(10), use_container_width=True)
+        if not sketched:
+            df = processor.get_dataframe()
+            st.dataframe(df.head(10), use_container_width=True)
 
         col1, col2 = st.columns(2)
 
@@ -100,7 +112,7 @@ class Interface:
             for key, value in order_stats.items():
                 st.write(f"**{key.title()}**: {value:,.0f}")
     
-    def _show_keywords_tab(self, processor, visualizer):
+    def _show_keywords_tab(self, processor, visualizer, sketched=False):
         st.subheader("Keyword Analysis")
         col1, col2 = st.columns(2)
 
@@ -114,9 +126,10 @@ class Interface:
             keyword_dist_fig = visualizer.create_keyword_distribution_pie()
             st.plotly_chart(keyword_dist_fig, use_container_width=True)
     
-        st.subheader("Keyword Correlations")
-        correlation_fig = visualizer.create_keyword_correlation_chart()
-        st.plotly_chart(correlation_fig, use_container_width=True)
+        if not sketched:
+            st.subheader("Keyword Correlations")
+            correlation_fig = visualizer.create_keyword_correlation_chart()
+            st.plotly_chart(correlation_fig, use_container_width=True)
 
         st.subheader("Keyword Frequency Table")
         keyword_freq = processor.get_keyword_frequency()
@@ -126,61 +139,107 @@ class Interface:
     def _show_downloads_tab(self):
         st.subheader("Download Reports")
     
-        if 'export_files' not in st.session_state:
+        if not st.session_state.get('export_jobs'):
             st.info("No export files available. Please run the analysis first.")
             return
+
+        jobs = st.session_state.export_jobs
+        polling = any(job.status == 'running' for job in jobs)
+
+        # Only this fragment reruns while exports are still being written
+        @st.fragment(run_every=config.EXPORT_POLL_SECONDS if polling else None)
+        def show_export_jobs():
+            export_files = []
+            for job in jobs:
+                if job.status == 'running':
+                    st.info(f"⏳ Preparing {job.label}...")
+                elif job.status == 'failed':
+                    st.error(f"{job.label} failed: {job.error}")
+                elif job.status == 'cancelled':
+                    st.warning(f"{job.label} was cancelled.")
+                else:
+                    export_files.extend(job.files)
+
+            if polling and all(job.status != 'running' for job in jobs):
+                # Everything finished; rerun once so the fragment stops polling
+                st.rerun()
+
+            for file_path in export_files:
+                if os.path.exists(file_path):
+                    file_name = os.path.basename(file_path)
+                    with open(file_path, 'rb') as f:
+                        st.download_button(
+                            label=f"📄 Download {file_name}",
+                            data=f.read(),
+                            file_name=file_name,
+                            mime='application/octet-stream'
+                        )
     
-        for file_path in st.session_state.export_files:
-            if os.path.exists(file_path):
-                file_name = os.path.basename(file_path)
-                with open(file_path, 'rb') as f:
-                    st.download_button(
-                        label=f"📄 Download {file_name}",
-                        data=f.read(),
-                        file_name=file_name,
-                        mime='application/octet-stream'
-                    )
-    
-        if st.button("📦 Download All Files (ZIP)"):
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for file_path in st.session_state.export_files:
-                    if os.path.exists(file_path):
-                        zip_file.write(file_path, os.path.basename(file_path))
-
-            zip_buffer.seek(0)
-            st.download_button(
-                label="📦 Download ZIP File",
-                data=zip_buffer.getvalue(),
-                file_name=f"gig_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
-                mime='application/zip'
-            )
+            if export_files and st.button("📦 Download All Files (ZIP)"):
+                zip_buffer = io.BytesIO()
+                with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                    for file_path in export_files:
+                        if os.path.exists(file_path):
+                            zip_file.write(file_path, os.path.basename(file_path))
+
+                zip_buffer.seek(0)
+                st.download_button(
+                    label="📦 Download ZIP File",
+                    data=zip_buffer.getvalue(),
+                    file_name=f"gig_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
+                    mime='application/zip'
+                )
+
+        show_export_jobs()
 
     def _show_price_analysis(self, processor, visualizer):
         st.subheader("Pricing Analysis")
+        mode = st.session_state.get('chart_mode', 'auto')
         col1, col2 = st.columns(2)
 
         with col1:
             st.subheader("Price Distribution")
-            price_dist_fig = visualizer.create_price_distribution_chart()
+            price_dist_fig = visualizer.create_price_distribution_chart(mode=mode)
             st.plotly_chart(price_dist_fig, use_container_width=True)
 
         with col2:
             st.subheader("Price vs Orders")
-            price_orders_fig = visualizer.create_price_vs_orders_scatter()
+            price_orders_fig = visualizer.create_price_vs_orders_scatter(mode=mode)
             st.plotly_chart(price_orders_fig, use_container_width=True)
 
     def _show_ai_recommendation(self, processor, intelligence):
         st.subheader("AI Recommendation")
-    
-        with st.spinner("Generating SEO-optimized content..."):
-            response = intelligence.generate_optimized_metadata(processor.get_dataframe())
-    
-        if isinstance(response, str):
-            if "Title:" in response and "Description:" in response:
+
+        # One generation per analysed dataset; reruns and tab switches poll it
+        fingerprint = processor.get_fingerprint()
+        job = st.session_state.get('ai_job')
+        if job is None or st.session_state.get('ai_job_fingerprint') != fingerprint:
+            job = intelligence.start_generation(processor)
+            st.session_state.ai_job = job
+            st.session_state.ai_job_fingerprint = fingerprint
+        polling = job.status == 'running'
+
+        @st.fragment(run_every=config.LLM_POLL_SECONDS if polling else None)
+        def show_generation():
+            if job.status == 'running':
+                if job.text:
+                    st.markdown(job.text.strip("`") + " ▌")
+                else:
+                    st.info("⏳ Generating SEO-optimized content...")
+                return
+            if polling:
+                # Finished; rerun once so the fragment stops polling
+                st.rerun()
+
+            response = job.text
+            if job.status == 'failed':
+                st.error(f"Error generating content: {job.error}")
+                if st.button("🔄 Retry"):
+                    st.session_state.ai_job = None
+                    st.rerun()
+            elif "Title:" in response and "Description:" in response:
                 st.markdown(response.strip("`").strip())
             else:
                 st.text(response)
-        else:
-            st.error("Unexpected response format from the AI model.")
 
+        show_generation()
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Optional
+import config
+
+
+def _message_record(message: Any) -> Dict[str, str]:
+    if isinstance(message, str):
+        return {'type': 'human', 'content': message}
+    return {'type': getattr(message, 'type', type(message).__name__), 'content': str(message.content)}
+
+
+class ResponseCache:
+    """On-disk cache of model responses, keyed by model name and prompt.
+
+    The key is a SHA-256 of the model name and the prompt messages (type and
+    content of each), so any change to the prompt or the model is a miss.
+    Each response is one small JSON file; entries older than ``ttl`` are
+    ignored and deleted when next read.
+    """
+
+    def __init__(self, directory: str = config.LLM_CACHE_DIR, ttl: float = config.LLM_CACHE_TTL_SECONDS):
+        self.directory = directory
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Generation jobs read the cache from several threads at once
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(model: str, messages: Iterable[Any]) -> str:
+        payload = json.dumps({'model': model, 'messages': [_message_record(message) for message in messages]},
+                             sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[str]:
+        """The cached response if it is still within the TTL."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return None
+        if time.time() - entry['created_at'] >= self.ttl:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        return entry['content']
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, key: str, content: str, model: str = None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'model': model, 'created_at': time.time(), 'content': content}, file)
+        os.replace(temporary, path)
+
+    def purge(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        removed = 0
+        now = time.time()
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    with open(path, 'r', encoding='utf-8') as file:
+                        expired = now - json.load(file)['created_at'] >= self.ttl
+                except (OSError, ValueError, KeyError):
+                    expired = name.endswith('.tmp')
+                if expired:
+                    try:
+                        os.unlink(path)
+                        removed += 1
+                    except OSError:
+                        pass
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {'hits': hits, 'misses': misses, 'hit_rate': hits / lookups if lookups else 0.0}
@@ -1,6 +1,7 @@
 import streamlit as st
 from interface import Interface
 from analyzer import Analyzer
+import config
 
 st.set_page_config(
     page_title="GigAnalyzer",
@@ -65,6 +66,15 @@ def main():
         include_price_analysis = st.checkbox("Price Trend Analysis", value=True)
         include_correlation = st.checkbox("Keyword Correlation", value=True)
         include_advanced_charts = st.checkbox("Advanced Visualizations", value=True)
+        # Read by the results page on every rerun, so switching needs no new analysis
+        st.selectbox(
+            "Price Chart Rendering",
+            config.CHART_RENDER_MODES,
+            key='chart_mode',
+            format_func={'auto': "Auto", 'raw': "Every gig", 'aggregated': "Aggregated"}.get,
+            help=f"Aggregated bins prices and draws a density map with a sample of gigs; "
+                 f"Auto aggregates from {config.CHART_AGGREGATE_MIN_POINTS:,} gigs"
+        )
 
         st.subheader("Export Options")
         export_excel = st.checkbox("Excel Report", value=True)
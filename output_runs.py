@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import config
+
+MANIFEST = 'manifest.json'
+
+_locks: Dict[Tuple[str, str], threading.Lock] = {}
+# Run directory -> RunDirectory handles and queued jobs still using it
+_references: Dict[str, int] = {}
+_locks_guard = threading.Lock()
+_last_cleanup = 0.0
+_cleanup_guard = threading.Lock()
+TOMBSTONE_SUFFIX = '.deleting'
+
+
+def content_hash(fingerprint: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Key for the analysed gigs (``DataProcessor.get_fingerprint``) and the options that shape the reports."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        'gigs': fingerprint,
+        'options': options or {},
+        'version': config.VERSION,
+        'top_correlations': config.EXPORT_TOP_CORRELATIONS,
+    }, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _lock(path: str, kind: str) -> threading.Lock:
+    with _locks_guard:
+        return _locks.setdefault((path, kind), threading.Lock())
+
+
+def _in_use(path: str) -> bool:
+    """Call with ``_locks_guard`` held."""
+    if _references.get(path):
+        return True
+    return any(lock.locked() for (locked_path, _), lock in _locks.items() if locked_path == path)
+
+
+def _claim(path: str) -> Optional[str]:
+    """Move an unused run out of the way and return its new (tombstone) path, or None if it is in use.
+
+    The check and the rename happen under ``_locks_guard``, like the retain
+    in ``RunDirectory.__init__``, so a session reusing the run either keeps
+    it or gets a fresh directory; the slow delete then runs unlocked.
+    """
+    root, name = os.path.split(path)
+    tombstone = os.path.join(root, f".{name}.{uuid.uuid4().hex[:8]}{TOMBSTONE_SUFFIX}")
+    with _locks_guard:
+        if _in_use(path):
+            return None
+        os.rename(path, tombstone)
+    return tombstone
+
+
+def _delete(path: str):
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    else:
+        os.unlink(path)
+
+
+class RunDirectory:
+    """Output directory shared by every analysis of the same gigs and options.
+
+    The directory is named after ``content_hash``, so identical analyses,
+    from any session, find the reports an earlier run already wrote. A
+    manifest maps each artifact kind to its file and lists the run ids that
+    used the directory; its mtime is the directory's last use for the janitor.
+
+    Creating a RunDirectory takes a reference on the directory, and so does
+    every ``retain``; the janitor leaves it alone until each is matched by a
+    ``release``. Queued exports retain it at submit time (see
+    ``ExportRunner.submit``), so a run cannot be deleted before its export starts.
+    """
+
+    def __init__(self, key: str, root: str = None):
+        self.key = key
+        self.run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.path = os.path.join(root or config.OUTPUT_DIR, key[:16])
+        self.retain()
+        os.makedirs(self.path, exist_ok=True)
+        self._manifest_path = os.path.join(self.path, MANIFEST)
+        with self.lock(MANIFEST):
+            manifest = self._read_manifest()
+            manifest['runs'] = (manifest['runs'] + [self.run_id])[-config.OUTPUT_MANIFEST_RUNS:]
+            self._write_manifest(manifest)
+
+    def retain(self):
+        with _locks_guard:
+            _references[self.path] = _references.get(self.path, 0) + 1
+
+    def release(self):
+        with _locks_guard:
+            remaining = _references.get(self.path, 0) - 1
+            if remaining > 0:
+                _references[self.path] = remaining
+            else:
+                _references.pop(self.path, None)
+
+    def lock(self, kind: str) -> threading.Lock:
+        """Held while an artifact is produced, so concurrent identical runs wait and reuse it."""
+        return _lock(self.path, kind)
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self._manifest_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {'key': self.key, 'runs': [], 'artifacts': {}}
+
+    def _write_manifest(self, manifest: Dict[str, Any]):
+        temporary = f"{self._manifest_path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(temporary, self._manifest_path)
+
+    def artifact(self, kind: str) -> Optional[List[str]]:
+        """Paths recorded for ``kind`` if they all still exist; call under ``lock(kind)``."""
+        names = self._read_manifest()['artifacts'].get(kind)
+        if not names:
+            return None
+        paths = [os.path.join(self.path, name) for name in names]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        os.utime(self._manifest_path)
+        return paths
+
+    def record(self, kind: str, paths: List[str]):
+        """Register finished artifact files; call under ``lock(kind)``."""
+        with self.lock(MANIFEST):
+            manifest = self._read_manifest()
+            manifest['artifacts'][kind] = [os.path.basename(path) for path in paths]
+            self._write_manifest(manifest)
+
+
+def _entry_size(path: str) -> int:
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(
+        os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names
+    )
+
+
+def _last_used(path: str) -> float:
+    manifest = os.path.join(path, MANIFEST)
+    return os.path.getmtime(manifest if os.path.exists(manifest) else path)
+
+
+def clean_output_dir(root: str = None, max_bytes: int = None, max_age: float = None,
+                     keep: str = None, force: bool = False) -> int:
+    """Janitor: drop runs unused for ``max_age`` seconds, then the least recently
+    used ones until the output directory fits in ``max_bytes``.
+
+    Runs still referenced (a RunDirectory in use or an export queued or in
+    progress) and ``keep`` are never removed. Unless ``force``, it runs at most once per
+    ``OUTPUT_CLEANUP_INTERVAL_SECONDS``. Returns the number of entries removed.
+    """
+    global _last_cleanup
+    now = time.time()
+    with _cleanup_guard:
+        if not force and now - _last_cleanup < config.OUTPUT_CLEANUP_INTERVAL_SECONDS:
+            return 0
+        _last_cleanup = now
+
+    root = root or config.OUTPUT_DIR
+    max_bytes = config.OUTPUT_MAX_BYTES if max_bytes is None else max_bytes
+    max_age = config.OUTPUT_MAX_AGE_SECONDS if max_age is None else max_age
+    if not os.path.isdir(root):
+        return 0
+
+    entries = []
+    for name in os.listdir(root):
+        if name.startswith('.'):
+            if name.endswith(TOMBSTONE_SUFFIX):
+                # Left behind by a janitor that was interrupted mid-delete
+                try:
+                    _delete(os.path.join(root, name))
+                except OSError:
+                    pass
+            continue
+        path = os.path.join(root, name)
+        try:
+            entries.append((_last_used(path), _entry_size(path), path))
+        except OSError:
+            continue
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for last_used, size, path in sorted(entries):
+        if now - last_used <= max_age and total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            tombstone = _claim(path)
+            if tombstone is None:
+                continue
+            _delete(tombstone)
+        except OSError as e:
+            print(f"Failed to delete {path}: {e}")
+            continue
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,58 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Union
+from columnar_store import columnar_format, read_table
+from ingest import load_gigs
+from processor import DataProcessor, ProcessorShard
+import config
+
+Shard = Union[str, List[Dict[str, Any]]]
+
+
+def _build_shard(shard: Shard) -> ProcessorShard:
+    if isinstance(shard, str):
+        gigs = read_table(shard) if columnar_format(shard) else load_gigs(shard)
+    else:
+        gigs = shard
+    # Build the co-occurrence product here so the parent only has to add them up.
+    # Gigs passed in are already in the parent; only rows read from a file go back.
+    return DataProcessor(gigs).to_shard(gig_chunks=isinstance(shard, str))
+
+
+def _split(source: List[Any], workers: int) -> List[Shard]:
+    if source and all(isinstance(item, str) for item in source):
+        return list(source)
+
+    # Contiguous shards keep first-seen tag order identical to a single pass
+    size = max(1, -(-len(source) // workers))
+    return [source[start:start + size] for start in range(0, len(source), size)] or [[]]
+
+
+def analyze_sharded(source: List[Any], workers: Optional[int] = config.ANALYSIS_WORKERS) -> DataProcessor:
+    """Build a DataProcessor over worker processes, one partial per shard.
+
+    ``source`` is either a list of gigs, split into ``workers`` contiguous
+    shards, or a list of dataset paths read one file per shard. ``workers``
+    of 0 or None means one per CPU. Workers send back frames and mergeable
+    aggregates (``ProcessorShard``), which are merged in shard order, so
+    every query returns exactly what a single-process DataProcessor over the
+    same gigs would.
+    """
+    if workers is not None and workers < 0:
+        raise ValueError(f"workers must be zero or positive, got {workers}")
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    shards = _split(source, workers)
+    if workers == 1 or len(shards) == 1:
+        partials = [_build_shard(shard) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(_build_shard, shards))
+
+    processor = DataProcessor([])
+    for shard, partial in zip(shards, partials):
+        if not isinstance(shard, str):
+            partial.gig_chunks = [shard]
+        processor.merge(partial)
+    processor.recompute_moments()
+    return processor
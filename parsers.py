@@ -0,0 +1,182 @@
+import re
+from typing import List, Dict, Any, Optional
+import config
+
+CLASS_XPATH = "contains(concat(' ', normalize-space(@class), ' '), ' {} ')"
+
+
+def to_number(text: str) -> float:
+    """'1,234' -> 1234, '1.2k' -> 1200, 'US$25' -> 25."""
+    text = text.strip().lower().replace(',', '')
+    match = re.search(r'(\d+(?:\.\d+)?)\s*(k)?', text)
+    if not match:
+        return 0
+    value = float(match.group(1)) * (1000 if match.group(2) else 1)
+    return int(value) if value.is_integer() else value
+
+
+def _clean(text: Optional[str]) -> str:
+    return ' '.join(text.split()) if text else ''
+
+
+def _gig(title: str, description: str, tags: List[str], orders: Optional[str], price: Optional[str]) -> Dict[str, Any]:
+    return {
+        'title': _clean(title),
+        'description': _clean(description),
+        'tags': tags,
+        'completed_orders': to_number(orders) if orders else 0,
+        'price': to_number(price.replace('US$', '')) if price else 0,
+    }
+
+
+class BeautifulSoupParser:
+    """Pure-Python html.parser backend; slowest, but needs nothing beyond bs4."""
+
+    name = 'beautifulsoup'
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup = lambda html: BeautifulSoup(html, 'html.parser')
+
+    def parse_search_page(self, html: str) -> List[str]:
+        urls = []
+        for gig in self._soup(html).find_all('div', class_='gig-wrapper'):
+            heading = gig.find('p', role='heading')
+            link = heading.find_parent('a') if heading else None
+            if link and link.get('href'):
+                urls.append(link.get('href').split('?')[0])
+        return urls
+
+    def parse_gig_page(self, html: str) -> Optional[Dict[str, Any]]:
+        soup = self._soup(html)
+        gig_overview = soup.find('div', class_='gig-overview')
+        title = gig_overview.find('h1') if gig_overview else None
+        if title is None:
+            return None
+
+        orders = soup.find('span', class_='rating-count-number')
+        price = soup.find('span', class_='price')
+        description = soup.find('div', class_='description-content')
+        tags_container = soup.find('div', class_='gig-tags-container')
+        tags = [
+            link.get_text(strip=True)
+            for link in (tag.find('a') for tag in tags_container.find_all('li'))
+            if link
+        ] if tags_container else []
+
+        return _gig(
+            title.get_text(' '),
+            description.get_text(' ') if description else '',
+            tags,
+            orders.get_text() if orders else None,
+            price.get_text() if price else None,
+        )
+
+
+class LxmlParser:
+    """libxml2 backend; targeted XPath lookups instead of walking the tree."""
+
+    name = 'lxml'
+
+    def __init__(self):
+        import lxml.html
+        self._parse = lxml.html.fromstring
+        self._gig_links = (
+            f"//div[{CLASS_XPATH.format('gig-wrapper')}]//p[@role='heading']/ancestor::a[1]/@href"
+        )
+        self._title = f"(//div[{CLASS_XPATH.format('gig-overview')}]//h1)[1]"
+        self._orders = f"(//span[{CLASS_XPATH.format('rating-count-number')}])[1]"
+        self._price = f"(//span[{CLASS_XPATH.format('price')}])[1]"
+        self._description = f"(//div[{CLASS_XPATH.format('description-content')}])[1]"
+        self._tags = f"(//div[{CLASS_XPATH.format('gig-tags-container')}])[1]//li/descendant::a[1]"
+
+    def _first_text(self, tree, xpath: str) -> Optional[str]:
+        nodes = tree.xpath(xpath)
+        return nodes[0].text_content() if nodes else None
+
+    def parse_search_page(self, html: str) -> List[str]:
+        return [str(href).split('?')[0] for href in self._parse(html).xpath(self._gig_links) if href]
+
+    def parse_gig_page(self, html: str) -> Optional[Dict[str, Any]]:
+        tree = self._parse(html)
+        title = self._first_text(tree, self._title)
+        if title is None:
+            return None
+
+        return _gig(
+            title,
+            self._first_text(tree, self._description) or '',
+            [link.text_content().strip() for link in tree.xpath(self._tags)],
+            self._first_text(tree, self._orders),
+            self._first_text(tree, self._price),
+        )
+
+
+class SelectolaxParser:
+    """Lexbor backend via selectolax; CSS lookups, usually the fastest."""
+
+    name = 'selectolax'
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parse = LexborHTMLParser
+
+    @staticmethod
+    def _text(node) -> Optional[str]:
+        return node.text(separator=' ') if node is not None else None
+
+    def parse_search_page(self, html: str) -> List[str]:
+        urls = []
+        for heading in self._parse(html).css('div.gig-wrapper p[role="heading"]'):
+            link = heading.parent
+            while link is not None and link.tag != 'a':
+                link = link.parent
+            href = link.attributes.get('href') if link is not None else None
+            if href:
+                urls.append(href.split('?')[0])
+        return urls
+
+    def parse_gig_page(self, html: str) -> Optional[Dict[str, Any]]:
+        tree = self._parse(html)
+        title = tree.css_first('div.gig-overview h1')
+        if title is None:
+            return None
+
+        tags_container = tree.css_first('div.gig-tags-container')
+        tags = []
+        if tags_container is not None:
+            for tag in tags_container.css('li'):
+                link = tag.css_first('a')
+                if link is not None:
+                    tags.append(link.text(strip=True))
+
+        return _gig(
+            self._text(title),
+            self._text(tree.css_first('div.description-content')) or '',
+            tags,
+            self._text(tree.css_first('span.rating-count-number')),
+            self._text(tree.css_first('span.price')),
+        )
+
+
+PARSERS = {
+    parser.name: parser for parser in (BeautifulSoupParser, LxmlParser, SelectolaxParser)
+}
+_instances = {}
+
+
+def get_parser(name: str = config.SCRAPER_PARSER):
+    if name not in PARSERS:
+        raise ValueError(f"Unknown parser backend: {name} (choose from {', '.join(PARSERS)})")
+    if name not in _instances:
+        _instances[name] = PARSERS[name]()
+    return _instances[name]
+
+
+# Module-level entry points so a ProcessPoolExecutor can pickle them
+def parse_search_page(html: str, backend: str = config.SCRAPER_PARSER) -> List[str]:
+    return get_parser(backend).parse_search_page(html)
+
+
+def parse_gig_page(html: str, backend: str = config.SCRAPER_PARSER) -> Optional[Dict[str, Any]]:
+    return get_parser(backend).parse_gig_page(html)
@@ -1,56 +1,399 @@
+import functools
+import hashlib
+import threading
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any, Tuple
-from collections import Counter, defaultdict
+import pyarrow as pa
+import pyarrow.compute as pc
+from scipy import sparse
+from typing import List, Dict, Any, Tuple, Iterable, Union
+from collections import Counter
+from itertools import chain
+from sketches import RunningMoments, KLLSketch, TrendAccumulator, TrendFit, theil_sen
 import config
 
+NUMERIC_COLUMNS = ('price', 'completed_orders')
+
+def _synchronized(method):
+    """Run ``method`` under the processor's lock; lazy builders may be reached from export threads."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class ProcessorShard:
+    """The part of a ``DataProcessor`` that ``merge`` reads: rows as frames and the mergeable aggregates.
+
+    Unlike the processor it leaves out caches, sketches and, unless asked
+    for, the original row dicts, so a worker process can send it back cheaply.
+    """
+
+    def __init__(self, frame: pd.DataFrame, tag_table: pd.DataFrame, tag_vocabulary: np.ndarray,
+                 tag_counter: Counter, moments: Dict[str, RunningMoments], trends: Dict[bool, TrendAccumulator],
+                 products: Dict[bool, sparse.csr_matrix], gig_chunks: List[Union[List[Dict[str, Any]], pa.Table]]):
+        self.frame = frame
+        self.tag_table = tag_table
+        self.tag_vocabulary = tag_vocabulary
+        self.tag_counter = tag_counter
+        self.moments = moments
+        self.trends = trends
+        self.products = products
+        self.gig_chunks = gig_chunks
+
+
 class DataProcessor:
-    def __init__(self, gigs_data: List[Dict[str, Any]]):
-        self.gigs_data = gigs_data
-        self.df = self._create_dataframe()
-        self.all_tags = self._extract_all_tags()
-        self.tag_counter = Counter(self.all_tags)
-
-    def _create_dataframe(self) -> pd.DataFrame:
-        df = []
-        for gig in self.gigs_data:
-            df.append({
-                'title': gig['title'],
-                'description': gig['description'],
-                'completed_orders': gig['completed_orders'],
-                'price': gig['price'],
-                'tags': ', '.join(gig['tags']),
-                'tag_count': len(gig['tags']),
-            })
-        
-        return pd.DataFrame(df) 
+    """Columnar view of a gig set with incrementally maintained aggregates.
+
+    Gigs get stable integer ids (the DataFrame index) in arrival order.
+    ``append`` updates tag counts, price/order moments, quantile sketches and
+    any co-occurrence matrices already built in time proportional to the
+    new gigs; frame consolidation is deferred until a caller asks for it.
+    Statistics are exact when first computed; after that, appended batches
+    are folded in, with moments staying exact and quartiles coming from the
+    KLL sketches (see ``KLLSketch`` for the error bound). ``remove`` and
+    ``recompute_moments`` make them exact again.
+
+    Gigs can also arrive as a pyarrow Table (see columnar_store.py): text
+    columns are wrapped without copying, tags are dictionary-encoded in
+    Arrow, and row dicts are only built if ``gigs_data`` is read.
+
+    Lazily built state (consolidated frames, statistics, co-occurrence
+    products, the fingerprint) is created under a re-entrant lock, so
+    background exports can read a processor the UI thread is also using.
+    """
+
+    def __init__(self, gigs_data: Union[List[Dict[str, Any]], pa.Table]):
+        self._lock = threading.RLock()
+        self._gig_chunks: List[Union[List[Dict[str, Any]], pa.Table]] = []
+        self.tag_vocabulary = np.empty(0, dtype=object)
+        self.tag_counter = Counter()
+        self._tag_codes: Dict[str, int] = {}
+        self._frames: List[pd.DataFrame] = []
+        self._tag_tables: List[pd.DataFrame] = []
+        self._next_gig_id = 0
+        self._moments = {column: RunningMoments() for column in NUMERIC_COLUMNS}
+        # Price -> completed orders line, in linear and log1p space
+        self._trends = {log: TrendAccumulator(log) for log in (False, True)}
+        self._sketches = None
+        self._products: Dict[bool, sparse.csr_matrix] = {}
+        self._pending_products: Dict[bool, List[sparse.csr_matrix]] = {}
+        self._statistics = None
+        self._ingest(gigs_data)
+
+    @property
+    @_synchronized
+    def gigs_data(self) -> List[Dict[str, Any]]:
+        if len(self._gig_chunks) != 1 or isinstance(self._gig_chunks[0], pa.Table):
+            self._gig_chunks = [list(chain.from_iterable(
+                chunk.to_pylist() if isinstance(chunk, pa.Table) else chunk for chunk in self._gig_chunks
+            ))]
+        return self._gig_chunks[0]
+
+    @property
+    def all_tags(self) -> List[str]:
+        """Every tag occurrence, gig by gig."""
+        return self.tag_vocabulary[self.tag_table['tag_code'].to_numpy()].tolist()
+
+    @property
+    @_synchronized
+    def df(self) -> pd.DataFrame:
+        if len(self._frames) > 1:
+            self._frames = [self._concat(self._frames)]
+        return self._frames[0]
+
+    @property
+    @_synchronized
+    def tag_table(self) -> pd.DataFrame:
+        """Exploded (gig_id, tag_code) table; codes index into the tag vocabulary."""
+        if len(self._tag_tables) > 1:
+            self._tag_tables = [self._concat(self._tag_tables)]
+        return self._tag_tables[0]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _concat(frames: List[pd.DataFrame]) -> pd.DataFrame:
+        return pd.concat([frame for frame in frames if len(frame)] or frames[:1])
+
+    @_synchronized
+    def append(self, gigs: Union[List[Dict[str, Any]], pa.Table]) -> List[int]:
+        """Add gigs and return their ids; cost scales with the new gigs only."""
+        return self._ingest(gigs).tolist()
+
+    @_synchronized
+    def to_shard(self, products: Iterable[bool] = (False,), gig_chunks: bool = True) -> ProcessorShard:
+        """Frames and aggregates for another processor's ``merge``, with the given products built."""
+        return ProcessorShard(
+            self.df, self.tag_table, self.tag_vocabulary, self.tag_counter, self._moments, self._trends,
+            {presence: self._get_product(presence) for presence in products},
+            self._gig_chunks if gig_chunks else [],
+        )
+
+    @_synchronized
+    def merge(self, other: Union['DataProcessor', ProcessorShard]) -> List[int]:
+        """Absorb another processor's gigs, e.g. a shard built in a worker process.
+
+        Aggregates are combined rather than recomputed, and the result matches
+        appending the other processor's gigs in order. A processor without
+        tags yet adopts the shard's co-occurrence products as they are.
+        """
+        shard = other if isinstance(other, ProcessorShard) else other.to_shard(list(self._products))
+        if not len(self.tag_table):
+            for presence in shard.products:
+                if presence not in self._products:
+                    self._products[presence] = sparse.csr_matrix((0, 0), dtype=np.int64)
+                    self._pending_products[presence] = []
+
+        other_df = shard.frame
+        gig_ids = np.arange(self._next_gig_id, self._next_gig_id + len(other_df))
+        self._next_gig_id += len(other_df)
+        mapping = self._encode_vocabulary(shard.tag_vocabulary)
+
+        frame = other_df.copy()
+        frame.index = gig_ids
+        other_tags = shard.tag_table
+        positions = np.searchsorted(other_df.index.to_numpy(), other_tags['gig_id'].to_numpy())
+        if len(frame):
+            self._frames.append(frame)
+            self._tag_tables.append(pd.DataFrame({
+                'gig_id': gig_ids[positions],
+                'tag_code': mapping[other_tags['tag_code'].to_numpy()],
+            }))
+        self._gig_chunks.extend(shard.gig_chunks)
+        self.tag_counter.update(shard.tag_counter)
+
+        for column in NUMERIC_COLUMNS:
+            self._moments[column].merge(shard.moments[column])
+            if self._sketches is not None:
+                self._sketches[column].update(frame[column].to_numpy())
+        for trend in self._trends.values():
+            trend.merge(shard.trends[trend.log])
+
+        size = len(self.tag_vocabulary)
+        for presence in self._products:
+            product = shard.products.get(presence)
+            if product is None:
+                product = self._pair_product(other_tags['gig_id'].to_numpy(), other_tags['tag_code'].to_numpy(),
+                                             presence)
+            pairs = product.tocoo()
+            self._pending_products[presence].append(sparse.csr_matrix(
+                (pairs.data, (mapping[pairs.row], mapping[pairs.col])), shape=(size, size)
+            ))
+
+        self._invalidate_caches(keep_statistics=True)
+        self._fold_statistics(len(other_tags))
+        return gig_ids.tolist()
+
+    @_synchronized
+    def recompute_moments(self):
+        """Re-derive price/order moments in one pass over the columns.
+
+        Merged moments can differ from a fresh build in the last float bits;
+        this makes them identical again.
+        """
+        for column in NUMERIC_COLUMNS:
+            self._moments[column] = RunningMoments.from_values(self.df[column].to_numpy())
+        for log in self._trends:
+            self._trends[log] = TrendAccumulator.from_values(self.df['price'].to_numpy(),
+                                                             self.df['completed_orders'].to_numpy(), log)
+        self._invalidate_caches()
+
+    @_synchronized
+    def remove(self, gig_ids: Iterable[int]) -> int:
+        """Drop gigs by id and return how many were removed."""
+        ids = np.fromiter(gig_ids, dtype=np.int64)
+        df, tag_table = self.df, self.tag_table
+        dropped = df.index.isin(ids)
+        if not dropped.any():
+            return 0
+
+        removed_tags = tag_table['gig_id'].isin(ids).to_numpy()
+        for column in NUMERIC_COLUMNS:
+            moments = self._moments[column]
+            moments.remove(df[column].to_numpy()[dropped])
+            remaining = df[column].to_numpy()[~dropped]
+            moments.min = remaining.min() if len(remaining) else np.nan
+            moments.max = remaining.max() if len(remaining) else np.nan
+        for trend in self._trends.values():
+            trend.remove(df['price'].to_numpy()[dropped], df['completed_orders'].to_numpy()[dropped])
+
+        size = len(self.tag_vocabulary)
+        removed_product = {}
+        for presence in self._products:
+            removed_product[presence] = self._pair_product(
+                tag_table['gig_id'].to_numpy()[removed_tags],
+                tag_table['tag_code'].to_numpy()[removed_tags],
+                presence
+            )
+            removed_product[presence].resize((size, size))
+
+        # Re-code the surviving tags so the vocabulary stays in first-seen order
+        kept_tags = tag_table[~removed_tags]
+        codes, old_codes = pd.factorize(kept_tags['tag_code'], sort=False)
+        old_codes = np.asarray(old_codes, dtype=np.int64)
+        for presence in self._products:
+            product = self._get_product(presence) - removed_product[presence]
+            self._products[presence] = product[old_codes][:, old_codes].tocsr()
+
+        self.tag_vocabulary = self.tag_vocabulary[old_codes]
+        self._tag_codes = {tag: code for code, tag in enumerate(self.tag_vocabulary)}
+        self._tag_tables = [pd.DataFrame({
+            'gig_id': kept_tags['gig_id'].to_numpy(),
+            'tag_code': codes.astype(np.int64),
+        })]
+        self._frames = [df[~dropped]]
+        self._gig_chunks = [[gig for gig, drop in zip(self.gigs_data, dropped) if not drop]]
+        counts = np.bincount(codes, minlength=len(self.tag_vocabulary))
+        self.tag_counter = Counter(dict(zip(self.tag_vocabulary.tolist(), counts.tolist())))
+        # Quantile sketches cannot forget values; rebuild on next use
+        self._sketches = None
+        self._invalidate_caches()
+        return int(dropped.sum())
+
+    def _ingest(self, gigs: Union[Iterable[Dict[str, Any]], pa.Table]) -> np.ndarray:
+        if isinstance(gigs, pa.Table):
+            columns, lengths, codes = self._table_columns(gigs)
+        else:
+            gigs = list(gigs)
+            tags = [gig['tags'] for gig in gigs]
+            lengths = np.fromiter(map(len, tags), dtype=np.int64, count=len(tags))
+            codes = self._encode_tags(list(chain.from_iterable(tags)))
+            columns = self._dict_columns(gigs, tags)
+
+        gig_ids = np.arange(self._next_gig_id, self._next_gig_id + len(gigs))
+        self._next_gig_id += len(gigs)
+        frame = self._create_dataframe(columns, lengths, gig_ids)
+        if len(frame) or not self._frames:
+            self._frames.append(frame)
+            self._tag_tables.append(pd.DataFrame({
+                'gig_id': np.repeat(gig_ids, lengths),
+                'tag_code': codes,
+            }))
+        self._gig_chunks.append(gigs)
+
+        # Codes are in first-seen order, so ties rank as they did with Counter(all_tags)
+        present, counts = np.unique(codes, return_counts=True)
+        for code, count in zip(present.tolist(), counts.tolist()):
+            self.tag_counter[self.tag_vocabulary[code]] += count
+
+        for column in NUMERIC_COLUMNS:
+            values = frame[column].to_numpy()
+            if self._moments[column].count == 0:
+                self._moments[column] = RunningMoments.from_values(values)
+            else:
+                self._moments[column].update(values)
+            if self._sketches is not None:
+                self._sketches[column].update(values)
+        for trend in self._trends.values():
+            trend.update(frame['price'].to_numpy(), frame['completed_orders'].to_numpy())
+
+        for presence in self._products:
+            self._pending_products[presence].append(
+                self._pair_product(np.repeat(gig_ids, lengths), codes, presence)
+            )
+
+        self._invalidate_caches(keep_statistics=True)
+        self._fold_statistics(len(codes))
+        return gig_ids
+
+    def _encode_tags(self, tags: List[str]) -> np.ndarray:
+        """Map tags to vocabulary codes, appending unseen tags to the vocabulary."""
+        local_codes, uniques = pd.factorize(pd.Series(tags, dtype=object), sort=False)
+        return self._encode_vocabulary(uniques)[local_codes]
+
+    def _encode_vocabulary(self, tags: Iterable[str]) -> np.ndarray:
+        """Codes for distinct tags in first-seen order; unseen ones extend the vocabulary."""
+        tags = list(tags)
+        mapping = np.empty(len(tags), dtype=np.int64)
+        unseen = []
+        for position, tag in enumerate(tags):
+            code = self._tag_codes.get(tag)
+            if code is None:
+                code = self._tag_codes[tag] = len(self._tag_codes)
+                unseen.append(tag)
+            mapping[position] = code
+
+        if unseen:
+            self.tag_vocabulary = np.concatenate([self.tag_vocabulary, np.array(unseen, dtype=object)])
+        return mapping
+
+    @staticmethod
+    def _dict_columns(gigs: List[Dict[str, Any]], tags: List[List[str]]) -> Dict[str, Any]:
+        return {
+            'title': [gig['title'] for gig in gigs],
+            'description': [gig['description'] for gig in gigs],
+            'completed_orders': [gig['completed_orders'] for gig in gigs],
+            'price': [gig['price'] for gig in gigs],
+            'tags': [', '.join(gig_tags) for gig_tags in tags],
+        }
+
+    def _table_columns(self, table: pa.Table) -> Tuple[Dict[str, Any], np.ndarray, np.ndarray]:
+        """Frame columns, tag counts and tag codes straight from Arrow buffers."""
+        tags = table['tags']
+        lengths = pc.list_value_length(tags).fill_null(0).to_numpy().astype(np.int64)
+        # Dictionary order is first occurrence, like pd.factorize in _encode_tags
+        encoded = pc.dictionary_encode(pc.list_flatten(tags).combine_chunks())
+        codes = self._encode_vocabulary(encoded.dictionary.to_pylist())[encoded.indices.to_numpy()]
+        columns = {
+            'title': pd.arrays.ArrowExtensionArray(table['title']),
+            'description': pd.arrays.ArrowExtensionArray(table['description']),
+            'completed_orders': table['completed_orders'].to_numpy(),
+            'price': table['price'].to_numpy(),
+            'tags': pd.arrays.ArrowExtensionArray(pc.binary_join(tags, ', ')),
+        }
+        return columns, lengths, codes
+
+    @staticmethod
+    def _create_dataframe(columns: Dict[str, Any], lengths: np.ndarray, gig_ids: np.ndarray) -> pd.DataFrame:
+        """Build the frame column by column; tags stay joined only for display."""
+        return pd.DataFrame(dict(columns, tag_count=lengths), index=gig_ids)
 
-    def _extract_all_tags(self) -> List[str]:
-        all_tags = []
-        for gig in self.gigs_data:
-            all_tags.extend(gig['tags'])
-        return all_tags
-    
     def get_dataframe(self) -> pd.DataFrame:
         return self.df
 
+    @_synchronized
+    def get_fingerprint(self) -> str:
+        """Content hash of the gigs, computed once per change to the data."""
+        if self._fingerprint is None:
+            df, tag_table = self.df, self.tag_table
+            digest = hashlib.sha256(','.join(df.columns).encode('utf-8'))
+            # The display column joins tags with ', ', so tags are hashed one by one instead
+            digest.update(pd.util.hash_pandas_object(df.drop(columns='tags'), index=False).to_numpy().tobytes())
+            tags = pd.DataFrame({
+                'position': df.index.get_indexer(tag_table['gig_id']),
+                'tag': self.tag_vocabulary[tag_table['tag_code'].to_numpy()],
+            }).sort_values('position', kind='stable')
+            digest.update(pd.util.hash_pandas_object(tags, index=False).to_numpy().tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
     def get_summary_statistics(self) -> Dict[str, Any]:
+        stats = self._get_statistics()
         return {
-            'total_gigs': len(self.gigs_data),
-            'total_tags': len(self.all_tags),
-            'unique_tags': len(set(self.all_tags)),
-            'duplicate_tags': len(self.all_tags) - len(set(self.all_tags)),
-            'average_price': self.df['price'].mean(),
-            'median_price': self.df['price'].median(),
-            'total_orders': self.df['completed_orders'].sum(),
-            'average_orders': self.df['completed_orders'].mean(),
+            'total_gigs': self._moments['price'].count,
+            'total_tags': stats['tags']['total'],
+            'unique_tags': stats['tags']['unique'],
+            'duplicate_tags': stats['tags']['total'] - stats['tags']['unique'],
+            'average_price': stats['price']['mean'],
+            'median_price': stats['price']['median'],
+            'total_orders': stats['orders']['total'],
+            'average_orders': stats['orders']['mean'],
         }
 
     def get_average_price(self) -> float:
-        return self.df['price'].mean()
+        return self._get_statistics()['price']['mean']
     
     def get_total_orders(self) -> int:
-        return self.df['completed_orders'].sum()
+        return self._get_statistics()['orders']['total']
         
     def get_keyword_frequency(self) -> Dict[str, int]:
         return dict(self.tag_counter.most_common())
@@ -59,52 +402,220 @@ class DataProcessor:
         return self.tag_counter.most_common(n)
     
     def get_unique_tags(self) -> List[str]:
-        return list(set(self.all_tags))
+        return self.tag_vocabulary.tolist()
     
     def get_price_statistics(self) -> Dict[str, float]:
-        prices = self.df['price']
-        return {
-            'mean': prices.mean(),
-            'median': prices.median(),
-            'std': prices.std(),
-            'min': prices.min(),
-            'max': prices.max(),
-            'q1': prices.quantile(0.25),
-            'q3': prices.quantile(0.75)
-        }
+        prices = self._get_statistics()['price']
+        return {key: prices[key] for key in ('mean', 'median', 'std', 'min', 'max', 'q1', 'q3')}
     
     def get_order_statistics(self) -> Dict[str, float]:
-        orders = self.df['completed_orders']
+        orders = self._get_statistics()['orders']
+        return {key: orders[key] for key in ('mean', 'median', 'std', 'min', 'max', 'total')}
+
+    def get_approximate_quantiles(self, column: str = 'price',
+                                  quantiles: Tuple[float, ...] = (0.25, 0.5, 0.75)) -> List[float]:
+        """Quantiles from a KLL sketch kept up to date by ``append``; see ``KLLSketch`` for error bounds."""
+        self._build_sketches()
+        return self._sketches[column].quantiles(quantiles)
+
+    @_synchronized
+    def _build_sketches(self):
+        if self._sketches is None:
+            self._sketches = {}
+            for name in NUMERIC_COLUMNS:
+                self._sketches[name] = KLLSketch()
+                self._sketches[name].update(self.df[name].to_numpy())
+
+    @_synchronized
+    def get_price_trend(self, method: str = config.TREND_METHOD) -> TrendFit:
+        """Completed orders against price, fitted once per change to the data.
+
+        'ols' and 'log' come straight from the running sums; 'theil_sen'
+        fits a bounded sample and is scored against all gigs.
+        """
+        if method not in config.TREND_METHODS:
+            raise ValueError(f"Unknown trend method '{method}', expected one of {config.TREND_METHODS}")
+        if method not in self._trend_fits:
+            trend = self._trends[method == 'log']
+            if method != 'theil_sen' or trend.degenerate:
+                fit = trend.fit()
+                fit.method = method
+            else:
+                rows = np.random.default_rng(0).choice(len(self.df), min(len(self.df), config.TREND_SAMPLE_SIZE),
+                                                       replace=False)
+                slope, intercept = theil_sen(self.df['price'].to_numpy()[rows],
+                                             self.df['completed_orders'].to_numpy()[rows])
+                if np.isfinite(slope):
+                    fit = trend.evaluate(slope, intercept, method)
+                else:
+                    # The sample hit a single price; fall back to least squares on everything
+                    fit = trend.fit()
+            self._trend_fits[method] = fit
+        return self._trend_fits[method]
+
+    @_synchronized
+    def _get_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """Price/order moments, quantiles and tag cardinalities, computed once per dataset."""
+        if self._statistics is None:
+            self._statistics = {
+                'price': None,
+                'orders': None,
+                'tags': {'total': len(self.tag_table), 'unique': len(self.tag_vocabulary)},
+            }
+        # Quartiles are exact, so each is recomputed once after the gigs it covers change
+        for key, column in (('price', 'price'), ('orders', 'completed_orders')):
+            if self._statistics[key] is None:
+                self._statistics[key] = self._describe(column)
+        return self._statistics
+
+    def _fold_statistics(self, new_tags: int):
+        """Carry cached tag counts over a new batch; the quartiles are left for the next read."""
+        if self._statistics is None:
+            return
+        self._statistics = {
+            'price': None,
+            'orders': None,
+            'tags': {'total': self._statistics['tags']['total'] + new_tags, 'unique': len(self.tag_vocabulary)},
+        }
+
+    def _describe(self, column: str) -> Dict[str, Any]:
+        moments = self._moments[column]
+        if moments.count == 0:
+            return {'count': 0, 'total': 0, 'mean': np.nan, 'std': np.nan, 'min': np.nan,
+                    'max': np.nan, 'q1': np.nan, 'median': np.nan, 'q3': np.nan}
+
+        # Moments are maintained incrementally; exact quartiles need one partition
+        q1, median, q3 = np.percentile(self.df[column].to_numpy(), [25, 50, 75])
         return {
-            'mean': orders.mean(),
-            'median': orders.median(),
-            'std': orders.std(),
-            'min': orders.min(),
-            'max': orders.max(),
-            'total': orders.sum()
+            'count': moments.count,
+            'total': moments.total,
+            'mean': moments.mean,
+            'std': moments.std,
+            'min': moments.min,
+            'max': moments.max,
+            'q1': q1,
+            'median': median,
+            'q3': q3,
         }
 
-    def get_keyword_correlations(self, min_cooccurrence: int = 2) -> List[Tuple[str, str, int]]:
-        co_occurrence = defaultdict(lambda: defaultdict(int))
-        
-        for gig in self.gigs_data:
-            gig_tags = gig['tags']
-            for i, tag1 in enumerate(gig_tags):
-                for j, tag2 in enumerate(gig_tags):
-                    if i != j:
-                        co_occurrence[tag1][tag2] += 1
-        
-        correlations = []
-        for tag1, related_tags in co_occurrence.items():
-            for tag2, count in related_tags.items():
-                if tag1 < tag2 and count >= min_cooccurrence:
-                    correlations.append((tag1, tag2, count))
-        
-        correlations.sort(key=lambda x: x[2], reverse=True)
-        return correlations
+    def _invalidate_caches(self, keep_statistics: bool = False):
+        """Drop everything derived from the data; call whenever the gigs change.
+
+        With ``keep_statistics`` the caller folds the change into the cached
+        statistics instead (see ``_fold_statistics``).
+        """
+        if not keep_statistics:
+            self._statistics = None
+        self._success_metrics = None
+        self._cooccurrence = {}
+        self._fingerprint = None
+        self._trend_fits = {}
+
+    def get_keyword_correlations(self, min_cooccurrence: int = 2, top_k: int = None) -> List[Tuple[str, str, int]]:
+        rows, cols, counts = self._get_cooccurrence()
+        keep = counts >= min_cooccurrence
+        rows, cols, counts = rows[keep], cols[keep], counts[keep]
+
+        order = self._top_pair_order(rows, cols, counts, top_k)
+        return [(*self._pair_names(rows[i], cols[i]), int(counts[i])) for i in order]
+
+    def get_keyword_associations(self, measure: str = 'pmi', min_cooccurrence: int = 2,
+                                 top_k: int = None) -> List[Tuple[str, str, int, float]]:
+        """Rank tag pairs by PMI, Jaccard or lift over gig-level tag presence.
+
+        With n_a and n_b the number of gigs carrying each tag, c_ab the number
+        carrying both and N the number of gigs: lift = c_ab * N / (n_a * n_b),
+        pmi = log2(lift) and jaccard = c_ab / (n_a + n_b - c_ab).
+        """
+        rows, cols, counts = self._get_cooccurrence(presence=True)
+        keep = counts >= min_cooccurrence
+        rows, cols, counts = rows[keep], cols[keep], counts[keep]
+
+        gig_counts = self._get_product(presence=True).diagonal()
+        n_a = gig_counts[rows].astype(float)
+        n_b = gig_counts[cols].astype(float)
+        if measure == 'lift':
+            scores = counts * len(self.df) / (n_a * n_b)
+        elif measure == 'pmi':
+            scores = np.log2(counts * len(self.df) / (n_a * n_b))
+        elif measure == 'jaccard':
+            scores = counts / (n_a + n_b - counts)
+        else:
+            raise ValueError(f"Unknown association measure: {measure}")
+
+        order = self._top_pair_order(rows, cols, scores, top_k)
+        return [(*self._pair_names(rows[i], cols[i]), int(counts[i]), float(scores[i])) for i in order]
 
+    @staticmethod
+    def _pair_product(gig_ids: np.ndarray, codes: np.ndarray, presence: bool) -> sparse.csr_matrix:
+        """X^T X for the gig x tag count matrix X of the given tag rows."""
+        rows = pd.factorize(gig_ids)[0]
+        incidence = sparse.csr_matrix(
+            (np.ones(len(codes), dtype=np.int64), (rows, codes)),
+            shape=(rows.max() + 1 if len(rows) else 0, codes.max() + 1 if len(codes) else 0)
+        )
+        if presence:
+            incidence.data[:] = 1
+        return (incidence.T @ incidence).tocsr()
+
+    @_synchronized
+    def _get_product(self, presence: bool = False) -> sparse.csr_matrix:
+        """Tag x tag product, built once and then grown by the deltas ``append`` queues."""
+        size = len(self.tag_vocabulary)
+        if presence not in self._products:
+            tag_table = self.tag_table
+            self._products[presence] = self._pair_product(
+                tag_table['gig_id'].to_numpy(), tag_table['tag_code'].to_numpy(), presence
+            )
+            self._pending_products[presence] = []
+
+        pending = self._pending_products[presence]
+        product = self._products[presence]
+        if pending or product.shape != (size, size):
+            product = product.copy()
+            product.resize((size, size))
+            for delta in pending:
+                delta = delta.copy()
+                delta.resize((size, size))
+                product = product + delta
+            self._products[presence] = product.tocsr()
+            self._pending_products[presence] = []
+        return self._products[presence]
+
+    @_synchronized
+    def _get_cooccurrence(self, presence: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Upper triangle of X^T X as (row codes, col codes, counts), built once per dataset.
+
+        By default X counts repeated tags within a gig, matching the pairwise
+        loop this replaces; with ``presence`` X is the 0/1 pattern of the same matrix.
+        """
+        if presence not in self._cooccurrence:
+            pairs = sparse.triu(self._get_product(presence), k=1, format='coo')
+            self._cooccurrence[presence] = (pairs.row.astype(np.int64), pairs.col.astype(np.int64), pairs.data)
+        return self._cooccurrence[presence]
+
+    def _top_pair_order(self, rows: np.ndarray, cols: np.ndarray, scores: np.ndarray, top_k: int = None) -> np.ndarray:
+        """Indices of the best pairs, highest score first, ties in tag first-seen order."""
+        candidates = np.arange(len(scores))
+        if top_k is not None and 0 < top_k < len(scores):
+            # Only pairs scoring at least the k-th best need a full sort
+            kth = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+            candidates = candidates[scores >= kth]
+        order = candidates[np.lexsort((cols[candidates], rows[candidates], -scores[candidates]))]
+        return order[:top_k]
+
+    def _pair_names(self, row: int, col: int) -> Tuple[str, str]:
+        tag1, tag2 = self.tag_vocabulary[row], self.tag_vocabulary[col]
+        return (tag1, tag2) if tag1 < tag2 else (tag2, tag1)
+
+    @_synchronized
     def get_success_metrics(self) -> Dict[str, Any]:
-        high_orders_threshold = self.df['completed_orders'].quantile(0.75)
+        if self._success_metrics is None:
+            self._success_metrics = self._compute_success_metrics()
+        return self._success_metrics
+
+    def _compute_success_metrics(self) -> Dict[str, Any]:
+        high_orders_threshold = self._get_statistics()['orders']['q3']
         high_rating_threshold = 4.5
         
         successful_gigs = self.df[
@@ -120,8 +631,13 @@ class DataProcessor:
 
     def _get_common_tags_in_subset(self, subset_df: pd.DataFrame, n: int = 10) -> List[Tuple[str, int]]:
         """Get common tags in a subset of data"""
-        subset_tags = []
-        for tags_str in subset_df['tags']:
-            subset_tags.extend(tags_str.split(', '))
-        
-        return Counter(subset_tags).most_common(n)
\ No newline at end of file
+        in_subset = np.isin(self.tag_table['gig_id'].to_numpy(), subset_df.index.to_numpy())
+        codes = self.tag_table['tag_code'].to_numpy()[in_subset]
+        if len(codes) == 0:
+            return []
+
+        counts = np.bincount(codes, minlength=len(self.tag_vocabulary))
+        present, first_seen = np.unique(codes, return_index=True)
+        # Most frequent first, ties in order of first appearance within the subset
+        order = np.lexsort((first_seen, -counts[present]))[:n]
+        return [(self.tag_vocabulary[code], int(counts[code])) for code in present[order]]
@@ -0,0 +1,251 @@
+"""Fit the gig dataset section of the AI prompt into a token budget.
+
+Small gig sets are listed in full, as before. Once the listing would
+exceed the budget it is replaced by what ``DataProcessor`` already knows
+about the whole set: price/order statistics, top keywords, keyword pairs
+that occur together, and as many representative successful gigs as still
+fit. The gigs are picked by maximal marginal relevance (MMR): high order
+counts, penalized by tag overlap with gigs already picked.
+
+A part of a dataset (a map-reduce chunk, or a plain list of gigs) is
+summarized by ``GigSubset``, which answers the same queries from the rows
+and tag codes it is given instead of building another ``DataProcessor``.
+"""
+import math
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from processor import DataProcessor
+import config
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+# "Title: \nDescription: \nTags: " plus the blank line between gigs
+GIG_TEMPLATE_CHARS = 29
+
+
+def estimate_tokens(text: str) -> int:
+    """Local stand-in for a BPE tokenizer: the larger of the word and
+    punctuation count and one token per four characters. It errs high on
+    English text, so a prompt that fits here fits the model."""
+    return max(len(TOKEN_PATTERN.findall(text)), math.ceil(len(text) / 4))
+
+
+def format_gig(gig: Dict[str, Any], description_chars: int = None) -> str:
+    description = gig['description']
+    if description_chars is not None and len(description) > description_chars:
+        description = description[:description_chars].rsplit(' ', 1)[0] + '…'
+    return (
+        f"Title: {gig['title']}\n"
+        f"Description: {description}\n"
+        f"Tags: {gig['tags']}"
+    )
+
+
+def format_gigs(gigs: List[Dict[str, Any]]) -> str:
+    return "\n\n".join(format_gig(gig) for gig in gigs)
+
+
+class GigSubset:
+    """The ``DataProcessor`` queries compaction needs, over a few gigs.
+
+    Built from a processor and some of its gig ids (tags are taken from its
+    tag table) or from gig dicts whose ``tags`` are lists. Definitions match
+    the processor's: quartiles by ``np.percentile``, successful gigs at or
+    above the order q3, tag ties in first-seen order.
+    """
+
+    def __init__(self, df: pd.DataFrame, gig_ids: np.ndarray, tags: List[str]):
+        self.df = df
+        codes, vocabulary = pd.factorize(pd.Series(tags, dtype=object), sort=False)
+        self.tag_vocabulary = np.asarray(vocabulary, dtype=object)
+        self.tag_table = pd.DataFrame({'gig_id': gig_ids, 'tag_code': codes.astype(np.int64)})
+
+    @classmethod
+    def from_processor(cls, processor: DataProcessor, gig_ids: Iterable[int]) -> 'GigSubset':
+        df = processor.get_dataframe().loc[list(gig_ids)]
+        tag_table = processor.tag_table
+        tagged = tag_table[tag_table['gig_id'].isin(df.index)]
+        return cls(df, tagged['gig_id'].to_numpy(), processor.tag_vocabulary[tagged['tag_code'].to_numpy()].tolist())
+
+    @classmethod
+    def from_records(cls, gigs: List[Dict[str, Any]]) -> 'GigSubset':
+        df = pd.DataFrame({
+            'title': [gig['title'] for gig in gigs],
+            'description': [gig['description'] for gig in gigs],
+            'tags': [', '.join(gig['tags']) for gig in gigs],
+            'completed_orders': [gig['completed_orders'] for gig in gigs],
+            'price': [gig['price'] for gig in gigs],
+        })
+        gig_ids = np.repeat(np.arange(len(gigs)), [len(gig['tags']) for gig in gigs])
+        return cls(df, gig_ids, [tag for gig in gigs for tag in gig['tags']])
+
+    def get_dataframe(self) -> pd.DataFrame:
+        return self.df
+
+    def _describe(self, column: str) -> Dict[str, float]:
+        values = self.df[column].to_numpy(dtype=float)
+        if not len(values):
+            return {key: np.nan for key in ('mean', 'median', 'q1', 'q3', 'max')}
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        return {'mean': values.mean(), 'median': median, 'q1': q1, 'q3': q3, 'max': values.max()}
+
+    def get_price_statistics(self) -> Dict[str, float]:
+        return self._describe('price')
+
+    def get_order_statistics(self) -> Dict[str, float]:
+        return self._describe('completed_orders')
+
+    def get_success_metrics(self) -> Dict[str, Any]:
+        orders = self.df['completed_orders'].to_numpy()
+        successful = self.df[orders >= self.get_order_statistics()['q3']] if len(orders) else self.df
+        return {
+            'total_successful_gigs': len(successful),
+            'avg_price_successful': successful['price'].mean() if len(successful) else 0,
+        }
+
+    def get_top_keywords(self, n: int) -> List[Tuple[str, int]]:
+        counts = np.bincount(self.tag_table['tag_code'].to_numpy(), minlength=len(self.tag_vocabulary))
+        # Codes are in first-seen order, so a stable sort keeps ties that way
+        order = np.argsort(-counts, kind='stable')[:n]
+        return [(self.tag_vocabulary[code], int(counts[code])) for code in order]
+
+    def get_keyword_correlations(self, min_cooccurrence: int = 2, top_k: int = None) -> List[Tuple[str, str, int]]:
+        product = DataProcessor._pair_product(self.tag_table['gig_id'].to_numpy(),
+                                              self.tag_table['tag_code'].to_numpy(), False)
+        pairs = sparse.triu(product, k=1, format='coo')
+        keep = pairs.data >= min_cooccurrence
+        rows, cols, counts = pairs.row[keep], pairs.col[keep], pairs.data[keep]
+        order = np.lexsort((cols, rows, -counts))[:top_k]
+        return [(*sorted((self.tag_vocabulary[rows[i]], self.tag_vocabulary[cols[i]])), int(counts[i]))
+                for i in order]
+
+
+def representative_gigs(processor: DataProcessor, candidates: int = config.LLM_PROMPT_CANDIDATES,
+                        diversity: float = config.LLM_PROMPT_MMR_DIVERSITY) -> Iterator[int]:
+    """Gig ids of the most-ordered gigs in MMR order.
+
+    Relevance is log-scaled completed orders; redundancy is the cosine
+    similarity of tag sets to the gigs already yielded, weighted by
+    ``diversity`` (0 ranks by orders alone).
+    """
+    df = processor.get_dataframe()
+    orders = df['completed_orders'].to_numpy(dtype=float)
+    positions = np.argsort(-orders, kind='stable')[:candidates]
+    gig_ids = df.index.to_numpy()[positions]
+    if not len(gig_ids):
+        return
+
+    tag_table = processor.tag_table
+    tagged = tag_table[tag_table['gig_id'].isin(gig_ids)]
+    rows = pd.Index(gig_ids).get_indexer(tagged['gig_id'])
+    tags = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, tagged['tag_code'].to_numpy())),
+        shape=(len(gig_ids), len(processor.tag_vocabulary))
+    )
+    tags.data[:] = 1.0
+    norms = np.sqrt(np.asarray(tags.multiply(tags).sum(axis=1))).ravel()
+    tags = sparse.diags(np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)) @ tags
+    similarity = (tags @ tags.T).toarray()
+
+    relevance = np.log1p(orders[positions])
+    if relevance.max() > 0:
+        relevance /= relevance.max()
+    redundancy = np.zeros(len(gig_ids))
+    available = np.ones(len(gig_ids), dtype=bool)
+    for _ in range(len(gig_ids)):
+        scores = np.where(available, (1 - diversity) * relevance - diversity * redundancy, -np.inf)
+        pick = int(np.argmax(scores))
+        available[pick] = False
+        redundancy = np.maximum(redundancy, similarity[pick])
+        yield int(gig_ids[pick])
+
+
+class _Budget:
+    def __init__(self, tokens: int):
+        self.remaining = tokens
+        self.sections: List[str] = []
+
+    def add(self, text: str) -> bool:
+        tokens = estimate_tokens(text) + 1
+        if tokens > self.remaining:
+            return False
+        self.sections.append(text)
+        self.remaining -= tokens
+        return True
+
+    def add_items(self, header: str, items: List[str], separator: str = ', ') -> int:
+        """Add ``header`` and the longest prefix of ``items`` that fits; returns how many did."""
+        count = len(items)
+        # Per-item estimates can undercount the joined line by a token or two
+        while count and estimate_tokens(header) + sum(estimate_tokens(item) + 1 for item in items[:count]) \
+                > self.remaining:
+            count -= 1
+        while count and not self.add(header + separator.join(items[:count])):
+            count -= 1
+        return count
+
+
+def compact_processor(processor: Union[DataProcessor, GigSubset], budget: int = config.LLM_PROMPT_TOKEN_BUDGET) -> str:
+    """The dataset section for ``processor``'s gigs, at most ``budget`` estimated tokens."""
+    df = processor.get_dataframe()
+    characters = sum(int(df[column].str.len().sum()) for column in ('title', 'description', 'tags'))
+    # estimate_tokens is at least characters / 4, so only a listing under that bound can fit
+    if math.ceil((characters + GIG_TEMPLATE_CHARS * len(df)) / 4) <= budget:
+        listing = format_gigs(df[['title', 'description', 'tags']].to_dict(orient='records'))
+        if estimate_tokens(listing) <= budget:
+            return listing
+
+    budget = _Budget(budget)
+    prices, orders = processor.get_price_statistics(), processor.get_order_statistics()
+    success = processor.get_success_metrics()
+    budget.add(
+        f"Dataset summary: {len(df):,} gigs. "
+        f"Price: median ${prices['median']:.2f}, mean ${prices['mean']:.2f}, "
+        f"middle half ${prices['q1']:.2f}-${prices['q3']:.2f}. "
+        f"Completed orders: median {orders['median']:.0f}, mean {orders['mean']:.1f}, max {orders['max']:.0f}. "
+        f"Top-quartile gigs by orders: {success['total_successful_gigs']:,}, "
+        f"average price ${success['avg_price_successful']:.2f}."
+    )
+    budget.add_items("Most used tags (gig count): ", [
+        f"{tag} ({count})" for tag, count in processor.get_top_keywords(config.LLM_PROMPT_TOP_KEYWORDS)
+    ])
+    budget.add_items("Tags often used together: ", [
+        f"{first} + {second} ({count})"
+        for first, second, count in processor.get_keyword_correlations(top_k=config.LLM_PROMPT_TOP_PAIRS)
+    ], separator='; ')
+
+    header = "Representative successful gigs:"
+    if budget.add(header):
+        added = 0
+        for gig_id in representative_gigs(processor):
+            gig = df.loc[gig_id]
+            if not budget.add(format_gig(gig, config.LLM_PROMPT_DESCRIPTION_CHARS)):
+                break
+            added += 1
+        if not added:
+            budget.sections.remove(header)
+    return "\n\n".join(budget.sections)
+
+
+def compact_gigs(gig_data: Union[DataProcessor, pd.DataFrame, List[Dict[str, Any]]],
+                 budget: int = config.LLM_PROMPT_TOKEN_BUDGET, gig_ids: Iterable[int] = None) -> str:
+    """Dataset section for a processor (or only its ``gig_ids``), a gig DataFrame or a list of gig dicts.
+
+    DataFrame rows from ``DataProcessor.get_dataframe`` carry tags joined
+    for display, which cannot be split back reliably; over the budget such
+    rows are summarized without tag statistics. Pass the processor instead.
+    """
+    if isinstance(gig_data, DataProcessor):
+        if gig_ids is None:
+            return compact_processor(gig_data, budget)
+        return compact_processor(GigSubset.from_processor(gig_data, gig_ids), budget)
+    if hasattr(gig_data, "to_dict"):
+        gig_data = gig_data.to_dict(orient="records")
+    listing = format_gigs(gig_data)
+    if estimate_tokens(listing) <= budget:
+        return listing
+    return compact_processor(GigSubset.from_records([
+        dict(gig, tags=[]) if isinstance(gig['tags'], str) else gig for gig in gig_data
+    ]), budget)
@@ -0,0 +1,236 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional
+import config
+
+
+class ScrapeCache:
+    """On-disk HTTP cache for scraped pages, keyed by URL.
+
+    Every URL gets a gzip-compressed body file and a JSON metadata file
+    holding its ETag/Last-Modified validators, fetch time, a hash of the body
+    and the records parsed from it (one per parser entry point and backend).
+    Entries younger than ``ttl`` are served without touching the network;
+    older ones are revalidated with a conditional request, and a 304 keeps
+    both the body and its parsed records. When the bodies exceed
+    ``max_bytes`` the least recently used entries are removed.
+
+    Body sizes and recency are tracked in an in-memory LRU index, read from
+    the directory once on construction, so stores never walk the cache. The
+    methods do blocking file I/O and are safe to call from several threads;
+    the scraper runs them with ``asyncio.to_thread``.
+    """
+
+    def __init__(self, directory: str = config.SCRAPE_CACHE_DIR,
+                 ttl: float = config.SCRAPE_CACHE_TTL_SECONDS,
+                 max_bytes: int = config.SCRAPE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.parsed_hits = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        # Entry key -> compressed body size, least recently used first
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._load_index()
+        with self._lock:
+            self._evict()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _key_paths(self, key: str):
+        stem = os.path.join(self.directory, key[:2], key)
+        return stem + '.json', stem + '.html.gz'
+
+    def _paths(self, url: str):
+        return self._key_paths(self._key(url))
+
+    def _load_index(self):
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.html.gz'):
+                    key = name[:-len('.html.gz')]
+                    meta_path, body_path = self._key_paths(key)
+                    try:
+                        size = os.path.getsize(body_path)
+                        # The metadata mtime records the last access across runs
+                        accessed = os.path.getmtime(meta_path) if os.path.exists(meta_path) else 0
+                    except OSError:
+                        continue
+                    entries.append((accessed, key, size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._bytes += size
+
+    def _touch(self, key: str):
+        with self._lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, 'wb') as file:
+            file.write(data)
+        os.replace(temporary, path)
+
+    def _write_meta(self, url: str, meta: Dict[str, Any]):
+        self._write(self._paths(url)[0], json.dumps(meta).encode('utf-8'))
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """Metadata of the cached entry for ``url``, fresh or stale."""
+        key = self._key(url)
+        with self._lock:
+            if key not in self._index:
+                return None
+        meta_path, _ = self._key_paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+            # The metadata mtime doubles as the entry's last access in the next run
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            return None
+        self._touch(key)
+        return meta
+
+    def is_fresh(self, meta: Dict[str, Any]) -> bool:
+        return time.time() - meta['fetched_at'] < self.ttl
+
+    def read(self, meta: Dict[str, Any]) -> Optional[str]:
+        try:
+            with gzip.open(self._paths(meta['url'])[1], 'rt', encoding='utf-8') as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def get(self, url: str) -> Optional[str]:
+        """The cached body if it is still within the TTL, counted as a hit."""
+        meta = self.lookup(url)
+        html = self.read(meta) if meta is not None and self.is_fresh(meta) else None
+        if html is not None:
+            with self._lock:
+                self.hits += 1
+        return html
+
+    def get_parsed(self, url: str, key: str, fresh_only: bool = False):
+        """``(True, record)`` if a record parsed with ``key`` is cached, else ``(False, None)``.
+
+        With ``fresh_only`` the entry must be within the TTL, and finding it
+        counts as a cache hit since neither the network nor the body is needed.
+        """
+        meta = self.lookup(url)
+        if meta is None or key not in meta['parsed'] or (fresh_only and not self.is_fresh(meta)):
+            return False, None
+        with self._lock:
+            if fresh_only:
+                self.hits += 1
+            self.parsed_hits += 1
+        return True, meta['parsed'][key]
+
+    @staticmethod
+    def conditional_headers(meta: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def store(self, url: str, html: str, headers: Mapping[str, str]):
+        """Save a 200 response; parsed records survive if the body is unchanged."""
+        previous = self.lookup(url)
+        digest = hashlib.sha256(html.encode('utf-8')).hexdigest()
+        key = self._key(url)
+        _, body_path = self._key_paths(key)
+
+        if previous is None or previous['sha256'] != digest:
+            body = gzip.compress(html.encode('utf-8'), compresslevel=5)
+            self._write(body_path, body)
+            with self._lock:
+                self._bytes += len(body) - self._index.pop(key, 0)
+                self._index[key] = len(body)
+            parsed = {}
+        else:
+            parsed = previous['parsed']
+
+        self._write_meta(url, {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+            'sha256': digest,
+            'parsed': parsed,
+        })
+        with self._lock:
+            self.misses += 1
+            self._evict()
+
+    def refresh(self, meta: Dict[str, Any], headers: Mapping[str, str]) -> Optional[str]:
+        """Handle a 304: restart the TTL and return the cached body."""
+        meta['fetched_at'] = time.time()
+        meta['etag'] = headers.get('ETag', meta.get('etag'))
+        meta['last_modified'] = headers.get('Last-Modified', meta.get('last_modified'))
+        self._write_meta(meta['url'], meta)
+        with self._lock:
+            self.revalidated += 1
+        return self.read(meta)
+
+    def store_parsed(self, url: str, key: str, record: Any):
+        meta = self.lookup(url)
+        if meta is not None:
+            meta['parsed'][key] = record
+            self._write_meta(url, meta)
+
+    def _remove_files(self, key: str):
+        for path in self._key_paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Drop least recently used entries; call with the lock held."""
+        # Keep the newest entry, even if it alone is over the limit
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            self._remove_files(key)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._index)
+            self._index.clear()
+            self._bytes = 0
+        for key in keys:
+            self._remove_files(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.hits + self.revalidated + self.misses
+            return {
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'parsed_hits': self.parsed_hits,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.revalidated) / requests if requests else 0.0,
+                'bytes': self._bytes,
+                'entries': len(self._index),
+            }
@@ -0,0 +1,214 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Callable, Collection, List, Dict, Any, Optional
+from urllib.parse import urlsplit, quote_plus
+import httpx
+from parsers import parse_search_page, parse_gig_page
+from scrape_cache import ScrapeCache
+import config
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second with bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncGigScraper:
+    """Concurrent Fiverr scraper over one pooled HTTP client.
+
+    Requests are limited per host by a semaphore and a token bucket, and
+    failed requests (transport errors, 429 and 5xx) are retried with
+    exponential backoff and jitter. Pages are parsed with the ``parser``
+    backend from parsers.py, in a process pool when ``parse_workers`` > 0 so
+    parsing never blocks the fetch loop. ``base_url`` and ``transport`` can
+    point the scraper at a local stand-in server or an ``httpx.MockTransport``.
+    With a ``cache`` (scrape_cache.ScrapeCache), pages within its TTL and
+    their parsed records are served from disk and stale pages are
+    revalidated with conditional requests. Cache reads and writes run in
+    worker threads, off the event loop.
+    """
+
+    def __init__(self, base_url: str = config.SCRAPER_BASE_URL,
+                 concurrency_per_host: int = config.SCRAPER_CONCURRENCY_PER_HOST,
+                 requests_per_second: float = config.SCRAPER_REQUESTS_PER_SECOND,
+                 max_retries: int = config.SCRAPER_MAX_RETRIES,
+                 backoff: float = config.SCRAPER_BACKOFF_SECONDS,
+                 max_pages: int = config.SCRAPER_MAX_PAGES,
+                 timeout: float = config.SCRAPER_TIMEOUT_SECONDS,
+                 parser: str = config.SCRAPER_PARSER,
+                 parse_workers: int = config.SCRAPER_PARSE_WORKERS,
+                 transport: httpx.AsyncBaseTransport = None,
+                 cache: Optional[ScrapeCache] = None):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency_per_host = concurrency_per_host
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.transport = transport
+        self.cache = cache
+        self.parser = parser
+        self.parse_workers = parse_workers
+        self.client: Optional[httpx.AsyncClient] = None
+        self._parse_executor: Optional[ProcessPoolExecutor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    async def __aenter__(self) -> 'AsyncGigScraper':
+        self.client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.concurrency_per_host * 2,
+                max_keepalive_connections=self.concurrency_per_host,
+            ),
+            transport=self.transport,
+        )
+        if self.parse_workers > 0:
+            self._parse_executor = ProcessPoolExecutor(max_workers=self.parse_workers)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+        if self._parse_executor is not None:
+            self._parse_executor.shutdown(cancel_futures=True)
+            self._parse_executor = None
+
+    async def parse(self, function: Callable[[str, str], Any], html: str) -> Any:
+        """Run a parsers.py entry point, off the event loop when a pool is configured."""
+        if self._parse_executor is None:
+            return function(html, self.parser)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._parse_executor, partial(function, html, self.parser))
+
+    async def fetch(self, url: str) -> Optional[str]:
+        """GET a page with rate limiting and retries; None once retries are exhausted."""
+        meta = None
+        if self.cache is not None:
+            html = await asyncio.to_thread(self.cache.get, url)
+            if html is not None:
+                return html
+            meta = await asyncio.to_thread(self.cache.lookup, url)
+        headers = self.cache.conditional_headers(meta) if self.cache is not None else {}
+
+        host = urlsplit(url).netloc
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.concurrency_per_host))
+        bucket = self._buckets.setdefault(
+            host, TokenBucket(self.requests_per_second, self.concurrency_per_host)
+        )
+
+        for attempt in range(self.max_retries + 1):
+            delay = self.backoff * 2 ** attempt * (0.5 + random.random())
+            await bucket.acquire()
+            async with semaphore:
+                try:
+                    response = await self.client.get(url, headers=headers)
+                except httpx.TransportError as exception:
+                    print(f"Request to {url} failed: {exception}")
+                    response = None
+
+            if response is not None:
+                if response.status_code == 304 and meta is not None:
+                    html = await asyncio.to_thread(self.cache.refresh, meta, response.headers)
+                    if html is not None:
+                        return html
+                    headers = {}
+                    continue
+                if response.is_success:
+                    if self.cache is not None:
+                        await asyncio.to_thread(self.cache.store, url, response.text, response.headers)
+                    return response.text
+                if response.status_code not in RETRY_STATUSES:
+                    print(f"Failed to retrieve {url}: HTTP {response.status_code}")
+                    return None
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = max(delay, float(retry_after))
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(delay)
+
+        print(f"Giving up on {url} after {self.max_retries + 1} attempts")
+        return None
+
+    def search_url(self, keyword: str, page: int) -> str:
+        return f"{self.base_url}/search/gigs?query={quote_plus(keyword)}&page={page}"
+
+    async def fetch_parsed(self, url: str, function: Callable[[str, str], Any]) -> Any:
+        """Fetch ``url`` and parse it with ``function``, reusing cached records."""
+        key = f"{function.__name__}:{self.parser}"
+        if self.cache is not None:
+            found, record = await asyncio.to_thread(self.cache.get_parsed, url, key, True)
+            if found:
+                return record
+
+        html = await self.fetch(url)
+        if not html:
+            return None
+        if self.cache is not None:
+            # A 304 or an unchanged body keeps the records parsed last time
+            found, record = await asyncio.to_thread(self.cache.get_parsed, url, key)
+            if found:
+                return record
+
+        record = await self.parse(function, html)
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.store_parsed, url, key, record)
+        return record
+
+    async def scrape_gig(self, path: str) -> Optional[Dict[str, Any]]:
+        gig = await self.fetch_parsed(f"{self.base_url}{path}", parse_gig_page)
+        return dict(gig, url=path) if gig is not None else None
+
+    async def scrape(self, keyword: str, skip: Collection[str] = ()) -> AsyncIterator[Dict[str, Any]]:
+        """Yield gigs for ``keyword`` as their detail pages complete, page by page.
+
+        Gig paths in ``skip`` (e.g. ``CrawlStore.done`` of a resumed crawl)
+        are not fetched again.
+        """
+        seen = set()
+        for page in range(1, self.max_pages + 1):
+            found = await self.fetch_parsed(self.search_url(keyword, page), parse_search_page) or []
+            paths = [path for path in found if path not in seen]
+            if not paths:
+                break
+            seen.update(paths)
+
+            pending = [self.scrape_gig(path) for path in paths if path not in skip]
+            for task in asyncio.as_completed(pending):
+                gig = await task
+                if gig is not None:
+                    yield gig
+
+
+async def scrape_keyword(keyword: str, **options) -> List[Dict[str, Any]]:
+    async with AsyncGigScraper(**options) as scraper:
+        return [gig async for gig in scraper.scrape(keyword)]
@@ -0,0 +1,167 @@
+import heapq
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from itertools import islice
+from typing import List, Dict, Optional
+import config
+
+TOKEN_PATTERN = re.compile(r'\w+')
+FIELDS = ('title', 'description', 'tags')
+# Terms are indexed by every substring of up to GRAM_SIZE characters
+GRAM_SIZE = 3
+
+
+def score_gig(gig: Dict, keywords: List[str], field_weights: Optional[Dict[str, float]] = None) -> float:
+    """Score a single gig the way ``SearchIndex.search`` ranks it, without an index."""
+    weights = field_weights or config.SEARCH_FIELD_WEIGHTS
+    weights = [weights.get(field, 1.0) for field in FIELDS]
+    texts = SearchIndex._field_texts(gig)
+    combined = " ".join(texts)
+
+    score = 0
+    for keyword in keywords:
+        keyword = keyword.lower()
+        matched = [weight for text, weight in zip(texts, weights) if keyword in text]
+        if matched:
+            score += max(matched)
+        elif keyword in combined:
+            score += min(weights)
+    return score
+
+
+class SearchIndex:
+    """Inverted index over gig title, description and tags.
+
+    Every term maps to a posting list of ``gig id -> field mask`` so a query
+    only touches the gigs that can possibly match. Keywords keep the substring
+    semantics of ``Fetcher.match_score``: a query token matches every indexed
+    term that contains it, and multi-word keywords are verified against the
+    candidate gigs only.
+
+    Terms containing a token are found through an n-gram index of the
+    vocabulary rather than a scan of it. Expanded tokens are memoized in an
+    LRU bounded by the number of gig entries it holds
+    (``config.SEARCH_EXPANSION_CACHE_MAX_ENTRIES``), since one index is
+    shared by every session.
+    """
+
+    def __init__(self, gigs: List[Dict], field_weights: Optional[Dict[str, float]] = None,
+                 expansion_capacity: int = config.SEARCH_EXPANSION_CACHE_MAX_ENTRIES):
+        self.gigs = gigs
+        weights = field_weights or config.SEARCH_FIELD_WEIGHTS
+        self.field_weights = [weights.get(field, 1.0) for field in FIELDS]
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.terms: List[str] = []
+        self.grams: Dict[str, List[int]] = defaultdict(list)
+        self.expansion_capacity = expansion_capacity
+        self._expansions: "OrderedDict[str, Dict[int, int]]" = OrderedDict()
+        self._expansion_entries = 0
+        self._expansion_lock = threading.Lock()
+        self._build()
+
+    def _build(self):
+        for gig_id, gig in enumerate(self.gigs):
+            for bit, text in enumerate(self._field_texts(gig)):
+                for term in set(TOKEN_PATTERN.findall(text)):
+                    posting = self.postings[term]
+                    posting[gig_id] = posting.get(gig_id, 0) | (1 << bit)
+        self.postings = dict(self.postings)
+
+        self.terms = list(self.postings)
+        for term_id, term in enumerate(self.terms):
+            for gram in self._grams(term):
+                self.grams[gram].append(term_id)
+        self.grams = dict(self.grams)
+
+    @staticmethod
+    def _grams(term: str) -> set:
+        return {term[start:start + size] for size in range(1, GRAM_SIZE + 1)
+                for start in range(len(term) - size + 1)}
+
+    @staticmethod
+    def _field_texts(gig: Dict) -> List[str]:
+        return [
+            gig.get("title", "").lower(),
+            gig.get("description", "").lower(),
+            " ".join(gig.get("tags", [])).lower(),
+        ]
+
+    @property
+    def expansion_entries(self) -> int:
+        """Gig entries currently held by the expansion memo."""
+        return self._expansion_entries
+
+    def _matching_terms(self, token: str) -> List[str]:
+        """Indexed terms containing ``token``."""
+        if len(token) <= GRAM_SIZE:
+            return [self.terms[term_id] for term_id in self.grams.get(token, ())]
+        # Every trigram of the token must occur in the term; verify the survivors
+        lists = sorted((self.grams.get(token[start:start + GRAM_SIZE], ())
+                        for start in range(len(token) - GRAM_SIZE + 1)), key=len)
+        candidates = set(lists[0]).intersection(*lists[1:])
+        return [self.terms[term_id] for term_id in sorted(candidates) if token in self.terms[term_id]]
+
+    def _expand(self, token: str) -> Dict[int, int]:
+        """Field masks of the gigs whose indexed terms contain ``token``."""
+        with self._expansion_lock:
+            masks = self._expansions.get(token)
+            if masks is not None:
+                self._expansions.move_to_end(token)
+                return masks
+
+        masks = defaultdict(int)
+        for term in self._matching_terms(token):
+            for gig_id, mask in self.postings[term].items():
+                masks[gig_id] |= mask
+        masks = dict(masks)
+
+        with self._expansion_lock:
+            if token not in self._expansions:
+                self._expansions[token] = masks
+                self._expansion_entries += len(masks)
+            # Keep the newest expansion even if it alone exceeds the capacity
+            while self._expansion_entries > self.expansion_capacity and len(self._expansions) > 1:
+                _, evicted = self._expansions.popitem(last=False)
+                self._expansion_entries -= len(evicted)
+        return masks
+
+    def _weight(self, mask: int) -> float:
+        return max(weight for bit, weight in enumerate(self.field_weights) if mask & (1 << bit))
+
+    def _score_keyword(self, keyword: str, scores: Dict[int, float]):
+        tokens = TOKEN_PATTERN.findall(keyword)
+        if tokens == [keyword]:
+            # A bare term matches wherever an indexed term contains it, so the
+            # field masks can be read from the posting lists directly
+            for gig_id, mask in self._expand(keyword).items():
+                scores[gig_id] = scores.get(gig_id, 0) + self._weight(mask)
+            return
+
+        if tokens:
+            expansions = sorted((self._expand(token) for token in tokens), key=len)
+            candidates = set(expansions[0]).intersection(*expansions[1:])
+        else:
+            candidates = range(len(self.gigs))
+
+        fallback = min(self.field_weights)
+        for gig_id in candidates:
+            texts = self._field_texts(self.gigs[gig_id])
+            mask = sum(1 << bit for bit, text in enumerate(texts) if keyword in text)
+            if mask:
+                scores[gig_id] = scores.get(gig_id, 0) + self._weight(mask)
+            elif keyword in " ".join(texts):
+                # Phrase spans two fields of the concatenated text
+                scores[gig_id] = scores.get(gig_id, 0) + fallback
+
+    def search(self, keywords: List[str], limit: int = config.NUMBER_OF_GIGS) -> List[Dict]:
+        scores: Dict[int, float] = {}
+        for keyword in keywords:
+            self._score_keyword(keyword.lower(), scores)
+
+        # Ties keep dataset order, like the stable sort this replaces
+        top = heapq.nlargest(limit, scores, key=lambda gig_id: (scores[gig_id], -gig_id))
+        if len(top) < limit:
+            unmatched = (gig_id for gig_id in range(len(self.gigs)) if gig_id not in scores)
+            top.extend(islice(unmatched, limit - len(top)))
+        return [self.gigs[gig_id] for gig_id in top]
@@ -0,0 +1,520 @@
+import hashlib
+import heapq
+import math
+import random
+from collections import Counter
+from itertools import chain
+from typing import List, Dict, Any, Tuple, Iterable, Sequence
+import numpy as np
+import config
+
+
+class RunningMoments:
+    """Count, total, mean and variance that can be updated, merged and un-merged.
+
+    Groups are combined with Chan et al.'s parallel update, so adding or
+    removing a batch costs O(batch) regardless of how much data came before.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> 'RunningMoments':
+        moments = cls()
+        if len(values):
+            moments.count = len(values)
+            moments.total = values.sum()
+            moments.mean = values.mean()
+            moments.m2 = ((values - moments.mean) ** 2).sum()
+            moments.min = values.min()
+            moments.max = values.max()
+        return moments
+
+    def update(self, values: np.ndarray):
+        self.merge(RunningMoments.from_values(values))
+
+    def merge(self, other: 'RunningMoments'):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / count
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+        self.total = self.total + other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count = count
+
+    def remove(self, values: np.ndarray):
+        """Take a batch back out. min/max cannot be un-merged; callers reset them."""
+        other = RunningMoments.from_values(values)
+        remaining = self.count - other.count
+        if remaining <= 0:
+            self.__init__()
+            return
+
+        mean = (self.count * self.mean - other.count * other.mean) / remaining
+        delta = other.mean - mean
+        self.m2 = max(self.m2 - other.m2 - delta ** 2 * remaining * other.count / self.count, 0.0)
+        self.mean = mean
+        self.total = self.total - other.total
+        self.count = remaining
+
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1), like pandas."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+
+class TrendFit:
+    """Trend line ``y = intercept + slope * x`` and its quality over the data.
+
+    With ``log`` the line lives in log1p space (``log1p(y)`` on
+    ``log1p(x)``), so ``predict`` returns a curve. ``r_squared`` and
+    ``rmse`` are measured in the space the line was fitted in. A fit over
+    fewer than two distinct x values is not ``valid``.
+    """
+
+    def __init__(self, method: str, slope: float, intercept: float, count: int,
+                 r_squared: float, rmse: float, log: bool = False):
+        self.method = method
+        self.slope = float(slope)
+        self.intercept = float(intercept)
+        self.count = int(count)
+        self.r_squared = float(r_squared)
+        self.rmse = float(rmse)
+        self.log = log
+
+    @property
+    def valid(self) -> bool:
+        return bool(np.isfinite(self.slope) and np.isfinite(self.intercept))
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        if self.log:
+            return np.expm1(self.intercept + self.slope * np.log1p(x))
+        return self.intercept + self.slope * x
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class TrendAccumulator:
+    """Sufficient statistics of a least-squares line, updated, merged and un-merged.
+
+    Holds the count, means and centred co-moments of x and y, the same
+    information as the sums of x, y, xy, x² and y² but without their
+    cancellation on large values; batches combine like ``RunningMoments``.
+    Any candidate line is scored in O(1). With ``log`` values go through
+    log1p first, which tames heavy-tailed order counts.
+    """
+
+    def __init__(self, log: bool = False):
+        self.log = log
+        self.count = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.cxx = 0.0
+        self.cyy = 0.0
+        self.cxy = 0.0
+
+    @classmethod
+    def from_values(cls, x: np.ndarray, y: np.ndarray, log: bool = False) -> 'TrendAccumulator':
+        trend = cls(log)
+        x, y = trend._transform(x), trend._transform(y)
+        if len(x):
+            trend.count = len(x)
+            trend.mean_x = x.mean()
+            trend.mean_y = y.mean()
+            dx, dy = x - trend.mean_x, y - trend.mean_y
+            trend.cxx = (dx * dx).sum()
+            trend.cyy = (dy * dy).sum()
+            trend.cxy = (dx * dy).sum()
+        return trend
+
+    def _transform(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=float)
+        return np.log1p(values) if self.log else values
+
+    def update(self, x: np.ndarray, y: np.ndarray):
+        self.merge(TrendAccumulator.from_values(x, y, self.log))
+
+    def merge(self, other: 'TrendAccumulator'):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return
+
+        count = self.count + other.count
+        dx, dy = other.mean_x - self.mean_x, other.mean_y - self.mean_y
+        weight = self.count * other.count / count
+        self.cxx += other.cxx + dx * dx * weight
+        self.cyy += other.cyy + dy * dy * weight
+        self.cxy += other.cxy + dx * dy * weight
+        self.mean_x += dx * other.count / count
+        self.mean_y += dy * other.count / count
+        self.count = count
+
+    def remove(self, x: np.ndarray, y: np.ndarray):
+        """Take a batch back out."""
+        other = TrendAccumulator.from_values(x, y, self.log)
+        remaining = self.count - other.count
+        if remaining <= 0:
+            self.__init__(self.log)
+            return
+
+        mean_x = (self.count * self.mean_x - other.count * other.mean_x) / remaining
+        mean_y = (self.count * self.mean_y - other.count * other.mean_y) / remaining
+        dx, dy = other.mean_x - mean_x, other.mean_y - mean_y
+        weight = remaining * other.count / self.count
+        self.cxx = max(self.cxx - other.cxx - dx * dx * weight, 0.0)
+        self.cyy = max(self.cyy - other.cyy - dy * dy * weight, 0.0)
+        self.cxy = self.cxy - other.cxy - dx * dy * weight
+        self.mean_x, self.mean_y = mean_x, mean_y
+        self.count = remaining
+
+    @property
+    def degenerate(self) -> bool:
+        """Fewer than two distinct x values (up to rounding), so no slope exists."""
+        return self.count < 2 or self.cxx <= 1e-12 * self.count * max(self.mean_x ** 2, 1.0)
+
+    def evaluate(self, slope: float, intercept: float, method: str) -> TrendFit:
+        """Quality of an arbitrary line over everything accumulated."""
+        offset = self.mean_y - intercept - slope * self.mean_x
+        sse = max(self.cyy - 2 * slope * self.cxy + slope ** 2 * self.cxx + self.count * offset ** 2, 0.0)
+        r_squared = 1 - sse / self.cyy if self.cyy > 0 else np.nan
+        rmse = math.sqrt(sse / self.count) if self.count else np.nan
+        return TrendFit(method, slope, intercept, self.count, r_squared, rmse, self.log)
+
+    def fit(self) -> TrendFit:
+        """Ordinary least squares over everything accumulated."""
+        method = 'log' if self.log else 'ols'
+        if self.degenerate:
+            return TrendFit(method, np.nan, np.nan, self.count, np.nan, np.nan, self.log)
+        slope = self.cxy / self.cxx
+        return self.evaluate(slope, self.mean_y - slope * self.mean_x, method)
+
+
+def theil_sen(x: np.ndarray, y: np.ndarray) -> Tuple[float, float]:
+    """Median pairwise slope and median residual intercept; NaN without two distinct x.
+
+    Quadratic in ``len(x)``, so callers pass a bounded sample.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    first, second = np.triu_indices(len(x), 1)
+    dx = x[second] - x[first]
+    distinct = dx != 0
+    if not distinct.any():
+        return np.nan, np.nan
+    slope = np.median((y[second] - y[first])[distinct] / dx[distinct])
+    return slope, np.median(y - slope * x)
+
+
+class KLLSketch:
+    """Mergeable streaming quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Items live in a stack of compactors; level h holds items of weight 2^h
+    and gets capacity of roughly k * (2/3)^(depth - h). An overfull level is
+    sorted and every other item is promoted, starting at a random offset.
+    Memory is O(k log(n/k)). With the default k=200 the normalized rank error
+    of a quantile query is about 1.65% at 99% confidence, and merging
+    sketches of separate partitions keeps the same bound.
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self.compactors: List[np.ndarray] = [np.empty(0)]
+        self._random = random.Random(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors)
+        return max(int(math.ceil(self.k * (2 / 3) ** (depth - level - 1))), 2)
+
+    def update(self, values: Sequence[float]):
+        values = np.asarray(values, dtype=float)
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self._compress()
+
+    def merge(self, other: 'KLLSketch'):
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+        for level, items in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        # Adding a level shrinks the capacity of the ones below it, so sweep
+        # until no level is overfull
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.compactors)):
+                items = self.compactors[level]
+                if len(items) <= self._capacity(level):
+                    continue
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.empty(0))
+                items = np.sort(items)
+                # An odd leftover stays behind so every promoted item is a full pair
+                keep = items[:len(items) % 2]
+                items = items[len(keep):]
+                promoted = items[self._random.randint(0, 1)::2]
+                self.compactors[level] = keep
+                self.compactors[level + 1] = np.concatenate([self.compactors[level + 1], promoted])
+                compacted = True
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        items = np.concatenate(self.compactors)
+        if len(items) == 0:
+            return [np.nan for _ in qs]
+        weights = np.concatenate([
+            np.full(len(level_items), 2 ** level, dtype=float)
+            for level, level_items in enumerate(self.compactors)
+        ])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side='left')
+        return items[np.minimum(positions, len(items) - 1)].tolist()
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles([q])[0]
+
+
+def _hash64(item: str, seed: int = 0) -> int:
+    """Stable 64-bit hash; unlike hash() it agrees across processes, so sketches merge."""
+    digest = hashlib.blake2b(item.encode('utf-8'), digest_size=8, salt=seed.to_bytes(8, 'little'))
+    return int.from_bytes(digest.digest(), 'little')
+
+
+class CountMinSketch:
+    """Frequency estimates that never undercount.
+
+    With width w = ceil(e / epsilon) and depth d = ceil(ln(1 / delta)) an
+    estimate exceeds the true count by more than epsilon * N (N = total
+    count added) with probability at most delta. Sketches with the same
+    shape merge by adding their tables.
+    """
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01):
+        self.width = int(math.ceil(math.e / epsilon))
+        self.depth = int(math.ceil(math.log(1 / delta)))
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total = 0
+
+    def _columns(self, item: str) -> List[int]:
+        # Double hashing: row i probes h1 + i * h2
+        h1, h2 = _hash64(item), _hash64(item, seed=1) | 1
+        return [(h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def update(self, item: str, count: int = 1):
+        self.table[np.arange(self.depth), self._columns(item)] += count
+        self.total += count
+
+    def estimate(self, item: str) -> int:
+        return int(self.table[np.arange(self.depth), self._columns(item)].min())
+
+    def merge(self, other: 'CountMinSketch'):
+        if self.table.shape != other.table.shape:
+            raise ValueError("Count-Min sketches must share width and depth to merge")
+        self.table += other.table
+        self.total += other.total
+
+
+class SpaceSaving:
+    """Top-k heavy hitters in O(capacity) memory (Metwally et al., 2005).
+
+    Every item whose true count exceeds N / capacity is retained, and a
+    reported count overestimates the truth by at most N / capacity (tracked
+    per item as ``error``). Summaries merge as in Agarwal et al.'s
+    mergeable summaries and stay within the same bound.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+
+    def update(self, item: str, count: int = 1):
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            evicted, floor = self._pop_min()
+            del self.counts[evicted], self.errors[evicted]
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, item) for item, count in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[str, int]:
+        # Heap entries go stale when a count grows; skip until one is current
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return item, count
+
+    def min_count(self) -> int:
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other: 'SpaceSaving'):
+        floor, other_floor = self.min_count(), other.min_count()
+        counts, errors = {}, {}
+        for item in self.counts.keys() | other.counts.keys():
+            counts[item] = self.counts.get(item, floor) + other.counts.get(item, other_floor)
+            errors[item] = self.errors.get(item, floor) + other.errors.get(item, other_floor)
+        kept = heapq.nlargest(self.capacity, counts, key=counts.get)
+        self.counts = {item: counts[item] for item in kept}
+        self.errors = {item: errors[item] for item in kept}
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def most_common(self, n: int) -> List[Tuple[str, int]]:
+        return heapq.nlargest(n, self.counts.items(), key=lambda entry: entry[1])
+
+
+class HyperLogLog:
+    """Distinct-count estimate with relative standard error 1.04 / sqrt(2^precision)."""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, item: str):
+        value = _hash64(item)
+        register = value >> (64 - self.precision)
+        rest = value & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[register]:
+            self.registers[register] = rank
+
+    def merge(self, other: 'HyperLogLog'):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(2.0 ** -self.registers.astype(float))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are empty
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class GigSketch:
+    """Bounded-memory, mergeable stand-in for DataProcessor's summary queries.
+
+    Price and completed_orders quantiles come from KLL sketches (about 1.65%
+    rank error at 99% confidence for k=200), exact moments from
+    RunningMoments, top keywords from Space-Saving candidates refined with
+    Count-Min (each count overestimates by at most min(N / capacity,
+    epsilon * N) with probability 1 - delta, N = total tags) and unique tags
+    from HyperLogLog (~0.8% standard error). Build one sketch per partition
+    or stream, then ``merge`` them.
+    """
+
+    def __init__(self, kll_k: int = config.SKETCH_KLL_K,
+                 epsilon: float = config.SKETCH_CM_EPSILON,
+                 delta: float = config.SKETCH_CM_DELTA,
+                 capacity: int = config.SKETCH_TOP_KEYWORDS_CAPACITY):
+        self.total_gigs = 0
+        self.total_tags = 0
+        self.moments = {column: RunningMoments() for column in ('price', 'completed_orders')}
+        self.quantiles = {column: KLLSketch(k=kll_k) for column in ('price', 'completed_orders')}
+        self.tag_frequencies = CountMinSketch(epsilon, delta)
+        self.top_tags = SpaceSaving(capacity)
+        self.unique_tags = HyperLogLog()
+
+    def update(self, gigs: Iterable[Dict[str, Any]], batch_size: int = config.SKETCH_BATCH_SIZE):
+        batch = []
+        for gig in gigs:
+            batch.append(gig)
+            if len(batch) >= batch_size:
+                self._update_batch(batch)
+                batch = []
+        self._update_batch(batch)
+
+    def _update_batch(self, gigs: List[Dict[str, Any]]):
+        if not gigs:
+            return
+        self.total_gigs += len(gigs)
+        for column in self.moments:
+            values = np.array([gig[column] for gig in gigs])
+            self.moments[column].update(values)
+            self.quantiles[column].update(values)
+
+        # Pre-aggregate the batch so each distinct tag is hashed once
+        batch_counts = Counter(chain.from_iterable(gig['tags'] for gig in gigs))
+        self.total_tags += sum(batch_counts.values())
+        for tag, count in batch_counts.items():
+            self.tag_frequencies.update(tag, count)
+            self.top_tags.update(tag, count)
+            self.unique_tags.update(tag)
+
+    def merge(self, other: 'GigSketch'):
+        self.total_gigs += other.total_gigs
+        self.total_tags += other.total_tags
+        for column in self.moments:
+            self.moments[column].merge(other.moments[column])
+            self.quantiles[column].merge(other.quantiles[column])
+        self.tag_frequencies.merge(other.tag_frequencies)
+        self.top_tags.merge(other.top_tags)
+        self.unique_tags.merge(other.unique_tags)
+
+    def get_summary_statistics(self) -> Dict[str, Any]:
+        unique_tags = min(self.unique_tags.count(), self.total_tags)
+        return {
+            'total_gigs': self.total_gigs,
+            'total_tags': self.total_tags,
+            'unique_tags': unique_tags,
+            'duplicate_tags': self.total_tags - unique_tags,
+            'average_price': self.moments['price'].mean,
+            'median_price': self.quantiles['price'].quantile(0.5),
+            'total_orders': self.moments['completed_orders'].total,
+            'average_orders': self.moments['completed_orders'].mean,
+        }
+
+    def get_average_price(self) -> float:
+        return self.moments['price'].mean
+
+    def get_price_statistics(self) -> Dict[str, float]:
+        moments = self.moments['price']
+        q1, median, q3 = self.quantiles['price'].quantiles([0.25, 0.5, 0.75])
+        return {'mean': moments.mean, 'median': median, 'std': moments.std,
+                'min': moments.min, 'max': moments.max, 'q1': q1, 'q3': q3}
+
+    def get_order_statistics(self) -> Dict[str, float]:
+        moments = self.moments['completed_orders']
+        return {'mean': moments.mean, 'median': self.quantiles['completed_orders'].quantile(0.5),
+                'std': moments.std, 'min': moments.min, 'max': moments.max, 'total': moments.total}
+
+    def get_top_keywords(self, n: int = config.NUMBER_OF_GIGS) -> List[Tuple[str, int]]:
+        # Both summaries only overcount, so the smaller estimate is the tighter one
+        refined = [
+            (tag, min(count, self.tag_frequencies.estimate(tag)))
+            for tag, count in self.top_tags.counts.items()
+        ]
+        return heapq.nlargest(n, refined, key=lambda entry: entry[1])
+
+    def get_keyword_frequency(self) -> Dict[str, int]:
+        return dict(self.get_top_keywords(self.top_tags.capacity))
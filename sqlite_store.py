@@ -0,0 +1,221 @@
+"""SQLite gig store with an FTS5 keyword index.
+
+    python -m sqlite_store sample-gigs-data.json gigs.db
+
+Gigs and tags live in normalized tables (``gigs``, ``tags`` and the
+ordered ``gig_tags`` link table) next to an FTS5 table over title,
+description and tags. Searches rank with bm25 and stop at a LIMIT, and
+tag frequencies and co-occurrences are aggregated in SQL over the gigs
+matching a query, so nothing is loaded into Python beyond the results.
+"""
+import argparse
+import json
+import re
+import sqlite3
+import threading
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import config
+
+SQLITE_MAGIC = b'SQLite format 3\x00'
+INSERT_BATCH_SIZE = 10000
+TOKEN_PATTERN = re.compile(r'\w+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS gigs (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    completed_orders INTEGER NOT NULL,
+    price REAL NOT NULL,
+    url TEXT
+);
+CREATE TABLE IF NOT EXISTS tags (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+-- One row per tag occurrence; rowid order is gig order, then tag position
+CREATE TABLE IF NOT EXISTS gig_tags (
+    gig_id INTEGER NOT NULL REFERENCES gigs(id),
+    tag_id INTEGER NOT NULL REFERENCES tags(id)
+);
+CREATE INDEX IF NOT EXISTS gig_tags_gig ON gig_tags(gig_id);
+CREATE INDEX IF NOT EXISTS gig_tags_tag ON gig_tags(tag_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS gigs_fts USING fts5(
+    title, description, tags, content='', prefix='2 3'
+);
+"""
+
+
+def is_sqlite(path: str) -> bool:
+    with open(path, 'rb') as file:
+        return file.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC
+
+
+def match_query(keywords: List[str]) -> Optional[str]:
+    """FTS5 query matching any keyword; the last word of each is a prefix."""
+    phrases = []
+    for keyword in keywords:
+        tokens = TOKEN_PATTERN.findall(keyword.lower())
+        if tokens:
+            phrases.append(f'"{" ".join(tokens)}" *')
+    return ' OR '.join(phrases) or None
+
+
+class GigDatabase:
+    """Single-file gig store; every thread gets its own connection."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self.connection.executescript(SCHEMA)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if getattr(self._local, 'connection', None) is None:
+            self._local.connection = sqlite3.connect(self.path)
+        return self._local.connection
+
+    def import_gigs(self, gigs: Iterable[Dict[str, Any]], batch_size: int = INSERT_BATCH_SIZE) -> int:
+        """Append gigs in batched transactions and return how many were added."""
+        connection = self.connection
+        tag_ids = dict(connection.execute("SELECT name, id FROM tags"))
+        next_id = connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM gigs").fetchone()[0]
+        gigs, count = iter(gigs), 0
+
+        while True:
+            batch = list(islice(gigs, batch_size))
+            if not batch:
+                return count
+            rows, links, texts, new_tags = [], [], [], []
+            for gig_id, gig in enumerate(batch, start=next_id):
+                rows.append((gig_id, gig['title'], gig['description'], gig['completed_orders'],
+                             gig['price'], gig.get('url')))
+                texts.append((gig_id, gig['title'], gig['description'], ' '.join(gig['tags'])))
+                for tag in gig['tags']:
+                    if tag not in tag_ids:
+                        tag_ids[tag] = len(tag_ids) + 1
+                        new_tags.append((tag_ids[tag], tag))
+                    links.append((gig_id, tag_ids[tag]))
+
+            with connection:
+                connection.executemany("INSERT INTO tags (id, name) VALUES (?, ?)", new_tags)
+                connection.executemany("INSERT INTO gigs VALUES (?, ?, ?, ?, ?, ?)", rows)
+                connection.executemany("INSERT INTO gig_tags VALUES (?, ?)", links)
+                connection.executemany(
+                    "INSERT INTO gigs_fts (rowid, title, description, tags) VALUES (?, ?, ?, ?)", texts
+                )
+            next_id += len(batch)
+            count += len(batch)
+
+    def _gigs(self, where: str, parameters: Tuple, order: str, limit: int) -> List[Dict[str, Any]]:
+        rows = self.connection.execute(f"""
+            SELECT g.id, g.title, g.description, g.completed_orders, g.price, g.url,
+                   (SELECT json_group_array(name) FROM (
+                        SELECT t.name FROM gig_tags gt JOIN tags t ON t.id = gt.tag_id
+                        WHERE gt.gig_id = g.id ORDER BY gt.rowid))
+            FROM {where} ORDER BY {order} LIMIT ?
+        """, (*parameters, limit)).fetchall()
+        gigs = []
+        for _, title, description, orders, price, url, tags in rows:
+            gig = {'title': title, 'description': description, 'tags': json.loads(tags),
+                   'completed_orders': orders, 'price': int(price) if price.is_integer() else price}
+            if url is not None:
+                gig['url'] = url
+            gigs.append(gig)
+        return gigs
+
+    def search(self, keywords: List[str], limit: int = config.NUMBER_OF_GIGS,
+               field_weights: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """Best ``limit`` gigs by bm25, topped up with unmatched gigs like ``SearchIndex.search``."""
+        weights = field_weights or config.SEARCH_FIELD_WEIGHTS
+        weights = [weights.get(field, 1.0) for field in ('title', 'description', 'tags')]
+        query = match_query(keywords)
+
+        gigs = []
+        if query is not None:
+            gigs = self._gigs(
+                "gigs_fts JOIN gigs g ON g.id = gigs_fts.rowid WHERE gigs_fts MATCH ?", (query,),
+                f"bm25(gigs_fts, {', '.join(map(str, weights))}), g.id", limit
+            )
+        if len(gigs) < limit:
+            if query is None:
+                gigs = self._gigs("gigs g", (), "g.id", limit)
+            else:
+                gigs += self._gigs(
+                    "gigs g WHERE g.id NOT IN (SELECT rowid FROM gigs_fts WHERE gigs_fts MATCH ?)", (query,),
+                    "g.id", limit - len(gigs)
+                )
+        return gigs
+
+    def _matched(self, keywords: Optional[List[str]]) -> Tuple[str, Tuple]:
+        """SQL filter on ``gig_tags`` restricting it to gigs matching ``keywords``."""
+        query = match_query(keywords) if keywords else None
+        if query is None:
+            return '', ()
+        return "WHERE gig_id IN (SELECT rowid FROM gigs_fts WHERE gigs_fts MATCH ?)", (query,)
+
+    def tag_frequency(self, keywords: Optional[List[str]] = None,
+                      limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Tag counts over the matched gigs, ties in first-seen order like ``DataProcessor``."""
+        where, parameters = self._matched(keywords)
+        rows = self.connection.execute(f"""
+            SELECT t.name, counts.n FROM (
+                SELECT tag_id, COUNT(*) AS n, MIN(rowid) AS first_seen FROM gig_tags {where} GROUP BY tag_id
+            ) counts JOIN tags t ON t.id = counts.tag_id
+            ORDER BY counts.n DESC, counts.first_seen LIMIT ?
+        """, (*parameters, -1 if limit is None else limit))
+        return rows.fetchall()
+
+    def tag_cooccurrence(self, keywords: Optional[List[str]] = None, min_cooccurrence: int = 2,
+                         limit: Optional[int] = None, presence: bool = False) -> List[Tuple[str, str, int]]:
+        """Tag pairs over the matched gigs, as ``DataProcessor.get_keyword_correlations``.
+
+        Counts multiply repeated tags within a gig like the processor's
+        default; with ``presence`` each gig counts a pair once.
+        """
+        where, parameters = self._matched(keywords)
+        count = "COUNT(DISTINCT a.gig_id)" if presence else "COUNT(*)"
+        # Pairs are oriented and tied by first-seen position among the matched gigs, like the processor's codes
+        rows = self.connection.execute(f"""
+            WITH matched AS (SELECT rowid AS position, gig_id, tag_id FROM gig_tags {where}),
+            first_seen AS (SELECT tag_id, MIN(position) AS position FROM matched GROUP BY tag_id),
+            ranked AS (SELECT m.gig_id, m.tag_id, f.position FROM matched m JOIN first_seen f USING (tag_id))
+            SELECT ta.name, tb.name, pairs.n FROM (
+                SELECT a.tag_id AS first, b.tag_id AS second, MIN(a.position) AS first_position,
+                       MIN(b.position) AS second_position, {count} AS n
+                FROM ranked a JOIN ranked b ON a.gig_id = b.gig_id AND a.position < b.position
+                GROUP BY a.tag_id, b.tag_id HAVING n >= ?
+            ) pairs JOIN tags ta ON ta.id = pairs.first JOIN tags tb ON tb.id = pairs.second
+            ORDER BY pairs.n DESC, pairs.first_position, pairs.second_position LIMIT ?
+        """, (*parameters, min_cooccurrence, -1 if limit is None else limit))
+        return [(*sorted((first, second)), n) for first, second, n in rows]
+
+    def count(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM gigs").fetchone()[0]
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+def main():
+    from ingest import iter_gigs
+
+    parser = argparse.ArgumentParser(description="Import a gig dataset into a SQLite store")
+    parser.add_argument('source', help="Any dataset ingest.iter_gigs reads")
+    parser.add_argument('target', help="SQLite database file; gigs are appended if it exists")
+    args = parser.parse_args()
+
+    database = GigDatabase(args.target)
+    database.connection.execute("PRAGMA journal_mode=WAL")
+    count = database.import_gigs(iter_gigs(args.source))
+    database.connection.execute("INSERT INTO gigs_fts (gigs_fts) VALUES ('optimize')")
+    print(f"Imported {count} gigs into {args.target} ({database.count()} total)")
+    database.close()
+
+
+if __name__ == '__main__':
+    main()
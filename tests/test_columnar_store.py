@@ -0,0 +1,36 @@
+import pytest
+from benchmarks.synthetic import generate_gigs
+from columnar_store import read_table, search_dataset, search_table, write_table
+from fetcher import Fetcher
+
+
+@pytest.fixture(params=['gigs.parquet', 'gigs.arrow'])
+def dataset(request, tmp_path):
+    path = str(tmp_path / request.param)
+    write_table(generate_gigs(2000, seed=8), path, batch_size=500)
+    return path
+
+
+@pytest.mark.parametrize('keywords', [
+    ['logo'],
+    ['seo', 'wordpress design'],
+    # Fewer matches than the limit, so unmatched gigs fill the rest
+    ['voice-social-235'],
+    ['no such keyword'],
+    [],
+])
+def test_search_dataset_matches_ranking_the_whole_table(dataset, keywords):
+    expected = search_table(read_table(dataset), keywords, limit=10)
+    assert search_dataset(dataset, keywords, limit=10) == expected
+
+
+def test_fetcher_searches_columnar_datasets_with_pushdown(dataset):
+    assert Fetcher(dataset).fetch_mock_data(['video']) == search_table(read_table(dataset), ['video'])
+
+
+def test_tag_and_keyword_filters_are_combined(dataset):
+    table = read_table(dataset, keywords=['logo'], tags=['design-logo-1'])
+    assert len(table)
+    for gig in table.to_pylist():
+        assert 'design-logo-1' in gig['tags']
+        assert 'logo' in ' '.join([gig['title'], gig['description'], ' '.join(gig['tags'])]).lower()
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from langchain_core.messages import AIMessage
+from benchmarks.synthetic import generate_gigs
+from intelligence import Intelligence, chunk_gigs
+from llm_cache import ResponseCache
+import config
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample-gigs-data.json')
+REPLY = "Title: Logo Design\nDescription: Modern logos.\nKeywords: logo, branding, design, vector, brand"
+
+
+class ScriptedModel:
+    """Chat model stand-in that records its calls; it can hold a stream open or break it.
+
+    Summary calls (``ainvoke``) go to ``summaries``; ``summarize`` may
+    sleep or raise for some of them, given the call's position.
+    """
+
+    def __init__(self, reply: str = REPLY, gate: threading.Event = None, fail_after: int = None,
+                 summarize=None):
+        self.model = 'scripted'
+        self.reply = reply
+        self.gate = gate
+        self.fail_after = fail_after
+        self.summarize = summarize
+        self.calls = []
+        self.summaries = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ainvoke(self, messages):
+        position = len(self.summaries)
+        self.summaries.append(messages)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.summarize is not None:
+                await self.summarize(position)
+        finally:
+            self.in_flight -= 1
+        return AIMessage(content=f"Summary of chunk {position}: logos, branding, fast delivery.")
+
+    def stream(self, messages):
+        self.calls.append(messages)
+        if self.gate is not None:
+            self.gate.wait(5)
+        for position, word in enumerate(self.reply.split(' ')):
+            if position == self.fail_after:
+                raise RuntimeError("connection reset")
+            yield word if position == 0 else ' ' + word
+
+
+@pytest.fixture
+def gigs():
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+@pytest.fixture
+def many_gigs():
+    return generate_gigs(400, seed=5)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / 'llm'), ttl=3600)
+
+
+def generate(model, cache, gigs):
+    job = Intelligence(model, cache=cache).start_generation(gigs, map_reduce=False)
+    job.wait(5)
+    return job
+
+
+def test_cache_hit_returns_a_finished_job(cache, gigs):
+    first = generate(ScriptedModel(), cache, gigs)
+    assert first.status == 'done' and first.text == REPLY
+
+    model = ScriptedModel()
+    job = Intelligence(model, cache=cache).start_generation(gigs, map_reduce=False)
+    assert job.status == 'done'
+    assert job.text == REPLY
+    assert model.calls == []
+
+
+def test_expired_entry_calls_the_model_again(tmp_path, gigs):
+    cache = ResponseCache(str(tmp_path / 'llm'), ttl=0)
+    generate(ScriptedModel(), cache, gigs)
+
+    model = ScriptedModel()
+    assert generate(model, cache, gigs).text == REPLY
+    assert len(model.calls) == 1
+
+
+def test_identical_request_joins_the_running_job(cache, gigs):
+    gate = threading.Event()
+    model = ScriptedModel(gate=gate)
+    intelligence = Intelligence(model, cache=cache)
+
+    first = intelligence.start_generation(gigs, map_reduce=False)
+    second = intelligence.start_generation(gigs, map_reduce=False)
+    assert second is first
+    assert first.status == 'running'
+
+    gate.set()
+    assert first.wait(5) == REPLY
+    assert len(model.calls) == 1
+
+
+def test_failed_stream_is_not_cached(cache, gigs):
+    job = generate(ScriptedModel(fail_after=3), cache, gigs)
+    assert job.status == 'failed'
+    assert job.error == "connection reset"
+    assert cache.get(job.key) is None
+
+    model = ScriptedModel()
+    assert generate(model, cache, gigs).text == REPLY
+    assert len(model.calls) == 1
+
+
+def test_cache_counters_survive_concurrent_lookups(cache):
+    cache.put('present', 'cached reply')
+    keys = ['present', 'absent'] * 500
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(cache.get, keys))
+    assert cache.stats() == {'hits': 500, 'misses': 500, 'hit_rate': 0.5}
+
+
+def map_reduce(model, cache, gigs):
+    return Intelligence(model, cache=cache, token_budget=600).generate_map_reduce(gigs)
+
+
+def test_rerun_only_summarizes_changed_chunks(cache, many_gigs):
+    chunks = len(chunk_gigs(many_gigs))
+    first = ScriptedModel()
+    assert map_reduce(first, cache, many_gigs) == REPLY
+    assert len(first.summaries) == chunks > 4
+
+    edited = len(many_gigs) // 2
+    many_gigs[edited] = dict(many_gigs[edited], title='Hand-drawn mascot logos', completed_orders=10 ** 6)
+    model = ScriptedModel()
+    map_reduce(model, cache, many_gigs)
+    # The edited gig's chunk, and at most its neighbour if a boundary moved
+    assert 1 <= len(model.summaries) <= 2
+
+
+def test_summary_calls_are_capped_by_the_semaphore(cache, many_gigs, monkeypatch):
+    monkeypatch.setattr(config, 'LLM_MAP_CONCURRENCY', 2)
+    model = ScriptedModel()
+    map_reduce(model, cache, many_gigs)
+    assert len(model.summaries) > 2
+    assert model.max_in_flight == 2
+
+
+def test_timed_out_chunk_is_left_out_and_counted(cache, many_gigs, monkeypatch):
+    monkeypatch.setattr(config, 'LLM_MAP_TIMEOUT_SECONDS', 0.2)
+
+    async def stall_first(position):
+        if position == 0:
+            await asyncio.sleep(5)
+
+    model = ScriptedModel(summarize=stall_first)
+    job = Intelligence(model, cache=cache, token_budget=600).start_generation(many_gigs, map_reduce=True)
+    assert job.wait(5) == REPLY
+    assert job.status == 'done'
+    assert (job.summaries, job.failed_summaries) == (len(model.summaries), 1)
+
+    reduce_prompt = model.calls[0][-1].content
+    assert "Summary of chunk 0:" not in reduce_prompt
+    assert "Summary of chunk 1:" in reduce_prompt
+    # The dropped chunk is not cached, so a rerun asks for it again
+    rerun = ScriptedModel()
+    map_reduce(rerun, cache, many_gigs)
+    assert len(rerun.summaries) == 1
+
+
+def test_every_summary_failing_raises_the_error(cache, many_gigs):
+    async def refuse(position):
+        raise RuntimeError("quota exceeded")
+
+    model = ScriptedModel(summarize=refuse)
+    with pytest.raises(RuntimeError, match="quota exceeded"):
+        map_reduce(model, cache, many_gigs)
+    assert model.calls == []
+
+    job = Intelligence(model, cache=cache, token_budget=600).start_generation(many_gigs, map_reduce=True)
+    job.wait(5)
+    assert job.status == 'failed'
+    assert job.error == "quota exceeded"
+    assert job.failed_summaries == job.summaries > 0
+
+
+def test_too_many_failed_summaries_fail_the_job(cache, many_gigs):
+    async def refuse_half(position):
+        if position % 2:
+            raise RuntimeError("quota exceeded")
+
+    model = ScriptedModel(summarize=refuse_half)
+    job = Intelligence(model, cache=cache, token_budget=600).start_generation(many_gigs, map_reduce=True)
+    job.wait(5)
+    assert job.status == 'failed'
+    assert job.error == f"{job.failed_summaries} of {job.summaries} summaries failed"
+    assert model.calls == []
+
+
+def test_empty_input_makes_no_calls(cache):
+    model = ScriptedModel()
+    assert map_reduce(model, cache, []) == ''
+    assert model.summaries == [] and model.calls == []
@@ -0,0 +1,101 @@
+import os
+import threading
+import pytest
+import output_runs
+from export_jobs import ExportRunner
+from output_runs import RunDirectory, clean_output_dir
+
+
+@pytest.fixture
+def runner():
+    runner = ExportRunner(workers=1)
+    yield runner
+    runner.shutdown()
+
+
+def expire_everything(root):
+    return clean_output_dir(str(root), max_bytes=0, max_age=0, force=True)
+
+
+def test_janitor_keeps_a_run_until_it_is_released(tmp_path):
+    run = RunDirectory('a' * 64, root=str(tmp_path))
+
+    assert expire_everything(tmp_path) == 0
+    run.release()
+    assert expire_everything(tmp_path) == 1
+    assert not os.path.exists(run.path)
+
+
+def test_queued_export_keeps_its_run(tmp_path, runner):
+    busy, finish = threading.Event(), threading.Event()
+    # Occupy the only worker so the export below stays queued
+    blocker = runner.submit('blocker', lambda: busy.set() or finish.wait() and [])
+    busy.wait()
+
+    run = RunDirectory('b' * 64, root=str(tmp_path))
+    job = runner.submit('report', lambda: [run.path], run)
+    run.release()
+
+    assert job.status == 'running'
+    assert expire_everything(tmp_path) == 0
+    assert os.path.isdir(run.path)
+
+    finish.set()
+    assert job.wait(timeout=5) == [run.path]
+    blocker.wait(timeout=5)
+    assert expire_everything(tmp_path) == 1
+
+
+def test_failed_export_releases_its_run(tmp_path, runner):
+    run = RunDirectory('c' * 64, root=str(tmp_path))
+    job = runner.submit('report', lambda: 1 / 0, run)
+    run.release()
+
+    with pytest.raises(ZeroDivisionError):
+        job.wait(timeout=5)
+    assert expire_everything(tmp_path) == 1
+
+
+def test_cancelled_export_reports_cancelled_and_releases_its_run(tmp_path, runner):
+    busy, finish = threading.Event(), threading.Event()
+    blocker = runner.submit('blocker', lambda: busy.set() or finish.wait() and [])
+    busy.wait()
+
+    try:
+        run = RunDirectory('f' * 64, root=str(tmp_path))
+        job = runner.submit('report', lambda: [run.path], run)
+        run.release()
+        assert job.future.cancel()
+
+        assert job.status == 'cancelled'
+        assert job.files == [] and job.error is None
+        assert job.finished_at is not None
+        assert expire_everything(tmp_path) == 1
+    finally:
+        finish.set()
+        blocker.wait(timeout=5)
+
+
+def test_run_reused_during_cleanup_is_not_deleted(tmp_path, monkeypatch):
+    RunDirectory('d' * 64, root=str(tmp_path)).release()
+    delete = output_runs._delete
+    reused = []
+
+    def delete_while_a_session_reuses_the_run(path):
+        # Another session starts the same analysis after the janitor picked the run
+        reused.append(RunDirectory('d' * 64, root=str(tmp_path)))
+        delete(path)
+
+    monkeypatch.setattr(output_runs, '_delete', delete_while_a_session_reuses_the_run)
+    assert expire_everything(tmp_path) == 1
+    assert os.path.isfile(os.path.join(reused[0].path, output_runs.MANIFEST))
+    assert os.listdir(tmp_path) == [os.path.basename(reused[0].path)]
+
+
+def test_janitor_removes_leftover_tombstones(tmp_path):
+    tombstone = tmp_path / f".eeeeeeee.12345678{output_runs.TOMBSTONE_SUFFIX}"
+    tombstone.mkdir()
+    (tombstone / 'report.pdf').write_bytes(b'%PDF')
+
+    assert expire_everything(tmp_path) == 0
+    assert not tombstone.exists()
@@ -0,0 +1,47 @@
+import json
+import pytest
+from benchmarks.synthetic import generate_gigs
+from parallel import _build_shard, _split, analyze_sharded
+from processor import DataProcessor
+
+
+def assert_same_analysis(actual: DataProcessor, expected: DataProcessor):
+    assert actual.get_fingerprint() == expected.get_fingerprint()
+    assert actual.get_summary_statistics() == expected.get_summary_statistics()
+    assert actual.get_keyword_frequency() == expected.get_keyword_frequency()
+    assert actual.get_keyword_correlations(top_k=20) == expected.get_keyword_correlations(top_k=20)
+    assert actual.gigs_data == expected.gigs_data
+
+
+@pytest.mark.parametrize('workers', [None, 0, 1, 3])
+def test_sharded_analysis_matches_a_single_pass(workers):
+    gigs = generate_gigs(3000, seed=4)
+    assert_same_analysis(analyze_sharded(gigs, workers=workers), DataProcessor(gigs))
+
+
+def test_sharded_analysis_reads_one_file_per_shard(tmp_path):
+    gigs = generate_gigs(1000, seed=6)
+    paths = []
+    for number, start in enumerate(range(0, len(gigs), 400)):
+        path = tmp_path / f'shard-{number}.json'
+        path.write_text(json.dumps(gigs[start:start + 400]), encoding='utf-8')
+        paths.append(str(path))
+
+    assert_same_analysis(analyze_sharded(paths, workers=2), DataProcessor(gigs))
+
+
+def test_negative_workers_are_rejected():
+    with pytest.raises(ValueError):
+        analyze_sharded(generate_gigs(10), workers=-1)
+
+
+def test_split_handles_fewer_gigs_than_workers():
+    gigs = generate_gigs(3)
+    assert _split(gigs, 8) == [[gig] for gig in gigs]
+    assert _split([], 4) == [[]]
+
+
+def test_workers_return_aggregates_without_the_gigs():
+    shard = _build_shard(generate_gigs(50))
+    assert shard.gig_chunks == []
+    assert False in shard.products
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from benchmarks.synthetic import generate_gigs
+from processor import DataProcessor
+
+
+def gig(tags, price=25, orders=10):
+    return {'title': 'Logo design', 'description': 'Modern logos.', 'tags': tags,
+            'completed_orders': orders, 'price': price}
+
+
+def test_fingerprint_tells_tags_with_commas_apart():
+    first = DataProcessor([gig(['a, b', 'c'])])
+    second = DataProcessor([gig(['a', 'b, c'])])
+
+    assert first.get_dataframe()['tags'].tolist() == second.get_dataframe()['tags'].tolist()
+    assert first.get_fingerprint() != second.get_fingerprint()
+
+
+def test_fingerprint_follows_tag_order_and_gig_boundaries():
+    fingerprint = DataProcessor([gig(['a', 'b']), gig(['c'])]).get_fingerprint()
+
+    assert DataProcessor([gig(['b', 'a']), gig(['c'])]).get_fingerprint() != fingerprint
+    assert DataProcessor([gig(['a']), gig(['b', 'c'])]).get_fingerprint() != fingerprint
+    assert DataProcessor([gig(['a', 'b']), gig(['c'])]).get_fingerprint() == fingerprint
+
+
+def test_appended_gigs_fingerprint_like_a_single_build():
+    gigs = generate_gigs(600, seed=3)
+    processor = DataProcessor(gigs[:250])
+    before = processor.get_fingerprint()
+    processor.append(gigs[250:])
+
+    assert processor.get_fingerprint() != before
+    assert processor.get_fingerprint() == DataProcessor(gigs).get_fingerprint()
+
+
+def test_statistics_read_before_an_append_stay_exact():
+    gigs = generate_gigs(3000, seed=11)
+    processor = DataProcessor(gigs[:1000])
+    processor.get_summary_statistics()
+    processor.get_success_metrics()
+    processor.append(gigs[1000:])
+
+    expected = DataProcessor(gigs)
+    # Quartiles exactly; running moments up to float rounding
+    for name in ('get_price_statistics', 'get_order_statistics', 'get_summary_statistics'):
+        actual, exact = getattr(processor, name)(), getattr(expected, name)()
+        assert {key: actual[key] for key in ('q1', 'median', 'q3', 'median_price') if key in actual} \
+            == {key: exact[key] for key in ('q1', 'median', 'q3', 'median_price') if key in exact}
+        assert actual == pytest.approx(exact)
+    assert processor.get_success_metrics() == expected.get_success_metrics()
+
+
+def test_approximate_quantiles_follow_appends():
+    gigs = generate_gigs(3000, seed=11)
+    processor = DataProcessor(gigs[:1000])
+    processor.get_approximate_quantiles('price')
+    processor.append(gigs[1000:])
+
+    prices = np.sort(processor.get_dataframe()['price'].to_numpy())
+    for quantile, estimate in zip((0.25, 0.5, 0.75), processor.get_approximate_quantiles('price')):
+        assert abs(np.searchsorted(prices, estimate, side='right') / len(prices) - quantile) <= 0.02
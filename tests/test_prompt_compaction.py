@@ -0,0 +1,66 @@
+import pytest
+from benchmarks.synthetic import generate_gigs
+from processor import DataProcessor
+from prompt_compaction import GigSubset, compact_gigs, compact_processor, estimate_tokens
+
+
+@pytest.fixture
+def gigs():
+    return generate_gigs(1200, seed=12)
+
+
+@pytest.fixture
+def no_new_processors(monkeypatch):
+    def refuse(self, *args, **kwargs):
+        raise AssertionError("compaction built a DataProcessor")
+    return lambda: monkeypatch.setattr(DataProcessor, '__init__', refuse)
+
+
+def assert_same_queries(subset: GigSubset, processor: DataProcessor):
+    for name in ('get_price_statistics', 'get_order_statistics'):
+        actual, expected = getattr(subset, name)(), getattr(processor, name)()
+        assert {key: actual[key] for key in ('mean', 'median', 'max') if key in actual} == pytest.approx(
+            {key: expected[key] for key in ('mean', 'median', 'max') if key in expected})
+    success, expected = subset.get_success_metrics(), processor.get_success_metrics()
+    assert success['total_successful_gigs'] == expected['total_successful_gigs']
+    assert success['avg_price_successful'] == pytest.approx(expected['avg_price_successful'])
+    assert subset.get_top_keywords(30) == processor.get_top_keywords(30)
+    assert subset.get_keyword_correlations(top_k=20) == processor.get_keyword_correlations(top_k=20)
+
+
+def test_subset_of_a_processor_answers_like_a_processor_of_those_gigs(gigs):
+    parent = DataProcessor(gigs)
+    assert_same_queries(GigSubset.from_processor(parent, range(200, 700)), DataProcessor(gigs[200:700]))
+
+
+def test_records_answer_like_a_processor_of_them(gigs):
+    assert_same_queries(GigSubset.from_records(gigs[:500]), DataProcessor(gigs[:500]))
+
+
+def test_chunk_summaries_reuse_the_parent_processor(gigs, no_new_processors):
+    parent = DataProcessor(gigs)
+    no_new_processors()
+
+    summary = compact_gigs(parent, 800, gig_ids=range(0, 600))
+    assert summary.startswith("Dataset summary: 600 gigs.")
+    assert estimate_tokens(summary) <= 800
+    assert compact_gigs(gigs[:600], 800) == summary
+
+
+def test_tags_containing_commas_are_kept_whole(no_new_processors):
+    gigs = [
+        {'title': f'Gig {number}', 'description': 'Logos and more. ' * 40, 'completed_orders': number,
+         'price': 10 + number, 'tags': ['logo, vector', 'branding']}
+        for number in range(40)
+    ]
+    parent = DataProcessor(gigs)
+    no_new_processors()
+
+    for summary in (compact_gigs(gigs, 400), compact_gigs(parent, 400, gig_ids=range(40))):
+        assert "logo, vector (40)" in summary
+        assert "vector (" not in summary.replace("logo, vector (", "")
+
+
+def test_full_processor_summary_is_unchanged_by_subsetting_everything(gigs):
+    parent = DataProcessor(gigs)
+    assert compact_gigs(parent, 1500, gig_ids=parent.get_dataframe().index) == compact_processor(parent, 1500)
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import time
+import httpx
+import pytest
+import scrape_cache
+from scrape_cache import ScrapeCache
+from scraper import AsyncGigScraper
+from benchmarks.synthetic import generate_gigs, render_gig_page
+from parsers import parse_gig_page
+
+URL = 'https://gigs.test/seller/gig-{}'
+
+
+def page(number: int) -> str:
+    return render_gig_page(generate_gigs(number + 1, seed=3)[number], filler_blocks=20)
+
+
+@pytest.fixture
+def no_directory_walks(monkeypatch):
+    def walk(*args, **kwargs):
+        raise AssertionError("the cache directory was walked after construction")
+    return lambda: monkeypatch.setattr(scrape_cache.os, 'walk', walk)
+
+
+def test_store_and_get_round_trip(tmp_path):
+    cache = ScrapeCache(str(tmp_path))
+    cache.store(URL.format(0), page(0), {'ETag': '"v1"'})
+
+    assert cache.get(URL.format(0)) == page(0)
+    assert cache.lookup(URL.format(0))['etag'] == '"v1"'
+    assert cache.get(URL.format(1)) is None
+
+
+def test_eviction_uses_the_in_memory_index(tmp_path, no_directory_walks):
+    cache = ScrapeCache(str(tmp_path))
+    cache.store(URL.format(0), page(0), {})
+    size = cache.stats()['bytes']
+    cache.max_bytes = int(size * 2.5)
+    no_directory_walks()
+
+    cache.store(URL.format(1), page(1), {})
+    cache.get(URL.format(0))
+    cache.store(URL.format(2), page(2), {})
+
+    # gig-1 was least recently used once gig-0 was read again
+    assert cache.stats()['evictions'] == 1
+    assert cache.get(URL.format(1)) is None
+    assert cache.get(URL.format(0)) == page(0)
+    assert cache.get(URL.format(2)) == page(2)
+    assert not os.path.exists(cache._paths(URL.format(1))[1])
+
+
+def test_index_is_reloaded_from_disk(tmp_path):
+    first = ScrapeCache(str(tmp_path))
+    for number in range(3):
+        first.store(URL.format(number), page(number), {})
+        time.sleep(0.01)
+    first.get(URL.format(0))
+
+    second = ScrapeCache(str(tmp_path), max_bytes=first.stats()['bytes'] - 1)
+    assert second.stats()['entries'] == 2
+    # Last access survives the restart through the metadata mtime
+    assert second.get(URL.format(1)) is None
+
+
+def test_clear_removes_every_entry(tmp_path):
+    cache = ScrapeCache(str(tmp_path))
+    for number in range(3):
+        cache.store(URL.format(number), page(number), {})
+    cache.clear()
+
+    assert cache.stats()['bytes'] == 0
+    assert ScrapeCache(str(tmp_path)).stats()['entries'] == 0
+
+
+def test_scraper_serves_fresh_pages_from_the_cache(tmp_path):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get('If-None-Match') == '"v1"':
+            return httpx.Response(304, headers={'ETag': '"v1"'})
+        return httpx.Response(200, text=page(0), headers={'ETag': '"v1"'})
+
+    async def scrape(cache):
+        async with AsyncGigScraper('https://gigs.test', transport=httpx.MockTransport(handler),
+                                   parse_workers=0, cache=cache) as scraper:
+            return await scraper.scrape_gig('/seller/gig-0')
+
+    cache = ScrapeCache(str(tmp_path))
+    first = asyncio.run(scrape(cache))
+    assert asyncio.run(scrape(cache)) == first
+    assert len(requests) == 1
+    assert first == dict(parse_gig_page(page(0)), url='/seller/gig-0')
+
+    # Past the TTL the page is revalidated, and a 304 keeps the parsed record
+    cache.ttl = 0
+    assert asyncio.run(scrape(cache)) == first
+    assert len(requests) == 2
+    assert cache.stats()['revalidated'] == 1
@@ -0,0 +1,167 @@
+import asyncio
+import time
+from urllib.parse import parse_qs, urlsplit
+import httpx
+import pytest
+import scraper
+from benchmarks.synthetic import generate_gigs, render_gig_page, render_search_page
+from parsers import PARSERS
+from scraper import AsyncGigScraper, TokenBucket
+
+BASE_URL = 'https://gigs.test'
+GIGS_PER_PAGE = 3
+
+
+class FixtureSite:
+    """Search and gig pages rendered from synthetic gigs, served through ``httpx.MockTransport``."""
+
+    def __init__(self, count: int = 7):
+        self.gigs = {f'/seller/gig-{number}': gig for number, gig in enumerate(generate_gigs(count, seed=9))}
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((time.monotonic(), request.url.path))
+        if request.url.path == '/search/gigs':
+            page = int(parse_qs(urlsplit(str(request.url)).query)['page'][0])
+            paths = list(self.gigs)[(page - 1) * GIGS_PER_PAGE:page * GIGS_PER_PAGE]
+            return httpx.Response(200, text=render_search_page(paths, [self.gigs[path]['title'] for path in paths]))
+        gig = self.gigs.get(request.url.path)
+        if gig is None:
+            return httpx.Response(404)
+        return httpx.Response(200, text=render_gig_page(gig, filler_blocks=4))
+
+
+def scrape(transport: httpx.MockTransport, keyword: str = 'logo', **options):
+    async def run():
+        options.setdefault('parse_workers', 0)
+        async with AsyncGigScraper(BASE_URL, transport=transport, **options) as client:
+            return [gig async for gig in client.scrape(keyword)]
+    return asyncio.run(run())
+
+
+def fetch(handler, url: str = f'{BASE_URL}/seller/gig-0', **options):
+    async def run():
+        options.setdefault('parse_workers', 0)
+        async with AsyncGigScraper(BASE_URL, transport=httpx.MockTransport(handler), **options) as client:
+            return await client.fetch(url)
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays the scraper asked for, without actually waiting them out."""
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(scraper.asyncio, 'sleep', sleep)
+    return delays
+
+
+@pytest.mark.parametrize('backend', sorted(PARSERS))
+def test_every_parser_backend_reads_the_fixture_pages(backend):
+    site = FixtureSite()
+    gigs = scrape(httpx.MockTransport(site.handler), parser=backend, requests_per_second=1000)
+
+    assert sorted(gig['url'] for gig in gigs) == sorted(site.gigs)
+    for gig in gigs:
+        expected = site.gigs[gig['url']]
+        assert {key: gig[key] for key in expected} == expected
+
+
+def test_search_pages_are_followed_until_one_is_empty():
+    site = FixtureSite(count=7)
+    scrape(httpx.MockTransport(site.handler), requests_per_second=1000)
+
+    searches = [path for _, path in site.requests if path == '/search/gigs']
+    # Three pages of results (3 + 3 + 1) and the empty fourth page
+    assert len(searches) == 4
+
+
+def test_token_bucket_paces_requests_after_the_burst():
+    site = FixtureSite(count=10)
+    rate = 40.0
+
+    async def run():
+        async with AsyncGigScraper(BASE_URL, transport=httpx.MockTransport(site.handler), parse_workers=0,
+                                   requests_per_second=rate, concurrency_per_host=2) as client:
+            await asyncio.gather(*(client.fetch(f'{BASE_URL}{path}') for path in site.gigs))
+    asyncio.run(run())
+
+    times = sorted(moment for moment, _ in site.requests)
+    # The bucket holds concurrency_per_host tokens; every later request waits for a refill
+    for position, moment in enumerate(times[2:], start=1):
+        assert moment - times[0] >= position / rate - 0.01
+
+
+def test_token_bucket_allows_a_burst_up_to_capacity():
+    async def run():
+        bucket = TokenBucket(rate=1.0, capacity=5)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        return time.monotonic() - start
+    assert asyncio.run(run()) < 0.1
+
+
+@pytest.mark.parametrize('status', [429, 500, 502, 503, 504])
+def test_retryable_statuses_are_retried_with_exponential_backoff(status, sleeps):
+    responses = [httpx.Response(status), httpx.Response(status), httpx.Response(200, text='ok')]
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        return responses[len(attempts) - 1]
+
+    assert fetch(handler, backoff=1.0, max_retries=3) == 'ok'
+    assert len(attempts) == 3
+    assert len(sleeps) == 2
+    for attempt, delay in enumerate(sleeps):
+        # Jitter scales the base delay by 0.5-1.5
+        assert 0.5 * 2 ** attempt <= delay <= 1.5 * 2 ** attempt
+
+
+def test_retry_after_header_extends_the_backoff(sleeps):
+    responses = [httpx.Response(429, headers={'Retry-After': '30'}), httpx.Response(200, text='ok')]
+
+    assert fetch(lambda request: responses.pop(0), backoff=0.01) == 'ok'
+    assert sleeps == [30.0]
+
+
+def test_transport_errors_are_retried(sleeps):
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise httpx.ConnectError('connection refused', request=request)
+        return httpx.Response(200, text='ok')
+
+    assert fetch(handler, backoff=0.01) == 'ok'
+    assert len(attempts) == 2
+
+
+def test_gives_up_after_max_retries(sleeps):
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        return httpx.Response(503)
+
+    assert fetch(handler, backoff=0.01, max_retries=2) is None
+    assert len(attempts) == 3
+
+
+def test_client_errors_are_not_retried(sleeps):
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        return httpx.Response(404)
+
+    assert fetch(handler, backoff=0.01) is None
+    assert len(attempts) == 1
+    assert sleeps == []
@@ -0,0 +1,127 @@
+import json
+import os
+from collections import Counter
+import numpy as np
+import pytest
+from benchmarks.synthetic import generate_gigs
+from fetcher import Fetcher
+from processor import DataProcessor
+from search_index import score_gig
+from sketches import GigSketch, SpaceSaving
+from visualizer import Visualizer
+import config
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample-gigs-data.json')
+
+
+@pytest.fixture
+def sample_gigs():
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def sketch_of(gigs, **kwargs):
+    sketch = GigSketch(**kwargs)
+    sketch.update(gigs)
+    return sketch
+
+
+def test_sketch_matches_processor_on_sample_data(sample_gigs):
+    sketch, processor = sketch_of(sample_gigs), DataProcessor(sample_gigs)
+
+    assert sketch.get_summary_statistics() == pytest.approx(processor.get_summary_statistics())
+    assert sketch.get_price_statistics() == pytest.approx(processor.get_price_statistics())
+    assert sketch.get_order_statistics() == pytest.approx(processor.get_order_statistics())
+    assert sketch.get_top_keywords(5) == processor.get_top_keywords(5)
+    assert sketch.get_keyword_frequency() == processor.get_keyword_frequency()
+
+
+def test_merged_sketches_match_a_single_sketch(sample_gigs):
+    merged = sketch_of(sample_gigs[:2])
+    merged.merge(sketch_of(sample_gigs[2:]))
+
+    assert merged.get_summary_statistics() == pytest.approx(sketch_of(sample_gigs).get_summary_statistics())
+    assert merged.get_keyword_frequency() == sketch_of(sample_gigs).get_keyword_frequency()
+
+
+def space_saving_of(items, capacity):
+    summary = SpaceSaving(capacity)
+    for item in items:
+        summary.update(item)
+    return summary
+
+
+def test_merge_charges_each_side_its_own_floor():
+    first = space_saving_of(['X'] * 1000 + [f"single-{number}" for number in range(100)], capacity=5)
+    # 'X' is counted early and then evicted by ten items drawn repeatedly
+    second = space_saving_of(['X'] * 285 + [f"item-{number % 10}" for number in range(2715)], capacity=5)
+    assert 'X' not in second.counts and first.min_count() < second.min_count()
+
+    first.merge(second)
+    assert first.most_common(1)[0][0] == 'X'
+    assert first.counts['X'] >= 1285
+
+
+def test_merged_summaries_that_both_evicted_keep_the_heavy_hitters():
+    rng = np.random.default_rng(8)
+    first_items = [f"tag-{rank}" for rank in rng.zipf(1.5, 5000)]
+    second_items = [f"tag-{rank}" for rank in rng.zipf(1.3, 5000)]
+    first, second = space_saving_of(first_items, 20), space_saving_of(second_items, 20)
+    assert first.min_count() > 0 and second.min_count() > 0
+
+    first.merge(second)
+    exact = Counter(first_items + second_items)
+    for item, count in first.counts.items():
+        assert exact[item] <= count <= exact[item] + (len(first_items) + len(second_items)) / 20
+    assert {item for item, _ in exact.most_common(5)} <= first.counts.keys()
+
+
+def test_merged_gig_sketches_keep_the_top_tags_when_capacity_is_small():
+    gigs = generate_gigs(6000, seed=9)
+    merged = sketch_of(gigs[:3000], capacity=30)
+    merged.merge(sketch_of(gigs[3000:], capacity=30))
+    processor = DataProcessor(gigs)
+    assert processor.get_summary_statistics()['unique_tags'] > 30
+
+    exact = processor.get_keyword_frequency()
+    for tag, count in merged.top_tags.counts.items():
+        assert count >= exact.get(tag, 0)
+    assert [tag for tag, _ in merged.top_tags.most_common(5)] == [tag for tag, _ in processor.get_top_keywords(5)]
+
+
+def test_fetch_streaming_sketches_every_match(sample_gigs):
+    keywords = ['logo', 'website', 'seo']
+    sketch = GigSketch()
+    top = Fetcher(SAMPLE_PATH).fetch_streaming(keywords, sketch=sketch)
+
+    matches = [gig for gig in sample_gigs if score_gig(gig, keywords)]
+    assert 0 < len(matches) < len(sample_gigs)
+    assert top == Fetcher(SAMPLE_PATH).fetch_streaming(keywords)
+    assert sketch.get_summary_statistics() == pytest.approx(DataProcessor(matches).get_summary_statistics())
+
+
+def test_keyword_charts_render_from_a_sketch(sample_gigs):
+    visualizer = Visualizer(sketch_of(sample_gigs))
+    pie = visualizer.create_keyword_distribution_pie()
+
+    assert list(pie.data[0].values) == [24, 1]
+    assert list(visualizer.create_top_keywords_chart(top_n=3).data[0].x) == ['branding', 'logo-design', 'creative']
+
+
+def test_sketch_stays_within_error_bounds_on_larger_data():
+    gigs = generate_gigs(20000, seed=5)
+    sketch, processor = sketch_of(gigs, capacity=200), DataProcessor(gigs)
+
+    prices = np.sort(processor.get_dataframe()['price'].to_numpy())
+    for quantile, estimate in zip((0.25, 0.5, 0.75), sketch.quantiles['price'].quantiles([0.25, 0.5, 0.75])):
+        rank = np.searchsorted(prices, estimate, side='right') / len(prices)
+        assert abs(rank - quantile) <= 0.02
+
+    total_tags = processor.get_summary_statistics()['total_tags']
+    exact = processor.get_keyword_frequency()
+    for tag, count in sketch.get_top_keywords(20):
+        assert exact[tag] <= count <= exact[tag] + config.SKETCH_CM_EPSILON * total_tags
+    assert [tag for tag, _ in sketch.get_top_keywords(5)] == [tag for tag, _ in processor.get_top_keywords(5)]
+
+    unique = processor.get_summary_statistics()['unique_tags']
+    assert sketch.get_summary_statistics()['unique_tags'] == pytest.approx(unique, rel=0.03)
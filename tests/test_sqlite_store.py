@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import sqlite_store
+from benchmarks.synthetic import generate_gigs
+from dataset_cache import dataset_cache
+from fetcher import Fetcher
+from processor import DataProcessor
+from sqlite_store import GigDatabase, match_query
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    path = str(tmp_path / 'gigs.db')
+    database = GigDatabase(path)
+    database.import_gigs(generate_gigs(500, seed=2))
+    database.close()
+    yield path
+    dataset_cache.invalidate(path)
+
+
+def test_fetchers_share_one_database_per_path(database_path, monkeypatch):
+    opened = []
+    original = sqlite_store.GigDatabase.__init__
+
+    def counting_init(self, path):
+        opened.append(path)
+        original(self, path)
+
+    monkeypatch.setattr(sqlite_store.GigDatabase, '__init__', counting_init)
+    first, second = Fetcher(database_path), Fetcher(database_path)
+
+    assert first.get_database() is second.get_database()
+    assert first.fetch_mock_data(['logo']) == second.fetch_mock_data(['logo'])
+    assert len(opened) == 1
+
+
+def test_shared_database_serves_several_threads(database_path):
+    expected = Fetcher(database_path).fetch_mock_data(['seo'])
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: Fetcher(database_path).fetch_mock_data(['seo']), range(8)))
+    assert expected and all(result == expected for result in results)
+
+
+@pytest.fixture
+def synthetic():
+    gigs = generate_gigs(500, seed=2)
+    database = GigDatabase(':memory:')
+    database.import_gigs(gigs)
+    yield database, gigs
+    database.close()
+
+
+def matched_processor(database, gigs, keywords):
+    rows = database.connection.execute("SELECT rowid FROM gigs_fts WHERE gigs_fts MATCH ?", (match_query(keywords),))
+    ids = sorted(rowid for rowid, in rows)
+    assert 0 < len(ids) < len(gigs)
+    return DataProcessor([gigs[rowid - 1] for rowid in ids])
+
+
+def test_tag_aggregates_match_the_processor(synthetic):
+    database, gigs = synthetic
+    processor = DataProcessor(gigs)
+
+    assert database.tag_frequency() == processor.get_top_keywords(len(processor.tag_vocabulary))
+    assert database.tag_frequency(limit=10) == processor.get_top_keywords(10)
+    assert database.tag_cooccurrence() == processor.get_keyword_correlations()
+    assert database.tag_cooccurrence(min_cooccurrence=3, limit=20) == processor.get_keyword_correlations(3, 20)
+
+
+@pytest.mark.parametrize('keywords', [['logo'], ['seo'], ['voice editing']])
+def test_tag_aggregates_over_a_query_match_a_processor_of_the_matches(synthetic, keywords):
+    database, gigs = synthetic
+    processor = matched_processor(database, gigs, keywords)
+
+    assert database.tag_frequency(keywords) == processor.get_top_keywords(len(processor.tag_vocabulary))
+    assert database.tag_cooccurrence(keywords) == processor.get_keyword_correlations()
+    presence = processor.get_keyword_associations('lift')
+    assert sorted(database.tag_cooccurrence(keywords, presence=True)) == sorted(
+        (first, second, count) for first, second, count, _ in presence)
+
+
+def listing(title, description, tags):
+    return {'title': title, 'description': description, 'tags': tags, 'completed_orders': 1, 'price': 10}
+
+
+def test_search_ranks_by_bm25_then_tops_up_in_gig_order():
+    database = GigDatabase(':memory:')
+    database.import_gigs([
+        listing('Bookkeeping help', 'Monthly accounts and payroll.', ['accounting']),
+        listing('Brand strategy', 'A long description of brand workshops, positioning and naming that '
+                'mentions a logo once among many other words about strategy.', ['branding']),
+        listing('Logo design', 'Logos drawn by hand.', ['logo', 'vector']),
+        listing('Podcast editing', 'Audio cleanup.', ['audio']),
+        listing('Minimal logo', 'Clean marks.', ['logo']),
+    ])
+
+    def titles(*args, **kwargs):
+        return [gig['title'] for gig in database.search(*args, **kwargs)]
+
+    assert titles(['logo'], limit=5) == [
+        'Logo design', 'Minimal logo', 'Brand strategy', 'Bookkeeping help', 'Podcast editing']
+    assert titles(['logo'], limit=2) == ['Logo design', 'Minimal logo']
+    assert titles(['logo'], limit=5, field_weights={'title': 1, 'description': 50, 'tags': 1})[:3] == [
+        'Logo design', 'Brand strategy', 'Minimal logo']
+    assert titles([], limit=3) == ['Bookkeeping help', 'Brand strategy', 'Logo design']
@@ -0,0 +1,42 @@
+import json
+import os
+import numpy as np
+import pytest
+from benchmarks.synthetic import generate_gigs
+from processor import DataProcessor
+
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample-gigs-data.json')
+
+
+@pytest.fixture
+def processor():
+    with open(SAMPLE_PATH, 'r', encoding='utf-8') as file:
+        return DataProcessor(json.load(file))
+
+
+def test_default_trend_is_the_least_squares_line(processor):
+    df = processor.get_dataframe()
+    slope, intercept = np.polyfit(df['price'], df['completed_orders'], 1)
+    fit = processor.get_price_trend()
+
+    assert fit.method == 'ols'
+    assert fit.predict(np.array([10.0, 100.0])) == pytest.approx(slope * np.array([10.0, 100.0]) + intercept)
+
+
+def test_appended_gigs_update_the_trend_like_a_fresh_build():
+    gigs = generate_gigs(2000, seed=7)
+    processor = DataProcessor(gigs[:1500])
+    processor.get_price_trend()
+    processor.append(gigs[1500:])
+
+    expected = DataProcessor(gigs).get_price_trend()
+    assert processor.get_price_trend().predict(np.array([5.0, 50.0])) == pytest.approx(
+        expected.predict(np.array([5.0, 50.0])))
+
+
+def test_theil_sen_is_opt_in(processor):
+    fit = processor.get_price_trend('theil_sen')
+    assert fit.method == 'theil_sen'
+    assert fit.valid
+    with pytest.raises(ValueError):
+        processor.get_price_trend('median')
@@ -3,13 +3,19 @@ import numpy as np
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 from processor import DataProcessor
+from figure_cache import cached_figure
 import config
 
 class Visualizer:
     def __init__(self, processor: DataProcessor):
         self.processor = processor
-        self.df = processor.get_dataframe()
 
+    @property
+    def df(self):
+        # Resolved on use, so keyword charts also work from a GigSketch
+        return self.processor.get_dataframe()
+
+    @cached_figure
     def create_top_keywords_chart(self, top_n: int = config.NUMBER_OF_GIGS) -> go.Figure:
         top_keywords = self.processor.get_top_keywords(top_n)
         
@@ -38,9 +44,11 @@ class Visualizer:
         
         return fig
 
+    @cached_figure
     def create_keyword_distribution_pie(self) -> go.Figure:
-        total_tags = len(self.processor.all_tags)
-        unique_tags = len(self.processor.get_unique_tags())
+        summary = self.processor.get_summary_statistics()
+        total_tags = summary['total_tags']
+        unique_tags = summary['unique_tags']
         duplicate_tags = total_tags - unique_tags
         
         if total_tags == 0:
@@ -62,13 +70,13 @@ class Visualizer:
         
         return fig
     
+    @cached_figure
     def create_keyword_correlation_chart(self, top_n: int = config.NUMBER_OF_GIGS) -> go.Figure:
-        correlations = self.processor.get_keyword_correlations()
+        top_correlations = self.processor.get_keyword_correlations(top_k=top_n)
         
-        if not correlations:
+        if not top_correlations:
             return self._create_empty_chart("No keyword correlations found")
-        
-        top_correlations = correlations[:top_n]
+
         labels = [f"{corr[0]} + {corr[1]}" for corr in top_correlations]
         values = [corr[2] for corr in top_correlations]
         
@@ -108,26 +116,53 @@ class Visualizer:
         )
         return fig
 
-    def create_price_distribution_chart(self) -> go.Figure:
-        fig = go.Figure(data=[
-            go.Histogram(
+    def _aggregate(self, mode: str) -> bool:
+        """Whether price charts are binned server-side for this ``mode``."""
+        if mode not in config.CHART_RENDER_MODES:
+            raise ValueError(f"Unknown chart mode '{mode}', expected one of {config.CHART_RENDER_MODES}")
+        if mode == 'auto':
+            return len(self.df) >= config.CHART_AGGREGATE_MIN_POINTS
+        return mode == 'aggregated'
+
+    @cached_figure
+    def create_price_distribution_chart(self, mode: str = 'auto') -> go.Figure:
+        if self._aggregate(mode):
+            # Only the bin counts travel to the browser
+            prices = self.df['price'].to_numpy(dtype=float)
+            counts, edges = np.histogram(prices[np.isfinite(prices)], bins=config.PRICE_HISTOGRAM_BINS)
+            trace = go.Bar(
+                x=(edges[:-1] + edges[1:]) / 2,
+                y=counts,
+                width=np.diff(edges),
+                customdata=np.column_stack([edges[:-1], edges[1:]]),
+                hovertemplate='Price: $%{customdata[0]:.2f} - $%{customdata[1]:.2f}<br>Gigs: %{y}<extra></extra>',
+                marker_color='lightblue',
+                opacity=0.7
+            )
+        else:
+            trace = go.Histogram(
                 x=self.df['price'],
-                nbinsx=20,
+                nbinsx=config.PRICE_HISTOGRAM_BINS,
                 marker_color='lightblue',
                 opacity=0.7
             )
-        ])
+        fig = go.Figure(data=[trace])
         
         fig.update_layout(
             title='Price Distribution',
             xaxis_title='Price ($)',
             yaxis_title='Number of Gigs',
+            bargap=0,
             height=400
         )
         
         return fig
 
-    def create_price_vs_orders_scatter(self) -> go.Figure:
+    @cached_figure
+    def create_price_vs_orders_scatter(self, mode: str = 'auto') -> go.Figure:
+        if self._aggregate(mode):
+            return self._create_price_vs_orders_density()
+
         fig = go.Figure(data=[
             go.Scatter(
                 x=self.df['price'],
@@ -145,16 +180,7 @@ class Visualizer:
             )
         ])
         
-        # Add trend line
-        z = np.polyfit(self.df['price'], self.df['completed_orders'], 1)
-        p = np.poly1d(z)
-        fig.add_trace(go.Scatter(
-            x=self.df['price'],
-            y=p(self.df['price']),
-            mode='lines',
-            name='Trend Line',
-            line=dict(color='red', dash='dash')
-        ))
+        self._add_trend_line(fig)
         
         fig.update_layout(
             title='Price vs Completed Orders',
@@ -163,4 +189,91 @@ class Visualizer:
             height=500
         )
         
-        return fig
\ No newline at end of file
+        return fig
+
+    def _create_price_vs_orders_density(self) -> go.Figure:
+        """Density tiles for every gig, plus a stratified sample of hoverable gigs."""
+        prices = self.df['price'].to_numpy(dtype=float)
+        orders = self.df['completed_orders'].to_numpy(dtype=float)
+        finite = np.flatnonzero(np.isfinite(prices) & np.isfinite(orders))
+        prices, orders = prices[finite], orders[finite]
+        if not len(finite):
+            return self._create_empty_chart("No priced gigs to plot")
+
+        counts, price_edges, order_edges = np.histogram2d(prices, orders, bins=config.SCATTER_DENSITY_BINS)
+        counts = counts.T
+        fig = go.Figure(data=[
+            go.Heatmap(
+                x=(price_edges[:-1] + price_edges[1:]) / 2,
+                y=(order_edges[:-1] + order_edges[1:]) / 2,
+                # Log color scale so sparse cells stay visible; empty cells are transparent
+                z=np.where(counts > 0, np.log10(np.maximum(counts, 1)), np.nan),
+                customdata=counts,
+                colorscale='Viridis',
+                colorbar=dict(title="Gigs", tickprefix="10^"),
+                hovertemplate='Price: ~$%{x:.2f}<br>Orders: ~%{y:.0f}<br>Gigs: %{customdata:,.0f}<extra></extra>',
+                name='Density'
+            )
+        ])
+
+        # Stratify the sample by density cell so outliers in sparse cells survive
+        price_cells = np.clip(np.searchsorted(price_edges, prices, side='right') - 1, 0, len(price_edges) - 2)
+        order_cells = np.clip(np.searchsorted(order_edges, orders, side='right') - 1, 0, len(order_edges) - 2)
+        cells = price_cells * (len(order_edges) - 1) + order_cells
+        rng = np.random.default_rng(0)
+        shuffled = rng.permutation(len(cells))
+        by_cell = shuffled[np.argsort(cells[shuffled], kind='stable')]
+        sorted_cells = cells[by_cell]
+        starts = np.searchsorted(sorted_cells, sorted_cells, side='left')
+        rank = np.arange(len(by_cell)) - starts
+        # Largest per-cell cap that keeps the sample within budget, filled up with one more per cell
+        cell_counts = np.bincount(cells)
+        low, high = 1, int(cell_counts.max())
+        while low < high:
+            middle = (low + high + 1) // 2
+            if np.minimum(cell_counts, middle).sum() <= config.SCATTER_SAMPLE_POINTS:
+                low = middle
+            else:
+                high = middle - 1
+        sample = by_cell[rank < low + 1]
+        if len(sample) > config.SCATTER_SAMPLE_POINTS:
+            sample = rng.choice(sample, config.SCATTER_SAMPLE_POINTS, replace=False)
+        sample = np.sort(sample)
+
+        fig.add_trace(go.Scatter(
+            x=prices[sample],
+            y=orders[sample],
+            mode='markers',
+            marker=dict(size=4, color='white', line=dict(width=0.5, color='black')),
+            text=self.df['title'].to_numpy()[finite[sample]],
+            hovertemplate='<b>%{text}</b><br>Price: $%{x}<br>Orders: %{y}<extra></extra>',
+            name=f'Sample ({len(sample):,} of {len(finite):,})'
+        ))
+
+        self._add_trend_line(fig)
+
+        fig.update_layout(
+            title='Price vs Completed Orders',
+            xaxis_title='Price ($)',
+            yaxis_title='Completed Orders',
+            legend=dict(orientation='h', y=-0.2),
+            height=500
+        )
+
+        return fig
+
+    def _add_trend_line(self, fig: go.Figure):
+        """Draw the processor's fitted trend; its cost does not grow with the gig count."""
+        fit = self.processor.get_price_trend()
+        if not fit.valid:
+            # Fewer than two distinct prices: there is no trend to draw
+            return
+        price_statistics = self.processor.get_price_statistics()
+        line = np.linspace(price_statistics['min'], price_statistics['max'], config.TREND_LINE_POINTS)
+        fig.add_trace(go.Scatter(
+            x=line,
+            y=fit.predict(line),
+            mode='lines',
+            name=f'Trend Line ({fit.method}, R² {fit.r_squared:.2f})',
+            line=dict(color='red', dash='dash')
+        ))